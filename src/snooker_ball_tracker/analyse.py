@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import argparse
+import os
+from typing import Iterator
+
+from imutils.video import FPS
+
+from snooker_ball_tracker.ball_tracker import BallTracker
+from snooker_ball_tracker.ball_tracker.events import (
+    EventRecorder,
+    EventSink,
+    EventWriter,
+    JsonLinesSink,
+    NpzSink,
+)
+from snooker_ball_tracker.ball_tracker.frame_source import open_frame_source
+from snooker_ball_tracker.ball_tracker.ingest import (
+    FrameIngest,
+    IngestedFrame,
+    ResolutionLadder,
+)
+from snooker_ball_tracker.ball_tracker.pipeline import FramePipeline, FrameResult
+from snooker_ball_tracker.ball_tracker.track_store import TrackStoreSink
+from snooker_ball_tracker.enums import CameraView, ColourDetectionMode
+from snooker_ball_tracker.settings import settings as s
+
+
+class Analyser:
+    def create_parser(self) -> argparse.ArgumentParser:
+        """Create analyser argument parser
+
+        :return: analyser argument parser
+        """
+        parser = argparse.ArgumentParser(
+            description="Ball Tracker Video Analyser (Headless, no display)"
+        )
+        parser.add_argument(
+            "video",
+            help="Video file, directory of images or .npy frame dump "
+            "to detect and track balls from",
+        )
+        parser.add_argument(
+            "-s",
+            "--settings",
+            dest="settings",
+            default=os.path.join(
+                os.path.dirname(os.path.abspath(__file__)),
+                "resources",
+                "default_settings.json",
+            ),
+            help='Settings file to use, defaults to "%(default)s"',
+        )
+        parser.add_argument(
+            "-o",
+            "--output",
+            dest="output",
+            default=None,
+            help="JSON Lines file to write events and ball positions to, "
+            "defaults to the video file name with a .jsonl extension",
+        )
+        parser.add_argument(
+            "--npz-output",
+            dest="npz_output",
+            default=None,
+            help="Directory to also write events and ball positions to "
+            "as columns in compressed .npz chunks",
+        )
+        parser.add_argument(
+            "--track-store",
+            dest="track_store",
+            default=None,
+            help="Directory to also write ball positions and an index of "
+            "every shot to as a memory mapped track store",
+        )
+        parser.add_argument(
+            "--fps",
+            dest="fps",
+            default=25.0,
+            type=float,
+            help="Frame rate of image directories and .npy frame dumps, "
+            "defaults to %(default)s",
+        )
+        parser.add_argument(
+            "-w",
+            "--width",
+            dest="width",
+            default=None,
+            type=int,
+            help="Resize frames to this width before detecting balls in them, "
+            "defaults to the width of the video",
+        )
+        parser.add_argument(
+            "--low-width",
+            dest="low_width",
+            default=None,
+            type=int,
+            help="Width to downscale frames to for motion gating and table "
+            "detection, defaults to the width balls are detected at",
+        )
+        parser.add_argument(
+            "--full-res-colour",
+            dest="full_res_colour",
+            action="store_true",
+            default=False,
+            help="Sample ball colours from the decoded frames rather than "
+            "from the resized frames, requires --colour-detection-mode SAMPLE",
+        )
+        parser.add_argument(
+            "-k",
+            "--decimate",
+            dest="decimate",
+            default=1,
+            type=int,
+            help="Only decode and process every k-th frame, defaults to %(default)s",
+        )
+        parser.add_argument(
+            "--morph",
+            dest="morph",
+            action="store_true",
+            default=False,
+            help="Perform morph closing morphology on processed frames",
+        )
+        parser.add_argument(
+            "--crop-frames",
+            dest="crop_frames",
+            action="store_true",
+            default=False,
+            help="Detect the table in the first frame and ignore everything else",
+        )
+        parser.add_argument(
+            "--crop-to-table",
+            dest="crop_to_table",
+            action="store_true",
+            default=False,
+            help="Detect the table in the first frame and only process "
+            "its bounding rectangle",
+        )
+        parser.add_argument(
+            "--track-table",
+            dest="track_table",
+            action="store_true",
+            default=False,
+            help="Detect camera cuts and only detect the table again "
+            "for camera views that haven't been seen before",
+        )
+        parser.add_argument(
+            "--classify-view",
+            dest="classify_view",
+            action="store_true",
+            default=False,
+            help="Skip close-ups, crowd shots and every other frame "
+            "that doesn't show the main table view",
+        )
+        parser.add_argument(
+            "--gate-motion",
+            dest="gate_motion",
+            action="store_true",
+            default=False,
+            help="Skip ball detection on frames where nothing has moved",
+        )
+        parser.add_argument(
+            "--no-buffer-reuse",
+            dest="reuse_buffers",
+            action="store_false",
+            default=True,
+            help="Allocate new frames for every processed frame instead of "
+            "reusing buffers allocated on the first frame",
+        )
+        parser.add_argument(
+            "-j",
+            "--workers",
+            dest="workers",
+            default=1,
+            type=int,
+            help="Number of worker processes to detect balls with, defaults to "
+            "%(default)s. Workers search whole frames and run colour detection "
+            "at a fixed interval, so events can differ from a single process run",
+        )
+        parser.add_argument(
+            "--colour-detection-mode",
+            dest="colour_detection_mode",
+            default=ColourDetectionMode.CONTOUR.value,
+            type=str.upper,
+            choices=[mode.value for mode in ColourDetectionMode],
+            help='Method used to map balls to colours, defaults to "%(default)s"',
+        )
+        return parser
+
+    def process_frames(
+        self,
+        ball_tracker: BallTracker,
+        frames: Iterator[IngestedFrame],
+        args: argparse.Namespace,
+    ) -> Iterator[FrameResult]:
+        """Process `frames` one at a time in this process
+
+        :param ball_tracker: ball tracker to process frames with
+        :param frames: frames to process
+        :param args: args parsed from analyser parser
+        :return: iterator of frame results
+        """
+        for frame_index, (_, timestamp, frame, full_frame) in enumerate(frames):
+            try:
+                _, ball_potted, pot_count = ball_tracker.process_frame(
+                    frame,
+                    detect_table=(args.crop_frames or args.crop_to_table)
+                    and frame_index == 0,
+                    crop_frames=args.crop_frames,
+                    perform_morph=args.morph,
+                    gate_motion=args.gate_motion,
+                    crop_to_table=args.crop_to_table,
+                    track_table=args.track_table,
+                    classify_view=args.classify_view,
+                    timestamp=timestamp,
+                    full_frame=full_frame,
+                )
+            except ValueError:
+                # no table could be found in this frame
+                yield FrameResult(frame_index, timestamp, False, None, 0)
+                continue
+            if args.classify_view and ball_tracker.view != CameraView.MAIN_TABLE:
+                yield FrameResult(frame_index, timestamp, False, None, 0)
+                continue
+            yield FrameResult(frame_index, timestamp, True, ball_potted, pot_count)
+
+    def run(self, args: argparse.Namespace) -> None:
+        """Run the analyser over every frame of the video as fast as possible
+
+        :param args: args parsed from analyser parser
+        :raises OSError: if `settings` arg failed to load
+        :raises OSError: if `video` arg failed to load
+        """
+        success, _ = s.load(args.settings)
+        if not success:
+            raise OSError(f"Failed to load settings file: {args.settings}")
+
+        try:
+            source = open_frame_source(args.video, fps=args.fps)
+        except (TypeError, OSError) as error:
+            raise OSError(f"Failed to load video file: {args.video}") from error
+
+        ladder = ResolutionLadder(args.low_width, args.width, args.full_res_colour)
+        ingest = FrameIngest(source, ladder, args.decimate)
+        ball_tracker = BallTracker(
+            colour_detection_mode=ColourDetectionMode(args.colour_detection_mode),
+            reuse_buffers=args.reuse_buffers,
+            ladder=ladder,
+        )
+        output_file = args.output or os.path.splitext(args.video)[0] + ".jsonl"
+        sinks: list[EventSink] = [JsonLinesSink(output_file)]
+        if args.npz_output:
+            sinks.append(NpzSink(args.npz_output))
+        if args.track_store:
+            sinks.append(TrackStoreSink(args.track_store))
+        event_writer = EventWriter(sinks)
+        event_recorder = EventRecorder()
+        frame_count = 0
+        fps = FPS()
+
+        def read_frames() -> Iterator[IngestedFrame]:
+            while True:
+                ingested = ingest.read()
+                if ingested is None:
+                    return
+                yield ingested
+
+        pipeline: FramePipeline | None = None
+        if args.workers > 1:
+            pipeline = FramePipeline(
+                ball_tracker,
+                workers=args.workers,
+                crop_frames=args.crop_frames,
+                perform_morph=args.morph,
+                crop_to_table=args.crop_to_table,
+            )
+            results = pipeline.process(
+                (ingested.frame, ingested.timestamp) for ingested in read_frames()
+            )
+        else:
+            results = self.process_frames(ball_tracker, read_frames(), args)
+
+        try:
+            fps.start()
+            for result in results:
+                # frames skipped by decimation still count towards indices
+                frame_index = result.frame_index * ingest.decimation
+                frame_count += 1
+                fps.update()
+                if not result.table_found:
+                    continue
+                event_writer.emit(
+                    event_recorder.record(
+                        ball_tracker,
+                        frame_index,
+                        result.timestamp,
+                        result.ball_potted,
+                        result.pot_count,
+                    )
+                )
+        finally:
+            fps.stop()
+            source.close()
+            event_writer.close()
+
+        print("=================================")
+        print(f"frames processed: {frame_count}")
+        print(f"elapsed time: {fps.elapsed():.2f}s")
+        print(f"throughput: {fps.fps():.2f} frames/s")
+        print(
+            f"frames decoded: {ingest.decoded}, skipped by decimation: "
+            f"{ingest.skipped} (decode {ingest.decode_time * 1000:.1f}ms, "
+            f"resize {ingest.resize_time * 1000:.1f}ms)"
+        )
+        if args.gate_motion:
+            print(
+                f"frames skipped by motion gate: {ball_tracker.motion_gate.skipped}"
+                f"/{frame_count}"
+            )
+        stats = ball_tracker.get_stats()
+        print(
+            f"frame buffers allocated: {stats.buffer_allocations} "
+            f"({stats.buffer_bytes / 1024 ** 2:.1f} MiB)"
+        )
+        print(
+            f"garbage collections: {stats.gc_collections} "
+            f"({stats.gc_time * 1000:.1f}ms)"
+        )
+        print(
+            f"colour detections: {stats.colour_detections}/{frame_count} "
+            f"(interval now {stats.detection_interval})"
+        )
+        if args.track_table:
+            print(
+                f"camera cuts detected: {ball_tracker.cut_detector.cuts}, "
+                f"table views: {len(ball_tracker.table_cache)} "
+                f"({ball_tracker.table_cache.hits} reused, "
+                f"{ball_tracker.table_cache.misses} detected)"
+            )
+        if args.classify_view:
+            view_classifier = ball_tracker.view_classifier
+            views = ", ".join(
+                f"{view.value.lower()} {count}"
+                for view, count in view_classifier.counts.items()
+            )
+            view_time = view_classifier.time / max(view_classifier.classified, 1)
+            print(f"camera views: {views} ({view_time * 1000:.2f}ms per frame)")
+        if pipeline is not None and pipeline.ring_buffer is not None:
+            print(
+                "frame buffer high-water mark: "
+                f"{pipeline.ring_buffer.high_water_mark}/{pipeline.ring_buffer.slots}"
+            )
+        print(f"output written to: {output_file}")
+        if args.npz_output:
+            print(f"columns written to: {args.npz_output}")
+        if args.track_store:
+            print(f"track store written to: {args.track_store}")
+        print("=================================")
+
+
+def main() -> None:
+    analyser = Analyser()
+    parser = analyser.create_parser()
+    args = parser.parse_args()
+    args.video = os.path.abspath(args.video)
+    args.settings = os.path.abspath(args.settings)
+    if args.workers > 1 and args.gate_motion:
+        parser.error("--gate-motion can't be used with more than one worker")
+    if args.workers > 1 and args.track_table:
+        parser.error("--track-table can't be used with more than one worker")
+    if args.workers > 1 and args.classify_view:
+        parser.error("--classify-view can't be used with more than one worker")
+    if args.workers > 1 and args.full_res_colour:
+        parser.error("--full-res-colour can't be used with more than one worker")
+    if (
+        args.full_res_colour
+        and args.colour_detection_mode != ColourDetectionMode.SAMPLE.value
+    ):
+        parser.error("--full-res-colour requires --colour-detection-mode SAMPLE")
+    if args.decimate < 1:
+        parser.error("--decimate must be at least 1")
+
+    try:
+        analyser.run(args)
+    except OSError as ex:
+        parser.exit(1, message=str(ex))
+
+
+if __name__ == "__main__":
+    main()
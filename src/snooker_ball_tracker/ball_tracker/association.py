@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .types import Frame
+
+
+class Association(NamedTuple):
+    matches: list[tuple[int, int]]
+    unmatched_tracks: list[int]
+    unmatched_detections: list[int]
+
+
+def pairwise_distances(first: Frame, second: Frame) -> Frame:
+    """Computes the distance between every position in `first` and every
+    position in `second` in a single vectorised step
+
+    :param first: array of positions with shape (N, 2)
+    :param second: array of positions with shape (M, 2)
+    :return: distance matrix with shape (N, M)
+    """
+    deltas = first[:, np.newaxis, :] - second[np.newaxis, :, :]
+    distances: Frame = np.sqrt(np.einsum("ijk,ijk->ij", deltas, deltas))
+    return distances
+
+
+def associate(tracks: Frame, detections: Frame, max_distance: float) -> Association:
+    """Matches `detections` to `tracks` greedily by distance, so that the closest
+    pairs are matched first and no track or detection is matched more than once
+
+    :param tracks: positions of tracked objects with shape (N, 2)
+    :param detections: positions of new detections with shape (M, 2)
+    :param max_distance: max distance between a track and a detection
+                         for them to be matched
+    :return: matched (track, detection) index pairs, indices of tracks that
+             were not matched and indices of detections that were not matched
+    """
+    track_count, detection_count = len(tracks), len(detections)
+    if track_count == 0 or detection_count == 0:
+        return Association([], list(range(track_count)), list(range(detection_count)))
+
+    distances = pairwise_distances(tracks, detections).ravel()
+    candidates = np.flatnonzero(distances <= max_distance)
+    candidates = candidates[np.argsort(distances[candidates], kind="stable")]
+
+    matched_tracks = np.zeros(track_count, dtype=bool)
+    matched_detections = np.zeros(detection_count, dtype=bool)
+    matches: list[tuple[int, int]] = []
+    for track, detection in zip(*np.divmod(candidates, detection_count)):
+        if matched_tracks[track] or matched_detections[detection]:
+            continue
+        matched_tracks[track] = matched_detections[detection] = True
+        matches.append((int(track), int(detection)))
+        if len(matches) == min(track_count, detection_count):
+            break
+
+    return Association(
+        matches,
+        np.flatnonzero(~matched_tracks).tolist(),
+        np.flatnonzero(~matched_detections).tolist(),
+    )
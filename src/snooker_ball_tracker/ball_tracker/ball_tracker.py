@@ -6,13 +6,26 @@ from typing import Any
 import cv2
 import numpy as np
 
-from snooker_ball_tracker.enums import SnookerColour
-
-from .logger import Logger
+from snooker_ball_tracker.enums import CameraView, ColourDetectionMode, SnookerColour
+from snooker_ball_tracker.settings import settings as s
+
+from .association import associate
+from .cadence import CadencePolicy, CadenceState, create_cadence_policy
+from .colour_classifier import ColourClassifier
+from .cut_detector import CutDetector
+from .frame_arena import FrameArena
+from .ingest import ResolutionLadder
+from .motion_gate import MotionGate
+from .overlay import OVERLAY_GREEN, OVERLAY_WHITE, Overlay
 from .settings import BallDetectionSettings, ColourDetectionSettings
+from .shot_state import ShotStateMachine, create_shot_state_machine
 from .snapshot import SnapShot
-from .types import Frame, Image, Keypoints
-from .util import dist_between_two_balls, get_mask_contours_for_colour
+from .stats import GCMonitor, ProcessingStats
+from .table_cache import TableCache, TableView
+from .tracking import BallTracks
+from .types import BallAssociation, Frame, Image, Keypoints
+from .util import MM_PER_PIXEL, keypoints_to_array, offset_keypoints
+from .view_classifier import ViewClassifier
 
 
 def max_table_bound(el: Frame) -> Frame:
@@ -78,25 +91,46 @@ def setup_blob_detector(ball_tracker: BallTracker, **kwargs: dict[str, Any]) ->
 class BallTracker:
     def __init__(
         self,
-        logger: Logger | None = None,
         colour_settings: ColourDetectionSettings | None = None,
         ball_settings: BallDetectionSettings | None = None,
+        colour_detection_mode: ColourDetectionMode = ColourDetectionMode.CONTOUR,
+        windowed_detection: bool = True,
+        reuse_buffers: bool = False,
+        cadence: CadencePolicy | None = None,
+        shot_state: ShotStateMachine | None = None,
+        ladder: ResolutionLadder | None = None,
         **kwargs: dict[str, Any],
     ) -> None:
         """Creates an instance of BallTracker that detects balls in images
         provided to it and maps colours to each ball detected.
 
-        :param logger: logger that contains snapshots to log to, defaults to None
         :param colour_settings: colour detection settings instance, defaults to None
         :param ball_settings: ball detection settings instance, defaults to None
+        :param colour_detection_mode: how detected balls are mapped to colours,
+                                      either by testing them against colour
+                                      contours or by sampling the pixels they
+                                      cover, defaults to CONTOUR
+        :param windowed_detection: between colour detections, only search for
+                                   balls around where they are predicted to be,
+                                   defaults to True
+        :param reuse_buffers: write intermediate and output frames into buffers
+                              that are allocated on the first frame and reused
+                              for every later frame, so frames returned by
+                              `process_frame` are only valid until it is
+                              called again, defaults to False
+        :param cadence: policy that decides which frames go through colour
+                        detection, defaults to the policy selected by
+                        s.DETECTION_CADENCE_SETTINGS
+        :param shot_state: state machine that determines when shots start and
+                           finish from snapshots, defaults to a state machine
+                           configured by s.SHOT_DETECTION_SETTINGS
+        :param ladder: resolutions frames are processed at, where the low rung
+                       is used for motion gating and table detection,
+                       defaults to processing everything at the resolution
+                       of the frames passed to `process_frame`
         :param **kwargs: dictionary of options to use to configure
                          the underlying blob detector to detect balls with
         """
-        self.logger = logger or Logger()
-        self.__last_shot_snapshot = self.logger.last_shot_snapshot
-        self.__cur_shot_snapshot = self.logger.cur_shot_snapshot
-        self.__temp_snapshot = self.logger.temp_snapshot
-        self.__white_status_setter = self.logger.set_white_status
         self.blob_detector: cv2.SimpleBlobDetector = cv2.SimpleBlobDetector_create()
         self.colour_settings = colour_settings or ColourDetectionSettings()
         self.ball_settings = ball_settings or BallDetectionSettings()
@@ -104,11 +138,114 @@ class BallTracker:
             partial(setup_blob_detector, self, **kwargs)
         )
         setup_blob_detector(self, **kwargs)
+        self.colour_classifier = ColourClassifier(self.colour_settings)
+        self.colour_detection_mode = colour_detection_mode
+        self.windowed_detection = windowed_detection
+        self.tracks = BallTracks()
+        self.cadence = cadence or create_cadence_policy(s.DETECTION_CADENCE_SETTINGS)
+        self.shot_state = shot_state or create_shot_state_machine(
+            s.SHOT_DETECTION_SETTINGS
+        )
+        self.colour_settings.coloursChanged.connect(self.colour_classifier.invalidate)
         self.table_bounds: Frame | None = None
+        self.table_roi: tuple[int, int, int, int] | None = None
         self.table_bounds_mask: Frame | None = None
         self.__keypoints: Keypoints = {}
+        self.last_association = BallAssociation([], [], [])
+        self.overlay = Overlay()
+        self.ladder = ladder or ResolutionLadder()
+        self.motion_gate = (
+            MotionGate(self.ladder.low) if self.ladder.low else MotionGate()
+        )
+        self.cut_detector = CutDetector()
+        self.table_cache = TableCache()
+        self.view_classifier = ViewClassifier()
+        self.view: CameraView | None = None
+        self.__table_fingerprint: Frame | None = None
+        self.arena = FrameArena() if reuse_buffers else None
+        self.morph_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
+        self.__gc_monitor = GCMonitor()
+        self.__frames_processed = 0
+        self.__gray_table_bounds_mask: Frame | None = None
+        self.__gray_table_bounds_mask_source: Frame | None = None
+        self.__last_image: Image | None = None
         self.__image_counter = 0
-        self.__shot_in_progess = False
+        self.__frames_applied = 0
+        self.__reacquire = False
+
+    @property
+    def keypoints(self) -> Keypoints:
+        """Balls detected in the last processed frame
+
+        :return: dict of colour and ball list pairs
+        """
+        return self.__keypoints
+
+    @property
+    def shot_in_progress(self) -> bool:
+        """True if a shot has started and not finished yet
+
+        :return: shot in progress
+        """
+        return self.shot_state.shot_in_progress
+
+    @property
+    def white_status(self) -> bool:
+        """True if the white ball was moving when last checked
+
+        :return: white status
+        """
+        return self.shot_state.white_moving
+
+    @property
+    def last_shot_snapshot(self) -> SnapShot:
+        """Snapshot of the balls on the table before the last shot
+
+        :return: last shot snapshot
+        """
+        return self.shot_state.last_shot_snapshot
+
+    @property
+    def cur_shot_snapshot(self) -> SnapShot:
+        """Snapshot of the balls on the table during the current shot
+
+        :return: current shot snapshot
+        """
+        return self.shot_state.cur_shot_snapshot
+
+    def cadence_state(self) -> CadenceState:
+        """Get the state of the tracker that cadence policies decide when to
+        run colour detection from
+
+        :return: cadence state
+        """
+        velocities = self.tracks.velocities
+        return CadenceState(
+            shot_in_progress=self.shot_state.shot_in_progress,
+            white_moving=self.shot_state.white_moving,
+            lost=self.tracks.lost,
+            max_speed=float(
+                np.hypot(velocities[:, 0], velocities[:, 1]).max(initial=0)
+            ),
+        )
+
+    def get_stats(self) -> ProcessingStats:
+        """Get stats about the frames processed by `process_frame` so far
+
+        :return: number of frames processed, number and total size of reused
+                 buffers allocated, number of garbage collections and time
+                 spent in them while processing frames, and number of colour
+                 detections and the current detection interval
+        """
+        return ProcessingStats(
+            frames=self.__frames_processed,
+            buffer_allocations=self.arena.allocations if self.arena else 0,
+            buffer_bytes=self.arena.nbytes if self.arena else 0,
+            gc_collections=self.__gc_monitor.collections,
+            gc_time=self.__gc_monitor.time,
+            colour_detections=self.cadence.detections,
+            detection_interval=self.cadence.interval,
+        )
 
     def get_snapshot_report(self) -> str:
         """Creates a report of  snapshots to show the difference between them
@@ -119,14 +256,14 @@ class BallTracker:
         report = "--------------------------------------\n"
         report += "PREVIOUS SNAPSHOT | CURRENT SNAPSHOT \n"
         report += "------------------|-------------------\n"
-        for colour in self.__last_shot_snapshot.colours:
+        for colour in self.last_shot_snapshot.colours:
             prev_ball_status = (
-                f"{colour.lower()}s: {self.__last_shot_snapshot.colours[colour].count}"
+                f"{colour.lower()}s: {self.last_shot_snapshot.count(colour)}"
             )
             while len(prev_ball_status) < 17:
                 prev_ball_status += " "
             cur_ball_status = (
-                f"{colour.lower()}s: {self.__cur_shot_snapshot.colours[colour].count}"
+                f"{colour.lower()}s: {self.cur_shot_snapshot.count(colour)}"
             )
             report += prev_ball_status + " | " + cur_ball_status + "\n"
         report += "--------------------------------------\n"
@@ -138,46 +275,78 @@ class BallTracker:
         :param frame: frame to process
         :param balls: list of balls to draw onto `frame`
         """
-        for ball_colour, ball_list in balls.items():
-            for ball in ball_list:
-                cv2.putText(
-                    frame,
-                    ball_colour,
-                    (int(ball.pt[0] + 10), int(ball.pt[1])),
-                    0,
-                    0.6,
-                    (0, 255, 0),
-                    thickness=2,
-                )
-                cv2.circle(
-                    frame,
-                    (int(ball.pt[0]), int(ball.pt[1])),
-                    int(ball.size / 2),
-                    (0, 255, 0),
-                )
+        overlay = Overlay()
+        overlay.add_balls(balls)
+        overlay.render(frame)
+
+    def associate_balls(
+        self,
+        balls: Keypoints,
+        cur_balls: list[cv2.KeyPoint],
+        positions: Frame | None = None,
+    ) -> BallAssociation:
+        """Matches `cur_balls` against previously detected `balls`
+
+        The positions of all balls are gathered into arrays so every pairwise
+        distance is computed in one step, then balls are matched greedily by
+        distance so that no two new balls can claim the same previous ball
+
+        :param balls: balls that were detected previously
+        :param cur_balls: list of newly detected balls
+        :param positions: positions to use for `balls` instead of their last
+                          detected positions, such as positions predicted by a
+                          motion model, in the same order as `balls`,
+                          defaults to None
+        :return: matched balls as (colour, index, new ball) triplets, previous
+                 balls that were not matched as (colour, index) pairs and
+                 new balls that did not match any previous ball
+        """
+        tracked = [
+            (ball_colour, i)
+            for ball_colour, ball_list in balls.items()
+            for i in range(len(ball_list))
+        ]
+        if positions is None or len(positions) != len(tracked):
+            positions = keypoints_to_array(balls[colour][i] for colour, i in tracked)
+        association = associate(
+            positions * MM_PER_PIXEL,
+            keypoints_to_array(cur_balls) * MM_PER_PIXEL,
+            max_distance=0.3,
+        )
+        return BallAssociation(
+            matched=[
+                (*tracked[track], cur_balls[detection])
+                for track, detection in association.matches
+            ],
+            unmatched=[tracked[track] for track in association.unmatched_tracks],
+            new=[
+                cur_balls[detection] for detection in association.unmatched_detections
+            ],
+        )
 
-    def update_balls(self, balls: Keypoints, cur_balls: Keypoints) -> Keypoints:
-        """Updates `balls` with previously detected `cur_balls`
+    def update_balls(
+        self,
+        balls: Keypoints,
+        cur_balls: list[cv2.KeyPoint],
+        positions: Frame | None = None,
+    ) -> Keypoints:
+        """Updates `balls` with newly detected `cur_balls`
         If a ball from `cur_balls` is close enough to a ball in `balls`,
         it is deemed to be the same ball and the ball in `balls` is updated
-        with the ball colour info from `cur_balls`
-
-        :param balls: list of newly detected balls
-        :param cur_balls: list of balls that are were detected previously
-        :return: list of newly detected balls mapped to their appropriate colours
-        """
-        for cur_ball in cur_balls:
-            matched = False
-            for ball_colour in balls:
-                if not matched:
-                    for i, ball in enumerate(balls[ball_colour]):
-                        dist = dist_between_two_balls(cur_ball, ball)
-                        if dist <= 0.3:
-                            balls[ball_colour][i] = cur_ball
-                            matched = True
-                            break
-                else:
-                    break
+        with the position of the ball from `cur_balls`
+
+        The association used for the update is stored in `last_association`
+
+        :param balls: list of balls that were detected previously
+        :param cur_balls: list of newly detected balls
+        :param positions: positions to match `cur_balls` against instead of
+                          the last detected positions of `balls`,
+                          defaults to None
+        :return: `balls` updated with the positions of newly detected balls
+        """
+        self.last_association = self.associate_balls(balls, cur_balls, positions)
+        for ball_colour, i, cur_ball in self.last_association.matched:
+            balls[ball_colour][i] = cur_ball
         return balls
 
     def process_frame(
@@ -189,85 +358,428 @@ class BallTracker:
         perform_morph: bool = False,
         detect_colour: str | None = None,
         mask_colour: bool = False,
+        gate_motion: bool = False,
+        crop_to_table: bool = False,
+        track_table: bool = False,
+        classify_view: bool = False,
+        timestamp: float | None = None,
+        full_frame: Frame | None = None,
     ) -> tuple[Image, str | None, int]:
         """Process `frame` to detect/track balls, determine if a shot has
         started/finished and determine if a ball was potted
 
-        We store 3 different Snapshots:
-        - Previous shot SnapShot
-        - Current shot SnapShot
-        - Temporary shot SnapShot
-
-        The `Last shot SnapShot` stores info about the state of the table
-        of the last shot taken
-
-        The `Current shot SnapShot` stores info about the state of the table
-        currently in play before the shot is taken
-
-        The `Temporary SnapShot` is used to determine when a shot has
-        started and finished, which is determined by comparing the
-        Temporary SnapShot with the Current SnapShot
+        Every ball detected in `frame` is stored in a `SnapShot`, which holds
+        the colour, position, size and movement of each ball as a row of a
+        single array. The snapshot is passed to `shot_state` together with
+        `timestamp`, which measures the speed of the white against earlier
+        snapshots to determine when a shot starts and finishes, and compares
+        the balls on the table once a shot has finished with the snapshot
+        taken before it started to determine which balls were potted
 
         :param frame: frame to process
         :param show_threshold: if True return a binary version of `frame`,
                                defaults to False
+        :param gate_motion: if True skip ball detection when nothing has moved
+                            on the table since the last processed frame,
+                            defaults to False
+        :param crop_to_table: if True and the table boundary has been detected,
+                              only process the bounding rectangle of the table
+                              in `frame`. Balls are still in `frame` coordinates,
+                              but the binary and HSV frames that are returned
+                              only cover `table_roi`, defaults to False
+        :param track_table: if True detect camera cuts and switch to the table
+                            boundary of the new camera view, which is only
+                            detected from `frame` if the view hasn't been seen
+                            before, defaults to False
+        :param classify_view: if True determine what the camera is showing in
+                              `frame` and store it in `view`, and skip every
+                              frame that isn't of the main table view, which
+                              is returned as it is with a black binary frame,
+                              defaults to False
+        :param timestamp: presentation timestamp of `frame` in the video in
+                          seconds, which shot start and finish are measured
+                          against, defaults to the number of frames applied
+                          so far divided by the frame rate of `shot_state`
+        :param full_frame: full resolution frame that `frame` was downscaled
+                           from, which ball colours are sampled from when
+                           mapping colours by sampling, defaults to None
         :return: processed frame, ball potted if any were and the number
-                                  of balls potted
+                                  of balls potted. Nothing is drawn onto the
+                                  processed frame, the table boundary and
+                                  detected balls are described by `overlay`
+                                  instead, to be drawn only if it is displayed
         """
+        with self.__gc_monitor:
+            result = self.__process_frame(
+                frame,
+                show_threshold,
+                detect_table,
+                crop_frames,
+                perform_morph,
+                detect_colour,
+                mask_colour,
+                gate_motion,
+                crop_to_table,
+                track_table,
+                classify_view,
+                timestamp,
+                full_frame,
+            )
+        self.__frames_processed += 1
+        return result
+
+    def __process_frame(
+        self,
+        frame: Frame,
+        show_threshold: bool,
+        detect_table: bool,
+        crop_frames: bool,
+        perform_morph: bool,
+        detect_colour: str | None,
+        mask_colour: bool,
+        gate_motion: bool,
+        crop_to_table: bool,
+        track_table: bool,
+        classify_view: bool,
+        timestamp: float | None,
+        full_frame: Frame | None,
+    ) -> tuple[Image, str | None, int]:
+        """Implementation of `process_frame`, see `process_frame` for details"""
         ball_potted: str | None = None
         pot_count = 0
 
+        # Close-ups, crowd shots and other views don't show the table as a whole,
+        # so balls are not detected in them
+        if classify_view and not detect_table:
+            self.view = self.__classify_view(frame)
+            if self.view != CameraView.MAIN_TABLE:
+                return self.__skip_frame(frame, show_threshold), ball_potted, pot_count
+
+        if track_table:
+            detect_table = self.__update_table_view(frame, detect_table)
+
+        # Once the table has been found, only its bounding rectangle is processed
+        roi = self.table_roi if crop_to_table and not detect_table else None
+
+        # Skip detection if nothing has moved on the table since the last
+        # processed frame, reusing the previous balls and snapshot state.
+        # Frames are never skipped while a shot is in progress, so that
+        # the end of the shot and any potted balls are always detected
+        if gate_motion and self.__last_image is not None:
+            if not self.motion_gate.should_process(
+                frame,
+                self.table_bounds_mask,
+                force=detect_table or self.shot_state.shot_in_progress,
+            ):
+                last_image = self.__last_image
+                if crop_frames and self.table_bounds is not None:
+                    frame = self.fill(frame, dst=self.__buffer("frame", frame))
+                frame = self.__get_output(
+                    frame,
+                    last_image.binary_frame,
+                    last_image.hsv_frame,
+                    show_threshold,
+                    detect_colour,
+                    mask_colour,
+                    crop_frames,
+                    roi,
+                )
+                # skipped frames still count towards timestamps derived from
+                # the number of frames applied and towards the interval
+                # between colour detections
+                self.__frames_applied += 1
+                self.cadence.record(False, self.cadence_state())
+                return (
+                    Image(frame, last_image.binary_frame, last_image.hsv_frame),
+                    ball_potted,
+                    pot_count,
+                )
+
+        if roi is None:
+            frame, threshold, hsv = self.prepare_frame(
+                frame,
+                detect_table=detect_table,
+                crop_frames=crop_frames,
+                perform_morph=perform_morph,
+            )
+            if track_table and detect_table:
+                self.__store_table_view()
+            origin = (0, 0)
+        else:
+            # the binary and HSV frames only cover the table, while the
+            # output frame is still the whole of `frame`
+            _, threshold, hsv = self.prepare_frame(
+                self.crop(frame),
+                crop_frames=crop_frames,
+                perform_morph=perform_morph,
+                fill_frame=False,
+            )
+            if crop_frames:
+                frame = self.fill(frame, dst=self.__buffer("frame", frame))
+            origin = roi[:2]
+
+        # Run the colour detection phase when the cadence policy asks for it,
+        # otherwise just update ball positions
+        predicted = self.tracks.predict()
+        if (
+            self.__image_counter == 0
+            or self.__reacquire
+            or self.cadence.should_detect(self.cadence_state())
+        ):
+            balls = self.perform_colour_detection(
+                threshold,
+                hsv,
+                full_frame,
+                full_frame.shape[1] / frame.shape[1] if full_frame is not None else 1.0,
+                origin,
+            )
+            offset_keypoints(
+                (ball for ball_list in balls.values() for ball in ball_list), origin
+            )
+            ball_potted, pot_count = self.apply_colour_detection(
+                balls, predicted, timestamp
+            )
+        else:
+            # Only search the windows around where balls are predicted to be,
+            # unless a ball has been lost or it is time to re-acquire balls
+            full_detection = (
+                not self.windowed_detection or self.tracks.needs_full_detection()
+            )
+            if full_detection:
+                cur_keypoints = self.blob_detector.detect(threshold)
+            else:
+                cur_keypoints = self.detect_in_windows(
+                    threshold, self.tracks.search_windows(threshold.shape, origin)
+                )
+            offset_keypoints(cur_keypoints, origin)
+            self.apply_detection(cur_keypoints, predicted, full_detection)
+
+        frame = self.__get_output(
+            frame,
+            threshold,
+            hsv,
+            show_threshold,
+            detect_colour,
+            mask_colour,
+            crop_frames,
+            roi,
+        )
+        self.__last_image = Image(frame, threshold, hsv)
+
+        return self.__last_image, ball_potted, pot_count
+
+    def prepare_frame(
+        self,
+        frame: Frame,
+        detect_table: bool = False,
+        crop_frames: bool = False,
+        perform_morph: bool = False,
+        fill_frame: bool = True,
+    ) -> Image:
+        """Obtain the binary and HSV versions of `frame` that balls are
+        detected from
+
+        This does not depend on any previously processed frame other than
+        through the table boundary, so it can run on frames out of order.
+        `frame` itself is never modified
+
+        :param frame: frame to process
+        :param detect_table: if True detect the table boundary from `frame`,
+                             defaults to False
+        :param crop_frames: if True fill everything outside the table boundary,
+                            defaults to False
+        :param perform_morph: if True perform opening morphology on the binary
+                              frame, defaults to False
+        :param fill_frame: if False only fill the binary and HSV frames when
+                           `crop_frames` is True, for callers that don't use
+                           the returned `frame`, defaults to True
+        :raises ValueError: if the table cloth could not be found in `frame`
+        :return: `frame`, filled if `crop_frames` and `fill_frame` are True,
+                 single channel binary frame and HSV frame
+        """
         # convert frame into HSV colour space
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        hsv: Frame = cv2.cvtColor(
+            frame, cv2.COLOR_BGR2HSV, dst=self.__buffer("hsv", frame)
+        )
 
         # get mask of table cloth colour
-        mask, contours = get_mask_contours_for_colour(
-            hsv, SnookerColour.TABLE, self.colour_settings.colours
-        )
-        if mask is None:
+        colours = self.colour_settings.colours
+        if SnookerColour.TABLE not in colours:
             raise ValueError("no mask found")
-        if not contours:
+        mask: Frame = cv2.inRange(
+            hsv,
+            colours[SnookerColour.TABLE]["LOWER"],
+            colours[SnookerColour.TABLE]["UPPER"],
+            dst=self.__buffer("threshold", frame, channels=1),
+        )
+        # the mask has contours if and only if it has any non zero pixels
+        if cv2.countNonZero(mask) == 0:
             raise ValueError("no contours found")
 
-        threshold: Frame = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
-        threshold = cv2.bitwise_not(threshold)
-
-        # perform closing morphology if `morph` is True
-        if perform_morph:
-            kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
-            threshold = cv2.morphologyEx(threshold, cv2.MORPH_OPEN, kernel)
-
         # get the bounds of the table
         if detect_table:
-            self.create_table_boundary(frame, contours)
+            self.create_table_boundary(frame, self.__find_table_contours(mask))
 
-        # draw the bounds of the table if we have it
-        if self.table_bounds is not None and not crop_frames:
-            cv2.drawContours(frame, [self.table_bounds], -1, (255, 255, 255), 3)
+        # the binary frame stays single channel, balls are white on black
+        threshold: Frame = cv2.bitwise_not(mask, dst=mask)
+
+        # perform closing morphology if `morph` is True
+        if perform_morph:
+            threshold = cv2.morphologyEx(
+                threshold,
+                cv2.MORPH_OPEN,
+                self.morph_kernel,
+                dst=self.__buffer("morph", frame, channels=1),
+            )
 
         # fill frame, hsv and threshold
         if crop_frames and self.table_bounds is not None:
-            frame = self.fill(frame)
-            hsv = self.fill(hsv)
-            threshold = self.fill(threshold)
+            if fill_frame:
+                frame = self.fill(frame, dst=self.__buffer("frame", frame))
+            hsv = self.fill(hsv, dst=hsv)
+            threshold = self.fill(threshold, dst=threshold)
 
-        # Every 5 images run the colour detection phase,
-        # otherwise just update ball positions
-        if self.__image_counter == 0 or self.__image_counter % 5 == 0:
-            self.__keypoints = self.perform_colour_detection(threshold, hsv)
-        else:
-            cur_keypoints = self.blob_detector.detect(threshold)
-            self.update_balls(self.__keypoints, cur_keypoints)
+        return Image(frame, threshold, hsv)
+
+    def __find_table_contours(self, mask: Frame) -> list[Frame]:
+        """Find the contours of the table cloth in `mask`, which is downscaled
+        to the low rung of `ladder` first
+
+        :param mask: mask of the table cloth colour
+        :return: contours in the coordinates of `mask`
+        """
+        width = self.ladder.low
+        if width is None or width >= mask.shape[1]:
+            contours, _ = cv2.findContours(
+                mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE
+            )
+            return list(contours)
+
+        height = max(int(mask.shape[0] * width / mask.shape[1]), 1)
+        small = cv2.resize(mask, (width, height), interpolation=cv2.INTER_NEAREST)
+        contours, _ = cv2.findContours(small, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+        scale = np.array(
+            [mask.shape[1] / width, mask.shape[0] / height], dtype=np.float64
+        )
+        return [np.round(contour * scale).astype(np.int32) for contour in contours]
+
+    def apply_colour_detection(
+        self,
+        balls: Keypoints,
+        predicted: Frame | None = None,
+        timestamp: float | None = None,
+    ) -> tuple[str | None, int]:
+        """Replace the tracked balls with balls from a colour detection and run
+        the snapshot phase to determine if a shot has started/finished and if
+        any balls were potted
+
+        Frames must be applied in order, as this updates the tracks and snapshots
+
+        :param balls: dict of colour and ball list pairs
+        :param predicted: positions already predicted for this frame by
+                          `tracks`, defaults to None
+        :param timestamp: presentation timestamp of the frame in seconds,
+                          defaults to the number of frames applied so far
+                          divided by the frame rate of `shot_state`
+        :return: ball potted if any were and the number of balls potted
+        """
+        if predicted is None:
+            self.tracks.predict()
+        self.__keypoints = balls
+        self.tracks.reset(self.__keypoints)
+        ball_potted, pot_count = self.__update_snapshots(timestamp)
+        self.__image_counter += 1
+        self.__frames_applied += 1
+        self.cadence.record(True, self.cadence_state())
+        return ball_potted, pot_count
+
+    def apply_detection(
+        self,
+        cur_balls: list[cv2.KeyPoint],
+        predicted: Frame | None = None,
+        full_detection: bool = True,
+    ) -> None:
+        """Update the positions of tracked balls with newly detected balls
+
+        Frames must be applied in order, as this updates the tracks
+
+        :param cur_balls: list of newly detected balls
+        :param predicted: positions already predicted for this frame by
+                          `tracks`, defaults to None
+        :param full_detection: True if the whole frame was searched for balls,
+                               defaults to True
+        """
+        if predicted is None:
+            predicted = self.tracks.predict()
+        self.update_balls(self.__keypoints, cur_balls, predicted)
+        self.tracks.update(self.last_association, full_detection)
+        self.__image_counter += 1
+        self.__frames_applied += 1
+        self.cadence.record(False, self.cadence_state())
 
-        if self.__image_counter == 0:
-            self.__cur_shot_snapshot.assign_balls_from_dict(self.__keypoints)
-            self.__last_shot_snapshot.assign_balls_from_dict(self.__keypoints)
+    def __update_snapshots(self, timestamp: float | None) -> tuple[str | None, int]:
+        """Take a snapshot of the current balls and pass it to `shot_state`,
+        snapshots are never modified once taken so they are swapped by reference
+
+        :param timestamp: presentation timestamp of the frame in seconds
+        :return: ball potted if any were and the number of balls potted
+        """
+        snapshot = SnapShot(self.__keypoints)
+        # balls are compared from the new camera view after a cut, unless a
+        # shot is in progress, as its pots are found by comparing with the
+        # balls from before it started
+        if self.__image_counter == 0 or (
+            self.__reacquire and not self.shot_state.shot_in_progress
+        ):
+            self.shot_state.reset(snapshot)
+        self.__reacquire = False
+        if timestamp is None:
+            timestamp = self.__frames_applied / self.shot_state.fps
+        return self.shot_state.update(snapshot, timestamp)
+
+    def __get_output(
+        self,
+        frame: Frame,
+        threshold: Frame,
+        hsv: Frame,
+        show_threshold: bool,
+        detect_colour: str | None,
+        mask_colour: bool,
+        crop_frames: bool,
+        roi: tuple[int, int, int, int] | None = None,
+    ) -> Frame:
+        """Get the output frame and describe the table boundary, detected balls
+        and the colour being detected in `overlay`, which is only drawn when
+        the output frame is displayed
+
+        :param frame: processed frame, which is returned as it is unless
+                      `show_threshold` or `mask_colour` is True
+        :param threshold: single channel binary version of `frame`
+        :param hsv: HSV version of `frame`
+        :param show_threshold: if True output `threshold` instead of `frame`
+        :param detect_colour: colour to outline if not None
+        :param mask_colour: if True only show `detect_colour` in the output frame
+        :param crop_frames: if True the table boundary is not outlined
+        :param roi: (x, y, width, height) region of `frame` that `threshold` and
+                    `hsv` cover if they don't cover the whole of it,
+                    defaults to None
+        :return: output frame
+        """
+        overlay = Overlay()
 
         # Swap output frame with binary frame if show threshold is True
         if show_threshold:
-            frame = threshold
+            if roi is None:
+                frame = cv2.cvtColor(
+                    threshold, cv2.COLOR_GRAY2BGR, dst=self.__buffer("output", frame)
+                )
+            else:
+                frame = self.__uncrop(threshold, frame.shape, roi, "output")
+        # outline the bounds of the table if we have it
+        elif self.table_bounds is not None and not crop_frames:
+            overlay.add_contours([self.table_bounds], OVERLAY_WHITE, 3)
 
-        # Draw contours around a colour to detect if not None
+        # Outline a colour to detect if not None
         if detect_colour:
             colour_mask, contours = self.detect_colour(
                 hsv,
@@ -277,68 +789,62 @@ class BallTracker:
 
             # Show only the detected colour in the output frame
             if mask_colour:
-                frame = cv2.bitwise_and(frame, frame, mask=colour_mask)
+                if roi is not None:
+                    colour_mask = self.__uncrop(
+                        colour_mask, frame.shape[:2], roi, "colour_mask"
+                    )
+                frame = cv2.bitwise_and(
+                    frame, frame, mask=colour_mask, dst=self.__buffer("masked", frame)
+                )
 
-            cv2.drawContours(frame, contours, -1, (0, 255, 0), 2)
+            overlay.add_contours(
+                contours,
+                OVERLAY_GREEN,
+                2,
+                offset=roi[:2] if roi is not None else (0, 0),
+            )
 
-        # Draw only the balls for the detected colour
+        # Only show the balls for the detected colour
         # if we are only showing the detected colour
         if (
             detect_colour
             and detect_colour in self.colour_settings.settings["BALL_COLOURS"]
             and mask_colour
         ):
-            self.draw_balls(frame, {detect_colour: self.__keypoints[detect_colour]})
+            overlay.add_balls({detect_colour: self.__keypoints[detect_colour]})
         else:
-            # Otherwise just draw all detected balls
-            self.draw_balls(frame, self.__keypoints)
-
-        # Every 5 images run the snapshot comparision/generation phase
-        if self.__image_counter == 0 or self.__image_counter % 5 == 0:
-            ball_status = None
-
-            self.__temp_snapshot.assign_balls_from_dict(self.__keypoints)
-
-            if not self.__shot_in_progess:
-                self.__shot_in_progess = self.has_shot_started(
-                    self.__temp_snapshot, self.__cur_shot_snapshot
-                )
+            # Otherwise just show all detected balls
+            overlay.add_balls(self.__keypoints)
 
-            if self.__shot_in_progess:
-                if self.has_shot_finished(
-                    self.__temp_snapshot, self.__cur_shot_snapshot
-                ):
-                    for ball_colour in self.__last_shot_snapshot.colours:
-                        count = self.__last_shot_snapshot.compare_ball_diff(
-                            ball_colour, self.__temp_snapshot
-                        )
-                        if ball_colour != "WHITE" and count > 0:
-                            ball_potted = ball_colour
-                            pot_count = count
-                            ball_status = "Potted {} {}/s".format(
-                                pot_count, ball_potted.lower()
-                            )
-
-                    if ball_status is not None:
-                        print(ball_status)
-                    print("===========================================\n")
-                    self.__last_shot_snapshot.assign_balls_from_snapshot(
-                        self.__cur_shot_snapshot
-                    )
-                    self.__shot_in_progess = False
+        self.overlay = overlay
+        return frame
 
-                if self.__cur_shot_snapshot.white and self.__temp_snapshot.white:
-                    self.__cur_shot_snapshot.white.is_moving = (
-                        self.__temp_snapshot.white.is_moving
-                    )
-            self.__cur_shot_snapshot.assign_balls_from_snapshot(self.__temp_snapshot)
+    def detect_in_windows(
+        self, binary_frame: Frame, windows: list[tuple[int, int, int, int]]
+    ) -> list[cv2.KeyPoint]:
+        """Detects balls only inside `windows` of `binary_frame`
 
-        self.__image_counter += 1
-
-        return Image(frame, threshold, hsv), ball_potted, pot_count
+        :param binary_frame: binary frame where detected balls are
+                             white on a black background
+        :param windows: list of (left, top, right, bottom) regions to search
+        :return: list of keypoints in the coordinates of `binary_frame`
+        """
+        keypoints = []
+        for left, top, right, bottom in windows:
+            for keypoint in self.blob_detector.detect(
+                binary_frame[top:bottom, left:right]
+            ):
+                keypoint.pt = (keypoint.pt[0] + left, keypoint.pt[1] + top)
+                keypoints.append(keypoint)
+        return keypoints
 
     def perform_colour_detection(
-        self, binary_frame: Frame, hsv_frame: Frame
+        self,
+        binary_frame: Frame,
+        hsv_frame: Frame,
+        full_frame: Frame | None = None,
+        scale: float = 1.0,
+        origin: tuple[int, int] = (0, 0),
     ) -> Keypoints:
         """Performs the colour detection process
 
@@ -348,6 +854,13 @@ class BallTracker:
         :param binary_frame: binary frame where detected balls are
                              white on a black background
         :param hsv_frame: HSV frame to detect colours with
+        :param full_frame: full resolution BGR frame to sample ball colours from
+                           instead of `hsv_frame`, which is only used when
+                           mapping colours by sampling, defaults to None
+        :param scale: scale from the frame `binary_frame` was taken from to
+                      `full_frame`, defaults to 1.0
+        :param origin: position of `binary_frame` in the frame it was cropped
+                       from, defaults to (0, 0)
         :return: list of keypoints mapped to an appropriate colour
                  found in `binary_frame`
         """
@@ -355,23 +868,9 @@ class BallTracker:
             colour: list() for colour in self.colour_settings.settings["BALL_COLOURS"]
         }
 
-        colour_contours: Keypoints = {
-            colour: list() for colour in self.colour_settings.settings["BALL_COLOURS"]
-        }
-
         # Detect balls in the binary image (White circles on a black background)
         keypoints = self.blob_detector.detect(binary_frame)
 
-        # Obtain colours contours for each ball colour from the
-        # HSV colour space of the image
-        for colour, properties in self.colour_settings.settings["BALL_COLOURS"].items():
-            if properties["DETECT"]:
-                _, contours = get_mask_contours_for_colour(
-                    hsv_frame, colour, self.colour_settings.colours
-                )
-                if contours:
-                    colour_contours[colour] = contours
-
         def order_value(colour: str) -> int:
             val: int = self.colour_settings.settings["BALL_COLOURS"][colour]["ORDER"]
             return val
@@ -382,6 +881,48 @@ class BallTracker:
             key=order_value,
         )
 
+        # Sample the pixels covered by each ball to determine its colour,
+        # without building colour contours for the whole frame
+        if self.colour_detection_mode == ColourDetectionMode.SAMPLE:
+            detect_colours = [
+                colour
+                for colour in colours
+                if self.colour_settings.settings["BALL_COLOURS"][colour]["DETECT"]
+            ]
+            for keypoint in keypoints:
+                if full_frame is None:
+                    ball_colour = self.colour_classifier.classify_keypoint(
+                        hsv_frame, keypoint, detect_colours
+                    )
+                else:
+                    ball_colour = self.colour_classifier.classify_keypoint_roi(
+                        full_frame,
+                        cv2.KeyPoint(
+                            keypoint.pt[0] + origin[0],
+                            keypoint.pt[1] + origin[1],
+                            keypoint.size,
+                        ),
+                        detect_colours,
+                        scale,
+                    )
+                if ball_colour is not None:
+                    balls[ball_colour].append(keypoint)
+            return balls
+
+        colour_contours: Keypoints = {
+            colour: list() for colour in self.colour_settings.settings["BALL_COLOURS"]
+        }
+
+        # Label every pixel of the HSV frame with the ball colours it
+        # matches in a single pass, then obtain the colour contours for
+        # each ball colour from that label image
+        labels = self.colour_classifier.classify(hsv_frame)
+        for colour, properties in self.colour_settings.settings["BALL_COLOURS"].items():
+            if properties["DETECT"]:
+                _, contours = self.colour_classifier.get_mask_contours(labels, colour)
+                if contours:
+                    colour_contours[colour] = contours
+
         # For each ball found, determine what colour it is and add
         # it to the list of balls. If a ball is not mapped to an
         # appropriate colour, it is discarded
@@ -452,82 +993,6 @@ class BallTracker:
         )
         return colour_mask, contours
 
-    def has_shot_started(
-        self, first_snapshot: SnapShot, second_snapshot: SnapShot
-    ) -> bool:
-        """Determine if the shot has started by comparing `first_snapshot` white ball
-        with `second_snapshot` white ball
-
-        :param first_snapshot: first snapshot
-        :param second_snapshot: second snapshot
-        :return: True if the shot has started, otherwise False
-        """
-        if first_snapshot.colours["WHITE"].count > 0:
-            if (
-                first_snapshot.colours["WHITE"].count
-                == second_snapshot.colours["WHITE"].count
-            ):
-                if first_snapshot.white and second_snapshot.white:
-                    if self.has_ball_moved(
-                        first_snapshot.white.keypoint, second_snapshot.white.keypoint
-                    ):
-                        print("===========================================")
-                        print("WHITE STATUS: moving...")
-                        self.__white_status_setter(True)
-                        return True
-                return False
-        return False
-
-    def has_shot_finished(
-        self, first_snapshot: SnapShot, second_snapshot: SnapShot
-    ) -> bool:
-        """Determine if the shot has finished by comparing `first_snapshot` white ball
-        with `second_snapshot` white ball
-
-        :param first_snapshot: first snapshot
-        :param second_snapshot: second snapshot
-        :return: True if the shot has finished, otherwise False
-        """
-        if first_snapshot.colours["WHITE"].count > 0:
-            if (
-                first_snapshot.colours["WHITE"].count
-                == second_snapshot.colours["WHITE"].count
-            ):
-                if first_snapshot.white and second_snapshot.white:
-                    if self.has_ball_stopped(
-                        first_snapshot.white.keypoint, second_snapshot.white.keypoint
-                    ):
-                        print("WHITE STATUS: stopped...\n")
-                        self.__white_status_setter(False)
-                        return True
-                else:
-                    return True
-        return False
-
-    def has_ball_stopped(
-        self, first_ball: cv2.KeyPoint, second_ball: cv2.KeyPoint
-    ) -> bool:
-        """Determine if a specific ball has stopped
-
-        :param first_ball: first ball
-        :param second_ball: second ball
-        :return: True if the ball has stopped, otherwise False
-        """
-        dist = dist_between_two_balls(first_ball, second_ball)
-        return True if dist <= 0.1 else False
-
-    def has_ball_moved(
-        self, first_ball: cv2.KeyPoint, second_ball: cv2.KeyPoint
-    ) -> bool:
-        """Determine if a specific ball has moved
-
-        :param first_ball: first ball
-        :param second_ball: second ball
-        :return: True if the ball has moved, otherwise False
-        """
-        dist = dist_between_two_balls(first_ball, second_ball)
-        return True if dist > 0.1 else False
-
     def create_table_boundary(
         self, frame: Frame, contours: list[cv2.KeyPoint] | None = None
     ) -> None:
@@ -551,30 +1016,198 @@ class BallTracker:
             cv2.drawContours(
                 self.table_bounds_mask, [self.table_bounds], -1, (255, 255, 255), -1
             )
+            self.table_roi = cv2.boundingRect(self.table_bounds)
+        else:
+            self.table_roi = None
 
-    def fill(self, frame: Frame) -> Frame:
-        """Fill `frame` using the detected table boundary
+    def __classify_view(self, frame: Frame) -> CameraView:
+        """Determine what the camera is showing in `frame`
+
+        :param frame: frame to classify
+        :return: camera view, which is always the main table view if
+                 the table cloth colour isn't set
+        """
+        table = self.colour_settings.colours.get(SnookerColour.TABLE)
+        if table is None:
+            return CameraView.MAIN_TABLE
+        return self.view_classifier.classify(frame, table["LOWER"], table["UPPER"])
+
+    def __skip_frame(self, frame: Frame, show_threshold: bool) -> Image:
+        """Get the output of a frame that balls are not detected in
+
+        :param frame: frame to skip
+        :param show_threshold: if True output a black frame
+        :return: `frame` or a black frame, black binary frame and HSV frame
+        """
+        # the previous frame can't be reused by the motion gate after this one
+        self.__last_image = None
+        hsv: Frame = cv2.cvtColor(
+            frame, cv2.COLOR_BGR2HSV, dst=self.__buffer("hsv", frame)
+        )
+        threshold = self.__buffer("threshold", frame, channels=1)
+        if threshold is None:
+            threshold = np.zeros(frame.shape[:2], dtype=frame.dtype)
+        else:
+            threshold.fill(0)
+        if show_threshold:
+            frame = cv2.cvtColor(
+                threshold, cv2.COLOR_GRAY2BGR, dst=self.__buffer("output", frame)
+            )
+        return Image(frame, threshold, hsv)
+
+    def __update_table_view(self, frame: Frame, detect_table: bool) -> bool:
+        """Switch to the table boundary of the camera view of `frame` if the
+        footage has cut to a view that has been seen before
 
         :param frame: frame to process
+        :param detect_table: if True the table boundary is detected from `frame`
+                             regardless of the camera view
+        :return: True if the table boundary has to be detected from `frame`
+        """
+        cut = self.cut_detector.is_cut(frame)
+        if not (cut or detect_table or self.table_bounds is None):
+            return False
+
+        table = self.colour_settings.colours.get(SnookerColour.TABLE)
+        if table is None:
+            return detect_table
+        self.__table_fingerprint = self.table_cache.fingerprint(
+            frame, table["LOWER"], table["UPPER"]
+        )
+        # balls and their tracks have to be found again in a different view
+        self.__reacquire = True
+        if detect_table:
+            return True
+
+        view = self.table_cache.lookup(self.__table_fingerprint)
+        if view is None:
+            # forget the boundary of the previous view, so that detection is
+            # retried on the next frame if it fails on this one
+            self.table_bounds = self.table_bounds_mask = self.table_roi = None
+            return True
+        self.table_bounds = view.table_bounds
+        self.table_bounds_mask = view.table_bounds_mask
+        self.table_roi = view.table_roi
+        return False
+
+    def __store_table_view(self) -> None:
+        """Remember the table boundary that has just been detected for the
+        current camera view"""
+        if (
+            self.__table_fingerprint is None
+            or self.table_bounds is None
+            or self.table_bounds_mask is None
+            or self.table_roi is None
+        ):
+            return
+        self.table_cache.store(
+            TableView(
+                self.__table_fingerprint,
+                self.table_bounds,
+                self.table_bounds_mask,
+                self.table_roi,
+            )
+        )
+
+    def fill(self, frame: Frame, dst: Frame | None = None) -> Frame:
+        """Fill `frame` using the detected table boundary
+
+        :param frame: frame to process, either single channel or BGR/HSV,
+                      which may be cropped by `crop`
+        :param dst: frame to write the result to, which may be `frame` itself,
+                    defaults to None
         :return: frame filled around table boundary
         """
-        # Extract out the object and place into output image
-        out: Frame = np.zeros(frame.shape).astype(frame.dtype)
-        out[self.table_bounds_mask == 255] = frame[self.table_bounds_mask == 255]
-        frame = cv2.bitwise_and(frame, out)
-        return frame
+        # Everything outside the table boundary is ANDed with 0
+        mask = (
+            self.table_bounds_mask
+            if frame.ndim == 3
+            else self.__get_gray_table_bounds_mask()
+        )
+        # `frame` may have been cropped to the table's bounding rectangle
+        if mask is not None and mask.shape[:2] != frame.shape[:2]:
+            mask = self.crop(mask)
+        filled: Frame = cv2.bitwise_and(frame, mask, dst=dst)
+        return filled
+
+    def __get_gray_table_bounds_mask(self) -> Frame | None:
+        """Get a single channel version of `table_bounds_mask`, which is cached
+        until the table boundary mask changes
+
+        :return: single channel table boundary mask
+        """
+        if self.table_bounds_mask is None:
+            return None
+        if self.__gray_table_bounds_mask_source is not self.table_bounds_mask:
+            self.__gray_table_bounds_mask = np.ascontiguousarray(
+                self.table_bounds_mask[:, :, 0]
+            )
+            self.__gray_table_bounds_mask_source = self.table_bounds_mask
+        return self.__gray_table_bounds_mask
+
+    def __buffer(
+        self, name: str, like: Frame, channels: int | None = None
+    ) -> Frame | None:
+        """Get a reused buffer with the height and width of `like`, or None if
+        buffers are not reused so that OpenCV allocates a new frame
+
+        :param name: name of the buffer
+        :param like: frame to take the height, width and channels from
+        :param channels: number of channels of the buffer, defaults to the
+                         number of channels of `like`
+        :return: buffer or None
+        """
+        if self.arena is None:
+            return None
+        shape = (
+            like.shape[:2]
+            if channels == 1
+            else (*like.shape[:2], channels or like.shape[2])
+        )
+        return self.arena.get(name, shape, like.dtype)
 
     def crop(self, frame: Frame) -> Frame:
-        """Crops `frame` using the detected table boundary
+        """Crops `frame` to the bounding rectangle of the detected table boundary
+
+        The cropped frame is a view of `frame`, so no pixels are copied
 
         :param frame: frame to process
-        :return: frame cropped around table boundary
-        """
-        # Extract out the object and place into output image
-        out: Frame = np.zeros(frame.shape).astype(frame.dtype)
-        out[self.table_bounds_mask == 255] = frame[self.table_bounds_mask == 255]
-        (x, y, _) = np.where(self.table_bounds_mask == 255)
-        (topx, topy) = (np.min(x), np.min(y))
-        (bottomx, bottomy) = (np.max(x), np.max(y))
-        frame = out[topx : bottomx + 1, topy : bottomy + 1]
-        return frame
+        :return: frame cropped around table boundary, or `frame` if the table
+                 boundary has not been detected
+        """
+        if self.table_roi is None:
+            return frame
+        x, y, width, height = self.table_roi
+        cropped: Frame = frame[y : y + height, x : x + width]
+        return cropped
+
+    def __uncrop(
+        self,
+        frame: Frame,
+        shape: tuple[int, ...],
+        roi: tuple[int, int, int, int],
+        name: str,
+    ) -> Frame:
+        """Place `frame`, which covers `roi` of a larger frame, into a frame of
+        `shape` that is black outside of `roi`
+
+        :param frame: single channel frame to place
+        :param shape: shape of the larger frame, which is converted to BGR
+                      if it has 3 dimensions
+        :param roi: (x, y, width, height) region of the larger frame
+        :param name: name of the buffer to place `frame` into if reusing buffers
+        :return: larger frame
+        """
+        out: Frame = (
+            np.empty(shape, dtype=frame.dtype)
+            if self.arena is None
+            else self.arena.get(name, shape, frame.dtype)
+        )
+        out.fill(0)
+        x, y, width, height = roi
+        view = out[y : y + height, x : x + width]
+        if out.ndim == 3:
+            cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR, dst=view)
+        else:
+            np.copyto(view, frame)
+        return out
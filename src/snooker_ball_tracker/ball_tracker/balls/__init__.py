@@ -1,3 +1,2 @@
-from .ball import Ball as Ball
-from .ball_colour import BallColour as BallColour
+from .ball_colour_model import BallColourModel as BallColourModel
 from .balls_potted import BallsPotted as BallsPotted
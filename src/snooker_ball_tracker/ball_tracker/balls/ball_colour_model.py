@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import PyQt5.QtCore as QtCore
+
+
+class BallColourModel(QtCore.QObject):
+    def __init__(self) -> None:
+        """Creates an instance of this class that exposes the ball count of a
+        colour in a SnapShot to the GUI, so that the ball tracker itself never
+        has to emit signals"""
+        super().__init__()
+        self._count = 0
+
+    countChanged = QtCore.pyqtSignal(int)
+
+    @property
+    def count(self) -> int:
+        """Count of balls
+
+        :return: count
+        """
+        return self._count
+
+    @count.setter
+    def count(self, value: int) -> None:
+        """Count setter, only emits `countChanged` if the count is different
+
+        :param value: value to set
+        """
+        if value != self._count:
+            self._count = value
+            self.countChanged.emit(self._count)
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, NamedTuple
+
+
+class CadenceState(NamedTuple):
+    shot_in_progress: bool
+    white_moving: bool
+    lost: bool
+    max_speed: float
+
+
+class CadencePolicy(ABC):
+    def __init__(self) -> None:
+        """Creates an instance of this class that decides which frames go
+        through full colour detection and the snapshot phase, while every other
+        frame only updates the positions of tracked balls
+
+        Policies only decide when detection runs, the ball tracker always runs
+        it on the first frame and when it has to find balls again"""
+        self.frames = 0
+        self.detections = 0
+        self._frames_since_detection = 0
+
+    @property
+    @abstractmethod
+    def interval(self) -> int:
+        """Number of frames between colour detections the policy has currently
+        chosen
+
+        :return: interval
+        """
+
+    @abstractmethod
+    def update(self, state: CadenceState) -> None:
+        """Adjust the interval after a colour detection has run
+
+        :param state: state of the tracker after the colour detection
+        """
+
+    def should_detect(self, state: CadenceState) -> bool:
+        """Determine if colour detection should run on the next frame
+
+        :param state: state of the tracker before the frame is processed
+        :return: True if colour detection should run
+        """
+        return self._frames_since_detection + 1 >= self.interval
+
+    def record(self, detected: bool, state: CadenceState) -> None:
+        """Record whether colour detection ran on the last processed frame
+
+        :param detected: True if colour detection ran on the frame
+        :param state: state of the tracker after the frame was processed
+        """
+        self.frames += 1
+        if detected:
+            self.detections += 1
+            self._frames_since_detection = 0
+            self.update(state)
+        else:
+            self._frames_since_detection += 1
+
+    def reset(self) -> None:
+        """Reset the frame and detection counters"""
+        self.frames = 0
+        self.detections = 0
+        self._frames_since_detection = 0
+
+
+class FixedCadence(CadencePolicy):
+    def __init__(self, interval: int = 5) -> None:
+        """Creates an instance of this class that runs colour detection every
+        `interval` frames
+
+        :param interval: number of frames between colour detections,
+                         defaults to 5
+        """
+        super().__init__()
+        self._interval = max(interval, 1)
+
+    @property
+    def interval(self) -> int:
+        return self._interval
+
+    def update(self, state: CadenceState) -> None:
+        pass
+
+
+class AdaptiveCadence(CadencePolicy):
+    def __init__(
+        self,
+        min_interval: int = 1,
+        max_interval: int = 30,
+        motion_speed: float = 1.0,
+    ) -> None:
+        """Creates an instance of this class that runs colour detection on every
+        frame while balls are moving and backs off while the table is static
+
+        The interval drops to `min_interval` as soon as a shot is in progress,
+        the white is moving, any tracked ball is moving faster than
+        `motion_speed` or a ball has been lost. Otherwise it doubles after every
+        colour detection, up to `max_interval`
+
+        :param min_interval: interval while balls are moving, defaults to 1
+        :param max_interval: interval while the table is static, defaults to 30
+        :param motion_speed: min speed in pixels per frame for a tracked ball
+                             to count as moving, defaults to 1.0
+        """
+        super().__init__()
+        self.min_interval = max(min_interval, 1)
+        self.max_interval = max(max_interval, self.min_interval)
+        self.motion_speed = motion_speed
+        self._interval = self.min_interval
+
+    @property
+    def interval(self) -> int:
+        return self._interval
+
+    def should_detect(self, state: CadenceState) -> bool:
+        if self.__moving(state):
+            self._interval = self.min_interval
+        # balls that have been lost are searched for straight away
+        return state.lost or super().should_detect(state)
+
+    def update(self, state: CadenceState) -> None:
+        if self.__moving(state):
+            self._interval = self.min_interval
+        else:
+            self._interval = min(self._interval * 2, self.max_interval)
+
+    def __moving(self, state: CadenceState) -> bool:
+        """Determine if anything on the table is moving
+
+        :param state: state of the tracker
+        :return: True if a shot is in progress or any ball is moving or lost
+        """
+        return (
+            state.shot_in_progress
+            or state.white_moving
+            or state.lost
+            or state.max_speed > self.motion_speed
+        )
+
+
+# Cadence policies that can be selected with the "POLICY" key of
+# the detection cadence settings, more policies can be registered here
+CADENCE_POLICIES: dict[str, Callable[[dict[str, Any]], CadencePolicy]] = {
+    "FIXED": lambda settings: FixedCadence(settings.get("INTERVAL", 5)),
+    "ADAPTIVE": lambda settings: AdaptiveCadence(
+        settings.get("MIN_INTERVAL", 1),
+        settings.get("MAX_INTERVAL", 30),
+        settings.get("MOTION_SPEED", 1.0),
+    ),
+}
+
+
+def create_cadence_policy(settings: dict[str, Any]) -> CadencePolicy:
+    """Create the cadence policy selected by detection cadence settings
+
+    :param settings: detection cadence settings
+    :raises ValueError: if the selected policy does not exist
+    :return: cadence policy
+    """
+    policy = settings.get("POLICY", "FIXED")
+    if policy not in CADENCE_POLICIES:
+        raise ValueError(f"unknown detection cadence policy: {policy}")
+    return CADENCE_POLICIES[policy](settings)
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Iterable
+
+import cv2
+import numpy as np
+
+if TYPE_CHECKING:
+    from .settings import ColourDetectionSettings
+    from .types import Frame
+
+
+def _label_dtype(colour_count: int) -> Any:
+    """Get the smallest dtype that can hold one bit per colour
+
+    :param colour_count: number of colours to label
+    :return: numpy dtype that fits `colour_count` bits
+    """
+    if colour_count <= 8:
+        return np.uint8
+    if colour_count <= 16:
+        return np.uint16
+    return np.int32
+
+
+class ColourClassifier:
+    def __init__(
+        self,
+        colour_settings: ColourDetectionSettings,
+        colours: Iterable[str] | None = None,
+    ) -> None:
+        """Creates an instance of this class that labels every pixel of a HSV
+        frame with the colours whose ranges it falls into in a single pass
+
+        Each colour is assigned a bit in a label image. As every colour range is
+        a box in HSV space, the full 180x256x256 HSV lookup table factorises into
+        one 256 entry table per channel, where each entry holds the bits of the
+        colours whose range covers that channel value. A pixel's label is then
+        the bitwise AND of its three channel entries, which matches the
+        inclusive bounds used by `cv2.inRange` exactly.
+
+        :param colour_settings: colour detection settings to obtain ranges from
+        :param colours: colours to label, defaults to the ball colours
+        """
+        self.colour_settings = colour_settings
+        self._colours = list(
+            colours
+            if colours is not None
+            else colour_settings.settings["BALL_COLOURS"].keys()
+        )
+        self._indices = {colour: i for i, colour in enumerate(self._colours)}
+        self._bits = {colour: 1 << i for colour, i in self._indices.items()}
+        self._dtype = _label_dtype(len(self._colours))
+        self._lut: Frame | None = None
+
+    @property
+    def colours(self) -> list[str]:
+        """Colours that are labelled by the classifier
+
+        :return: colours
+        """
+        return self._colours
+
+    @property
+    def lut(self) -> Frame:
+        """Per channel lookup table, rebuilt if a colour range has changed
+
+        :return: lookup table of shape (256, 1, 3)
+        """
+        if self._lut is None:
+            self._lut = self.build_lut()
+        return self._lut
+
+    def bit(self, colour: str) -> int:
+        """Get the label bit assigned to `colour`
+
+        :param colour: colour to get bit for
+        :return: label bit
+        """
+        return self._bits[colour]
+
+    def invalidate(self) -> None:
+        """Mark the lookup table as stale so it is rebuilt on next use"""
+        self._lut = None
+
+    def build_lut(self) -> Frame:
+        """Build the per channel lookup table from the current colour ranges
+
+        :return: lookup table of shape (256, 1, 3)
+        """
+        lut = np.zeros((256, 1, 3), dtype=self._dtype)
+        colour_ranges = self.colour_settings.colours
+        for colour, bit in self._bits.items():
+            if colour not in colour_ranges:
+                continue
+            lower = np.clip(colour_ranges[colour]["LOWER"], 0, 255).astype(int)
+            upper = np.clip(colour_ranges[colour]["UPPER"], 0, 255).astype(int)
+            for channel in range(3):
+                lut[lower[channel] : upper[channel] + 1, 0, channel] |= bit
+        return lut
+
+    def classify(self, hsv_frame: Frame) -> Frame:
+        """Label every pixel in `hsv_frame` with the bits of the colours it matches
+
+        :param hsv_frame: HSV frame to classify
+        :return: single channel label image
+        """
+        hue, saturation, value = cv2.split(cv2.LUT(hsv_frame, self.lut))
+        labels: Frame = cv2.bitwise_and(hue, saturation)
+        cv2.bitwise_and(labels, value, dst=labels)
+        return labels
+
+    def get_mask(self, labels: Frame, colour: str) -> Frame:
+        """Obtains the colour mask of `colour` from a label image
+
+        :param labels: label image produced by `classify`
+        :param colour: colour to extract mask for
+        :return: binary mask where pixels matching `colour` are 255
+        """
+        colour_bits = cv2.bitwise_and(labels, self._bits[colour])
+        mask: Frame = cv2.compare(colour_bits, 0, cv2.CMP_GT)
+        return mask
+
+    def get_mask_contours(
+        self, labels: Frame, colour: str
+    ) -> tuple[Frame, list[Frame]]:
+        """Obtains the colour mask and contours of `colour` from a label image
+
+        :param labels: label image produced by `classify`
+        :param colour: colour to extract mask and contours for
+        :return: colour mask of `colour` and a list of contours
+        """
+        mask = self.get_mask(labels, colour)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+        return mask, list(contours)
+
+    def sample_keypoint(self, hsv_frame: Frame, keypoint: cv2.KeyPoint) -> Frame:
+        """Samples the pixels inside the disc covered by `keypoint`, looking only
+        at the small region around the keypoint
+
+        :param hsv_frame: HSV frame to sample pixels from
+        :param keypoint: keypoint to sample
+        :return: fraction of sampled pixels that match each colour, in the
+                 order of `colours`
+        """
+        x_pos, y_pos = keypoint.pt
+        radius = max(keypoint.size / 2, 1.0)
+        height, width = hsv_frame.shape[:2]
+        left = max(int(x_pos - radius), 0)
+        right = min(int(x_pos + radius) + 1, width)
+        top = max(int(y_pos - radius), 0)
+        bottom = min(int(y_pos + radius) + 1, height)
+
+        labels = self.classify(hsv_frame[top:bottom, left:right])
+        rows, cols = np.ogrid[top:bottom, left:right]
+        disc = (cols - x_pos) ** 2 + (rows - y_pos) ** 2 <= radius**2
+        sampled = labels[disc]
+
+        votes: Frame = np.array(
+            [np.count_nonzero(sampled & bit) for bit in self._bits.values()]
+        ) / max(sampled.size, 1)
+        return votes
+
+    def classify_keypoint(
+        self,
+        hsv_frame: Frame,
+        keypoint: cv2.KeyPoint,
+        colours: list[str],
+        min_fraction: float = 0.25,
+    ) -> str | None:
+        """Determine the colour of `keypoint` by sampling the pixels it covers
+
+        A colour is a candidate if at least `min_fraction` of the sampled pixels
+        fall within its range. The first candidate in `colours` wins, so
+        `colours` should be given in detection order.
+
+        :param hsv_frame: HSV frame to sample pixels from
+        :param keypoint: keypoint to classify
+        :param colours: colours to consider, in detection order
+        :param min_fraction: fraction of sampled pixels a colour needs,
+                             defaults to 0.25
+        :return: colour of `keypoint` or None if no colour matched
+        """
+        votes = self.sample_keypoint(hsv_frame, keypoint)
+        for colour in colours:
+            if votes[self._indices[colour]] >= min_fraction:
+                return colour
+        return None
+
+    def classify_keypoint_roi(
+        self,
+        frame: Frame,
+        keypoint: cv2.KeyPoint,
+        colours: list[str],
+        scale: float = 1.0,
+        min_fraction: float = 0.25,
+    ) -> str | None:
+        """Determine the colour of `keypoint` by sampling the pixels it covers
+        in a BGR frame, only converting the region around it to HSV
+
+        This lets balls detected in a downscaled frame be classified from the
+        full resolution frame they were downscaled from
+
+        :param frame: BGR frame to sample pixels from
+        :param keypoint: keypoint to classify
+        :param colours: colours to consider, in detection order
+        :param scale: scale from the coordinates of `keypoint` to the
+                      coordinates of `frame`, defaults to 1.0
+        :param min_fraction: fraction of sampled pixels a colour needs,
+                             defaults to 0.25
+        :return: colour of `keypoint` or None if no colour matched
+        """
+        x_pos, y_pos = keypoint.pt[0] * scale, keypoint.pt[1] * scale
+        radius = max(keypoint.size * scale / 2, 1.0)
+        height, width = frame.shape[:2]
+        left = max(int(x_pos - radius), 0)
+        right = min(int(x_pos + radius) + 1, width)
+        top = max(int(y_pos - radius), 0)
+        bottom = min(int(y_pos + radius) + 1, height)
+        if left >= right or top >= bottom:
+            return None
+
+        roi = cv2.cvtColor(frame[top:bottom, left:right], cv2.COLOR_BGR2HSV)
+        return self.classify_keypoint(
+            roi,
+            cv2.KeyPoint(x_pos - left, y_pos - top, radius * 2),
+            colours,
+            min_fraction,
+        )
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import cv2
+
+if TYPE_CHECKING:
+    from .types import Frame
+
+
+class CutDetector:
+    def __init__(
+        self, width: int = 64, bins: tuple[int, int] = (16, 8), threshold: float = 0.5
+    ) -> None:
+        """Creates an instance of this class that cheaply determines if a frame
+        comes from a different camera shot than the frame before it, such as
+        when broadcast footage cuts between cameras
+
+        Frames are downscaled to `width` and a hue/saturation histogram of each
+        of them is compared against the histogram of the previous frame. Balls
+        moving or players walking around the table barely change the histogram,
+        while a cut to another camera changes most of it
+
+        :param width: width to downscale frames to before building histograms,
+                      defaults to 64
+        :param bins: number of hue and saturation bins of each histogram,
+                     defaults to (16, 8)
+        :param threshold: min Bhattacharyya distance between the histograms of
+                          consecutive frames for them to count as a cut,
+                          defaults to 0.5
+        """
+        self.width = width
+        self.bins = bins
+        self.threshold = threshold
+        self.cuts = 0
+        self._histogram: Frame | None = None
+
+    def reset(self) -> None:
+        """Forget the previous frame and reset the cut counter"""
+        self.cuts = 0
+        self._histogram = None
+
+    def histogram(self, frame: Frame) -> Frame:
+        """Build the normalised hue/saturation histogram of `frame`
+
+        :param frame: BGR frame to build the histogram of
+        :return: histogram
+        """
+        height = max(int(frame.shape[0] * self.width / frame.shape[1]), 1)
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        histogram: Frame = cv2.calcHist(
+            [hsv], [0, 1], None, list(self.bins), [0, 180, 0, 256]
+        )
+        cv2.normalize(histogram, histogram, norm_type=cv2.NORM_L1)
+        return histogram
+
+    def is_cut(self, frame: Frame) -> bool:
+        """Determine if `frame` comes from a different camera shot than the
+        previous frame passed to this method
+
+        :param frame: BGR frame to check
+        :return: True if there was a cut, False if there wasn't or there is
+                 no previous frame to compare with
+        """
+        histogram = self.histogram(frame)
+        previous, self._histogram = self._histogram, histogram
+        if previous is None:
+            return False
+        distance = cv2.compareHist(previous, histogram, cv2.HISTCMP_BHATTACHARYYA)
+        if distance < self.threshold:
+            return False
+        self.cuts += 1
+        return True
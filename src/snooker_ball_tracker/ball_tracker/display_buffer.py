@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
+
+import cv2
+
+if TYPE_CHECKING:
+    from .overlay import Overlay
+    from .types import Frame
+
+
+class LatestFrameBuffer:
+    def __init__(self) -> None:
+        """Creates an instance of this class that hands the latest processed
+        frame over to the display as RGB through a pair of buffers
+
+        The processor converts each frame into the back buffer and swaps it
+        with the front buffer, while the display reads the front buffer at
+        its own rate. Frames the display doesn't get to in time are replaced
+        rather than queued. Only the swap and reads are locked, so the
+        processor never waits for the display to convert a frame
+        """
+        self.sequence = 0
+        self._frames: list[Frame | None] = [None, None]
+        self._front = 0
+        self._lock = threading.Lock()
+
+    def write(self, frame: Frame, overlay: Overlay | None = None) -> None:
+        """Convert BGR `frame` to RGB into the back buffer, draw `overlay` over
+        it and make it the latest frame, must only be called from a single thread
+
+        :param frame: processed BGR frame
+        :param overlay: shapes to draw over the frame, defaults to None
+        """
+        back = 1 - self._front
+        buffer = self._frames[back]
+        if buffer is not None and buffer.shape != frame.shape:
+            buffer = None
+        # OpenCV only allocates a new buffer if the frame size has changed
+        rgb: Frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=buffer)
+        if overlay is not None:
+            overlay.render(rgb, rgb=True)
+        with self._lock:
+            self._frames[back] = rgb
+            self._front = back
+            self.sequence += 1
+
+    @contextmanager
+    def latest(self) -> Iterator[tuple[Frame | None, int]]:
+        """Lock the latest frame for reading, the frame must not be used once
+        the context has exited
+
+        :return: latest RGB frame, or None if no frame has been written yet,
+                 and the number of frames written so far
+        """
+        with self._lock:
+            yield self._frames[self._front], self.sequence
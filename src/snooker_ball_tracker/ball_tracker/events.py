@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import glob
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from enum import Enum
+from queue import Queue
+from typing import IO, TYPE_CHECKING, Any, NamedTuple, Sequence, Union
+
+import numpy as np
+import numpy.typing as npt
+
+if TYPE_CHECKING:
+    from .ball_tracker import BallTracker
+    from .types import Frame
+
+
+class ShotStarted(NamedTuple):
+    frame_index: int
+    timestamp: float
+
+
+class ShotFinished(NamedTuple):
+    frame_index: int
+    timestamp: float
+
+
+class BallPotted(NamedTuple):
+    frame_index: int
+    timestamp: float
+    colour: str
+    pot_count: int
+
+
+class BallPositions(NamedTuple):
+    frame_index: int
+    timestamp: float
+    # (n, 3) array of the x, y and size of every ball of each colour
+    balls: dict[str, Frame]
+    # (n,) array of the track ID of every ball of each colour, -1 if untracked
+    track_ids: dict[str, npt.NDArray[np.int64]]
+
+
+Event = Union[ShotStarted, ShotFinished, BallPotted, BallPositions]
+
+# Names events are written with, the index of a name is the type id of the
+# event in columnar exports
+EVENT_NAMES: dict[type, str] = {
+    ShotStarted: "shot_started",
+    ShotFinished: "shot_finished",
+    BallPotted: "ball_potted",
+    BallPositions: "ball_positions",
+}
+
+
+class EventRecorder:
+    def __init__(self) -> None:
+        """Creates an instance of this class that turns the state of a ball
+        tracker after each processed frame into events"""
+        self.shot_in_progress = False
+
+    def record(
+        self,
+        ball_tracker: BallTracker,
+        frame_index: int,
+        timestamp: float,
+        ball_potted: str | None = None,
+        pot_count: int = 0,
+    ) -> list[Event]:
+        """Get the events of the frame `ball_tracker` has just processed
+
+        :param ball_tracker: ball tracker that processed the frame
+        :param frame_index: index of the frame
+        :param timestamp: timestamp of the frame in seconds
+        :param ball_potted: ball potted in the frame if any were, defaults to None
+        :param pot_count: number of balls potted in the frame, defaults to 0
+        :return: shot started/finished and ball potted events if any occurred,
+                 followed by the positions of the balls in the frame
+        """
+        events: list[Event] = []
+        if ball_tracker.shot_in_progress != self.shot_in_progress:
+            self.shot_in_progress = ball_tracker.shot_in_progress
+            events.append(
+                ShotStarted(frame_index, timestamp)
+                if self.shot_in_progress
+                else ShotFinished(frame_index, timestamp)
+            )
+        if ball_potted:
+            events.append(
+                BallPotted(frame_index, timestamp, self.__name(ball_potted), pot_count)
+            )
+        balls = ball_tracker.keypoints.items()
+        events.append(
+            BallPositions(
+                frame_index,
+                timestamp,
+                {
+                    self.__name(colour): np.array(
+                        [[*ball.pt, ball.size] for ball in ball_list], dtype=np.float64
+                    ).reshape(-1, 3)
+                    for colour, ball_list in balls
+                },
+                {
+                    self.__name(colour): np.array(
+                        [ball.class_id for ball in ball_list], dtype=np.int64
+                    )
+                    for colour, ball_list in balls
+                },
+            )
+        )
+        return events
+
+    @staticmethod
+    def __name(colour: str) -> str:
+        """Get the name of `colour`, as colours can be members of the `Colour`
+        enum created from the colour settings
+
+        :param colour: colour
+        :return: name of the colour
+        """
+        return str(colour.value) if isinstance(colour, Enum) else colour
+
+
+class EventSink(ABC):
+    @abstractmethod
+    def write(self, events: Sequence[Event]) -> None:
+        """Write a batch of events
+
+        :param events: events in the order they occurred
+        """
+
+    def close(self) -> None:
+        """Write anything that is still buffered and release the sink"""
+
+
+class JsonLinesSink(EventSink):
+    def __init__(self, path: str) -> None:
+        """Creates an instance of this class that writes every event as a single
+        JSON object per line
+
+        :param path: path of the file to write to
+        """
+        self.path = path
+        self.output: IO[str] = open(path, "w")
+
+    def write(self, events: Sequence[Event]) -> None:
+        self.output.writelines(
+            json.dumps(
+                {
+                    "frame": event.frame_index,
+                    "time": round(event.timestamp, 3),
+                    "event": EVENT_NAMES[type(event)],
+                    **self.__fields(event),
+                }
+            )
+            + "\n"
+            for event in events
+        )
+
+    def close(self) -> None:
+        self.output.close()
+
+    @staticmethod
+    def __fields(event: Event) -> dict[str, Any]:
+        """Get the fields of `event` other than its frame and timestamp
+
+        :param event: event
+        :return: JSON serialisable fields
+        """
+        if isinstance(event, BallPotted):
+            return {"colour": event.colour, "count": event.pot_count}
+        if isinstance(event, BallPositions):
+            return {
+                "balls": {
+                    colour: [
+                        [round(float(value), 1) for value in ball] for ball in balls
+                    ]
+                    for colour, balls in event.balls.items()
+                }
+            }
+        return {}
+
+
+class NpzSink(EventSink):
+    def __init__(self, path: str, chunk_size: int = 1 << 16) -> None:
+        """Creates an instance of this class that writes events into a
+        directory of compressed .npz chunks with one array per column
+
+        Every chunk holds a `positions` table of one row per ball per frame
+        (`frame`, `time`, `colour`, `track`, `x`, `y` and `size`) and an `events` table
+        of one row per other event (`event_frame`, `event_time`, `event_type`,
+        `event_colour` and `event_count`). Colours and event types are stored
+        as ids into the `colours` and `event_types` arrays of the chunk, and
+        `event_colour` is -1 for events without a colour. Use `load_npz_events`
+        to read every chunk back as a single set of columns
+
+        :param path: path of the directory to write chunks to
+        :param chunk_size: number of ball positions per chunk,
+                           defaults to 65536
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.chunks = 0
+        self.colours: list[str] = []
+        self.__colour_ids: dict[str, int] = {}
+        self.__positions: list[Frame] = []
+        self.__position_rows = 0
+        self.__events: list[tuple[int, float, int, int, int]] = []
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, events: Sequence[Event]) -> None:
+        for event in events:
+            if isinstance(event, BallPositions):
+                for colour, balls in event.balls.items():
+                    if len(balls) == 0:
+                        continue
+                    rows = np.empty((len(balls), 7), dtype=np.float64)
+                    rows[:, 0] = event.frame_index
+                    rows[:, 1] = event.timestamp
+                    rows[:, 2] = self.__colour_id(colour)
+                    rows[:, 3] = event.track_ids[colour]
+                    rows[:, 4:] = balls
+                    self.__positions.append(rows)
+                    self.__position_rows += len(rows)
+            else:
+                colour_id = (
+                    self.__colour_id(event.colour)
+                    if isinstance(event, BallPotted)
+                    else -1
+                )
+                self.__events.append(
+                    (
+                        event.frame_index,
+                        event.timestamp,
+                        list(EVENT_NAMES).index(type(event)),
+                        colour_id,
+                        event.pot_count if isinstance(event, BallPotted) else 0,
+                    )
+                )
+        if self.__position_rows >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered events as a new chunk"""
+        if not self.__positions and not self.__events:
+            return
+        positions = (
+            np.concatenate(self.__positions)
+            if self.__positions
+            else np.empty((0, 7), dtype=np.float64)
+        )
+        events = np.array(
+            self.__events,
+            dtype=[
+                ("frame", np.int64),
+                ("time", np.float64),
+                ("type", np.uint8),
+                ("colour", np.int16),
+                ("count", np.int32),
+            ],
+        )
+        np.savez_compressed(
+            os.path.join(self.path, f"chunk-{self.chunks:05d}.npz"),
+            frame=positions[:, 0].astype(np.int64),
+            time=positions[:, 1],
+            colour=positions[:, 2].astype(np.int16),
+            track=positions[:, 3].astype(np.int64),
+            x=positions[:, 4].astype(np.float32),
+            y=positions[:, 5].astype(np.float32),
+            size=positions[:, 6].astype(np.float32),
+            event_frame=events["frame"],
+            event_time=events["time"],
+            event_type=events["type"],
+            event_colour=events["colour"],
+            event_count=events["count"],
+            colours=np.array(self.colours),
+            event_types=np.array(list(EVENT_NAMES.values())),
+        )
+        self.chunks += 1
+        self.__positions.clear()
+        self.__position_rows = 0
+        self.__events.clear()
+
+    def close(self) -> None:
+        self.flush()
+
+    def __colour_id(self, colour: str) -> int:
+        """Get the id of `colour`, which is assigned the next id if it hasn't
+        been seen before
+
+        :param colour: colour name
+        :return: colour id
+        """
+        if colour not in self.__colour_ids:
+            self.__colour_ids[colour] = len(self.colours)
+            self.colours.append(colour)
+        return self.__colour_ids[colour]
+
+
+def load_npz_events(path: str) -> dict[str, Frame]:
+    """Load every chunk written by `NpzSink` to `path` as a single set of
+    columns
+
+    :param path: path of the directory the chunks were written to
+    :raises OSError: if the directory doesn't contain any chunks
+    :return: columns by name, including the `colours` and `event_types`
+             names of the last chunk, which every earlier chunk's ids are
+             a prefix of
+    """
+    files = sorted(glob.glob(os.path.join(path, "chunk-*.npz")))
+    if not files:
+        raise OSError(f"no event chunks found in {path}")
+    chunks: dict[str, list[Frame]] = {}
+    names: dict[str, Frame] = {}
+    for file in files:
+        with np.load(file) as chunk:
+            for column in chunk.files:
+                if column in ("colours", "event_types"):
+                    names[column] = chunk[column]
+                else:
+                    chunks.setdefault(column, []).append(chunk[column])
+    return {
+        **{column: np.concatenate(arrays) for column, arrays in chunks.items()},
+        **names,
+    }
+
+
+class EventWriter:
+    def __init__(
+        self, sinks: Sequence[EventSink], batch_size: int = 256, max_batches: int = 64
+    ) -> None:
+        """Creates an instance of this class that writes events to `sinks` in
+        batches from a separate thread, so the thread processing frames never
+        waits on serialising events or on the disk
+
+        Events are collected into batches of `batch_size` events, which are
+        queued for the writer thread. Emitting events only blocks once
+        `max_batches` batches are waiting to be written. Errors raised by a
+        sink are raised again by `close`
+
+        :param sinks: sinks to write every event to
+        :param batch_size: number of events per batch, defaults to 256
+        :param max_batches: max number of batches waiting to be written,
+                            defaults to 64
+        """
+        self.sinks = list(sinks)
+        self.batch_size = batch_size
+        self.written = 0
+        self.__batch: list[Event] = []
+        self.__queue: Queue[list[Event] | None] = Queue(maxsize=max_batches)
+        self.__error: BaseException | None = None
+        self.__thread = threading.Thread(
+            target=self.__run, name=self.__class__.__name__, daemon=True
+        )
+        self.__thread.start()
+
+    def __enter__(self) -> EventWriter:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def emit(self, events: Sequence[Event]) -> None:
+        """Queue `events` to be written
+
+        :param events: events in the order they occurred
+        """
+        self.__batch.extend(events)
+        if len(self.__batch) >= self.batch_size:
+            self.__queue.put(self.__batch)
+            self.__batch = []
+
+    def close(self) -> None:
+        """Write every queued event, close the sinks and stop the writer thread
+
+        :raises Exception: the first error raised by a sink, if any
+        """
+        if self.__thread.is_alive():
+            if self.__batch:
+                self.__queue.put(self.__batch)
+                self.__batch = []
+            self.__queue.put(None)
+            self.__thread.join()
+        if self.__error is not None:
+            error, self.__error = self.__error, None
+            raise error
+
+    def __run(self) -> None:
+        """Write queued batches until `close` is called"""
+        while True:
+            batch = self.__queue.get()
+            if batch is None:
+                break
+            # keep draining the queue after an error, so emitting never blocks
+            if self.__error is not None:
+                continue
+            try:
+                for sink in self.sinks:
+                    sink.write(batch)
+                self.written += len(batch)
+            except Exception as error:
+                self.__error = error
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as error:
+                self.__error = self.__error or error
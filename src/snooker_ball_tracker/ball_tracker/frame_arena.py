@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+
+if TYPE_CHECKING:
+    from .types import Frame
+
+
+class FrameArena:
+    def __init__(self) -> None:
+        """Creates an instance of this class that holds named frame buffers which
+        are allocated the first time they are requested and reused afterwards,
+        so that frames of the same size can be processed without allocating
+
+        A buffer is only reallocated if it is requested with a different
+        shape or data type, such as when the video resolution changes
+        """
+        self._buffers: dict[str, Frame] = {}
+        self._allocations = 0
+
+    @property
+    def allocations(self) -> int:
+        """Number of buffers that have been allocated
+
+        :return: allocations
+        """
+        return self._allocations
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of all buffers in bytes
+
+        :return: size in bytes
+        """
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def get(
+        self, name: str, shape: tuple[int, ...], dtype: npt.DTypeLike = np.uint8
+    ) -> Frame:
+        """Get the buffer called `name`, allocating it if it does not exist yet or
+        does not have the requested shape and data type
+
+        The contents of the buffer are whatever was last written to it
+
+        :param name: name of the buffer
+        :param shape: shape of the buffer
+        :param dtype: data type of the buffer, defaults to np.uint8
+        :return: buffer
+        """
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = self._buffers[name] = np.empty(shape, dtype=dtype)
+            self._allocations += 1
+        return buffer
+
+    def clear(self) -> None:
+        """Drop all buffers"""
+        self._buffers.clear()
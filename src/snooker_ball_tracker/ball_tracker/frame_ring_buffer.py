@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import numpy.typing as npt
+
+if TYPE_CHECKING:
+    from .types import Frame
+
+
+class FrameRingBuffer:
+    def __init__(
+        self,
+        slots: int,
+        shape: tuple[int, ...],
+        dtype: npt.DTypeLike = np.uint8,
+        name: str | None = None,
+    ) -> None:
+        """Creates an instance of this class that stores a fixed number of
+        frames in preallocated slots of a shared memory block, so frames can be
+        decoded straight into a slot and read by other threads and processes
+        without being copied
+
+        The process that creates the buffer owns it: only the owner can acquire
+        and release slots, and the shared memory block is freed when the owner
+        closes it. Other processes attach to the buffer by passing its `name`
+        and can only read and write the slots they are given. They must be
+        started by the owner through multiprocessing, so that they share its
+        resource tracker and don't free the block when they exit
+
+        :param slots: number of frame slots
+        :param shape: shape of every frame
+        :param dtype: data type of every frame, defaults to np.uint8
+        :param name: name of an existing buffer to attach to, defaults to None
+        """
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = name is None
+        size = slots * int(np.prod(self.shape)) * self.dtype.itemsize
+        self._memory = SharedMemory(name=name, create=self.owner, size=size)
+        self._frames: Frame | None = np.ndarray(
+            (slots, *self.shape), dtype=self.dtype, buffer=self._memory.buf
+        )
+        self._free = deque(range(slots))
+        self._condition = threading.Condition()
+        self._high_water_mark = 0
+
+    def __enter__(self) -> FrameRingBuffer:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __getitem__(self, slot: int) -> Frame:
+        """Get the frame stored in `slot`, which is a view onto shared memory
+
+        :param slot: slot index
+        :return: frame
+        """
+        if self._frames is None:
+            raise ValueError("ring buffer is closed")
+        frame: Frame = self._frames[slot]
+        return frame
+
+    @property
+    def name(self) -> str:
+        """Name other processes can attach to this buffer with
+
+        :return: shared memory name
+        """
+        return self._memory.name
+
+    @property
+    def in_use(self) -> int:
+        """Number of slots that have been acquired and not released yet
+
+        :return: slots in use
+        """
+        return self.slots - len(self._free)
+
+    @property
+    def high_water_mark(self) -> int:
+        """Highest number of slots that have been in use at the same time
+
+        :return: high-water mark
+        """
+        return self._high_water_mark
+
+    def acquire(self, timeout: float | None = None) -> int | None:
+        """Acquire a free slot, blocking until one is released if all
+        slots are in use
+
+        :param timeout: max number of seconds to wait, defaults to None
+        :return: slot index or None if `timeout` expired
+        """
+        self.__check_owner()
+        with self._condition:
+            if not self._condition.wait_for(lambda: len(self._free) > 0, timeout):
+                return None
+            slot = self._free.popleft()
+            self._high_water_mark = max(self._high_water_mark, self.in_use)
+            return slot
+
+    def release(self, slot: int) -> None:
+        """Release `slot` so that it can be written to again
+
+        :param slot: slot index
+        :raises ValueError: if `slot` isn't in use
+        """
+        self.__check_owner()
+        with self._condition:
+            if slot in self._free or not 0 <= slot < self.slots:
+                raise ValueError(f"slot {slot} is not in use")
+            self._free.append(slot)
+            self._condition.notify()
+
+    def write(self, frame: Frame, timeout: float | None = None) -> int | None:
+        """Copy `frame` into a free slot
+
+        :param frame: frame to store, must have the same shape as the buffer
+        :param timeout: max number of seconds to wait for a free slot,
+                        defaults to None
+        :raises ValueError: if `frame` doesn't have the shape of the buffer
+        :return: slot index or None if `timeout` expired
+        """
+        if frame.shape != self.shape:
+            raise ValueError(
+                f"frame shape {frame.shape} does not match buffer shape {self.shape}"
+            )
+        slot = self.acquire(timeout)
+        if slot is not None:
+            np.copyto(self[slot], frame)
+        return slot
+
+    def close(self) -> None:
+        """Close this process' view of the buffer, and free the shared memory
+        block if this process owns it"""
+        if self._frames is None:
+            return
+        self._frames = None
+        try:
+            self._memory.close()
+        except BufferError:
+            # frames handed out are still referenced elsewhere,
+            # the block is unmapped once they have been garbage collected
+            pass
+        if self.owner:
+            self._memory.unlink()
+
+    def __check_owner(self) -> None:
+        """Raise an error if this process does not own the buffer
+
+        :raises RuntimeError: if this process does not own the buffer
+        """
+        if not self.owner:
+            raise RuntimeError("only the owner of a ring buffer can manage its slots")
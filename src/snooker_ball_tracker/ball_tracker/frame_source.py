@@ -0,0 +1,385 @@
+from __future__ import annotations
+
+import os
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+import cv2
+import magic
+import numpy as np
+
+if TYPE_CHECKING:
+    from .types import Frame
+
+# File extensions of the images an image sequence is made of
+IMAGE_EXTENSIONS = (".bmp", ".jpeg", ".jpg", ".png", ".tif", ".tiff", ".webp")
+
+
+class FrameCache:
+    def __init__(self, max_frames: int = 32) -> None:
+        """Creates an instance of this class that keeps the most recently used
+        decoded frames and their timestamps by frame index
+
+        :param max_frames: max number of frames to keep, the least recently
+                           used frame is dropped first, defaults to 32
+        """
+        self.max_frames = max_frames
+        self.hits = 0
+        self.misses = 0
+        self._frames: OrderedDict[int, tuple[Frame, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def get(self, frame_index: int) -> tuple[Frame, float] | None:
+        """Get a cached frame
+
+        :param frame_index: index of the frame
+        :return: frame and its timestamp in seconds, or None if not cached
+        """
+        cached = self._frames.get(frame_index)
+        if cached is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._frames.move_to_end(frame_index)
+        return cached
+
+    def put(self, frame_index: int, frame: Frame, timestamp: float) -> None:
+        """Cache a copy of `frame`
+
+        :param frame_index: index of the frame
+        :param frame: decoded frame
+        :param timestamp: timestamp of the frame in seconds
+        """
+        if self.max_frames <= 0:
+            return
+        self._frames[frame_index] = (frame.copy(), timestamp)
+        self._frames.move_to_end(frame_index)
+        while len(self._frames) > self.max_frames:
+            self._frames.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached frame and reset the hit and miss counters"""
+        self.hits = 0
+        self.misses = 0
+        self._frames.clear()
+
+
+class FrameSource(ABC):
+    def __init__(self, cache_size: int = 32) -> None:
+        """Creates an instance of this class that reads frames in order and
+        supports random access by frame index or timestamp
+
+        Seeking only moves the position of the source, the frame is decoded
+        when it is read. Frames that needed a slow seek to decode are kept in
+        a cache, so that scrubbing back and forth around the same frames
+        doesn't have to seek again
+
+        :param cache_size: max number of decoded frames to cache, defaults to 32
+        """
+        self.cache = FrameCache(cache_size)
+        self._position = 0
+        self._decoder_position = 0
+
+    @property
+    @abstractmethod
+    def frame_count(self) -> int:
+        """Number of frames of the source, which is 0 if it isn't known and
+        only an estimate for video files
+
+        :return: frame count
+        """
+
+    @property
+    @abstractmethod
+    def fps(self) -> float:
+        """Frame rate of the source
+
+        :return: frames per second
+        """
+
+    @property
+    def position(self) -> int:
+        """Index of the frame that will be read next
+
+        :return: position
+        """
+        return self._position
+
+    def seek(self, frame_index: int) -> None:
+        """Move to the frame at `frame_index`, which is clamped to the frame
+        count of the source
+
+        :param frame_index: index of the frame to read next
+        """
+        self._position = max(frame_index, 0)
+        if self.frame_count > 0:
+            self._position = min(self._position, self.frame_count)
+
+    def seek_time(self, timestamp: float) -> None:
+        """Move to the frame shown at `timestamp`
+
+        :param timestamp: timestamp in seconds
+        """
+        self.seek(round(timestamp * self.fps))
+
+    def grab(self) -> bool:
+        """Skip the next frame without decoding it
+
+        :return: False if the end of the source was reached
+        """
+        if self.frame_count > 0 and self._position >= self.frame_count:
+            return False
+        self._position += 1
+        return True
+
+    def read(self, dst: Frame | None = None) -> tuple[Frame, float] | None:
+        """Read the next frame
+
+        :param dst: frame to decode into if it has the right shape,
+                    defaults to None
+        :return: frame and its timestamp in seconds, or None if the end of
+                 the source was reached
+        """
+        frame_index = self._position
+        cached = self.cache.get(frame_index)
+        if cached is not None:
+            frame, timestamp = cached
+            self._position += 1
+            if dst is not None and dst.shape == frame.shape:
+                np.copyto(dst, frame)
+                return dst, timestamp
+            return frame.copy(), timestamp
+
+        seeked = False
+        if self._decoder_position != frame_index:
+            seeked = self._seek(frame_index)
+            self._decoder_position = frame_index
+        decoded = self._read(dst)
+        if decoded is None:
+            return None
+        self._position = self._decoder_position = frame_index + 1
+        if seeked:
+            self.cache.put(frame_index, *decoded)
+        return decoded
+
+    def close(self) -> None:
+        """Release the source and drop every cached frame"""
+        self.cache.clear()
+
+    def __enter__(self) -> FrameSource:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    @abstractmethod
+    def _seek(self, frame_index: int) -> bool:
+        """Move the decoder to the frame at `frame_index`
+
+        :param frame_index: index of the frame to decode next
+        :return: True if the decoder had to seek, which is slow
+        """
+
+    @abstractmethod
+    def _read(self, dst: Frame | None) -> tuple[Frame, float] | None:
+        """Decode the frame the decoder is at
+
+        :param dst: frame to decode into if it has the right shape
+        :return: frame and its timestamp in seconds, or None if the end of
+                 the source was reached
+        """
+
+
+class VideoFileSource(FrameSource):
+    def __init__(
+        self, path: str, cache_size: int = 32, max_grab_frames: int = 30
+    ) -> None:
+        """Creates an instance of this class that reads frames from a video file,
+        which is opened once for the lifetime of the source
+
+        Seeking forwards by up to `max_grab_frames` frames grabs the frames in
+        between without decoding them, which is faster than seeking with the
+        decoder for most codecs as seeking has to decode from a keyframe
+
+        :param path: path to the video file
+        :param cache_size: max number of decoded frames to cache, defaults to 32
+        :param max_grab_frames: max number of frames to grab to seek forwards,
+                                defaults to 30
+        :raises TypeError: if `path` can't be opened as a video
+        """
+        super().__init__(cache_size)
+        self.path = path
+        self.max_grab_frames = max_grab_frames
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise TypeError(f"{path} is not a video file")
+        self._frame_count = max(int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT)), 0)
+        self._fps = self.capture.get(cv2.CAP_PROP_FPS) or 25.0
+
+    @property
+    def frame_count(self) -> int:
+        return self._frame_count
+
+    @property
+    def fps(self) -> float:
+        return float(self._fps)
+
+    def seek(self, frame_index: int) -> None:
+        """Move to the frame at `frame_index`, which isn't clamped to the
+        frame count, as the frame count of a video file is only an estimate
+
+        :param frame_index: index of the frame to read next
+        """
+        self._position = max(frame_index, 0)
+
+    def grab(self) -> bool:
+        """Skip the next frame by grabbing it from the decoder without
+        decoding it, as the end of a video file can only be found by reading
+        past it
+
+        :return: False if the end of the video was reached
+        """
+        if self._decoder_position != self._position:
+            self._seek(self._position)
+            self._decoder_position = self._position
+        if not self.capture.grab():
+            return False
+        self._position = self._decoder_position = self._position + 1
+        return True
+
+    def close(self) -> None:
+        super().close()
+        self.capture.release()
+
+    def _seek(self, frame_index: int) -> bool:
+        skip = frame_index - self._decoder_position
+        if 0 < skip <= self.max_grab_frames:
+            for _ in range(skip):
+                if not self.capture.grab():
+                    break
+            return False
+        self.capture.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        return True
+
+    def _read(self, dst: Frame | None) -> tuple[Frame, float] | None:
+        grabbed, frame = self.capture.read(dst)
+        if not grabbed:
+            return None
+        return frame, self.capture.get(cv2.CAP_PROP_POS_MSEC) / 1000
+
+
+class ImageSequenceSource(FrameSource):
+    def __init__(self, path: str, fps: float = 25.0, cache_size: int = 32) -> None:
+        """Creates an instance of this class that reads frames from the images
+        in a directory, in the order of their file names
+
+        :param path: path to the directory
+        :param fps: frame rate to derive timestamps from, defaults to 25.0
+        :param cache_size: max number of decoded frames to cache, defaults to 32
+        :raises TypeError: if the directory doesn't contain any images
+        """
+        super().__init__(cache_size)
+        self.path = path
+        self.files = sorted(
+            os.path.join(path, file)
+            for file in os.listdir(path)
+            if file.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.files:
+            raise TypeError(f"{path} does not contain any images")
+        self._fps = fps
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.files)
+
+    @property
+    def fps(self) -> float:
+        return self._fps
+
+    def _seek(self, frame_index: int) -> bool:
+        # every image is decoded on its own, so there is nothing to seek
+        return False
+
+    def _read(self, dst: Frame | None) -> tuple[Frame, float] | None:
+        frame_index = self._decoder_position
+        if frame_index >= len(self.files):
+            return None
+        frame: Frame | None = cv2.imread(self.files[frame_index], cv2.IMREAD_COLOR)
+        if frame is None:
+            raise TypeError(f"{self.files[frame_index]} is not an image")
+        if dst is not None and dst.shape == frame.shape:
+            np.copyto(dst, frame)
+            frame = dst
+        return frame, frame_index / self._fps
+
+
+class NumpyFrameSource(FrameSource):
+    def __init__(self, path: str, fps: float = 25.0, cache_size: int = 32) -> None:
+        """Creates an instance of this class that reads frames from a raw dump
+        of frames saved with `numpy.save`, which is memory mapped rather than
+        loaded into memory
+
+        :param path: path to a .npy file with an array of (frames, height,
+                     width, channels) BGR frames
+        :param fps: frame rate to derive timestamps from, defaults to 25.0
+        :param cache_size: max number of decoded frames to cache, defaults to 32
+        :raises TypeError: if the file isn't an array of BGR frames
+        """
+        super().__init__(cache_size)
+        self.path = path
+        try:
+            self.frames: Frame = np.load(path, mmap_mode="r")
+        except ValueError as error:
+            raise TypeError(f"{path} is not a numpy array") from error
+        if self.frames.ndim != 4 or self.frames.shape[3] != 3:
+            raise TypeError(f"{path} is not an array of BGR frames")
+        self._fps = fps
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.frames)
+
+    @property
+    def fps(self) -> float:
+        return self._fps
+
+    def _seek(self, frame_index: int) -> bool:
+        # frames are memory mapped, so there is nothing to seek
+        return False
+
+    def _read(self, dst: Frame | None) -> tuple[Frame, float] | None:
+        frame_index = self._decoder_position
+        if frame_index >= len(self.frames):
+            return None
+        # frames are copied out of the memory map, which is read only
+        frame = self.frames[frame_index]
+        if dst is None or dst.shape != frame.shape:
+            dst = np.empty(frame.shape, dtype=frame.dtype)
+        np.copyto(dst, frame)
+        return dst, frame_index / self._fps
+
+
+def open_frame_source(
+    path: str, fps: float = 25.0, cache_size: int = 32
+) -> FrameSource:
+    """Open the frame source for `path`, which is an image sequence if it is a
+    directory, a raw frame dump if it is a .npy file and a video file otherwise
+
+    :param path: path to open
+    :param fps: frame rate of image sequences and raw frame dumps,
+                defaults to 25.0
+    :param cache_size: max number of decoded frames to cache, defaults to 32
+    :raises TypeError: if `path` can't be read frames from
+    :return: frame source
+    """
+    if os.path.isdir(path):
+        return ImageSequenceSource(path, fps, cache_size)
+    if path.lower().endswith(".npy"):
+        return NumpyFrameSource(path, fps, cache_size)
+    if "video" not in magic.from_file(path, mime=True):  # type: ignore[no-untyped-call]
+        raise TypeError(f"{path} is not a video file")
+    return VideoFileSource(path, cache_size)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, NamedTuple
+
+import cv2
+
+if TYPE_CHECKING:
+    from .frame_source import FrameSource
+    from .types import Frame
+
+
+class ResolutionLadder(NamedTuple):
+    # width of frames used for motion gating and table detection,
+    # None uses the width of the frames balls are detected in
+    low: int | None = None
+    # width of frames balls are detected in, None keeps the decoded width
+    medium: int | None = None
+    # sample ball colours from the decoded frames rather than from the
+    # frames balls are detected in
+    full_colour: bool = False
+
+
+class IngestedFrame(NamedTuple):
+    frame_index: int
+    timestamp: float
+    frame: Frame
+    full_frame: Frame | None
+
+
+class FrameIngest:
+    def __init__(
+        self,
+        source: FrameSource,
+        ladder: ResolutionLadder | None = None,
+        decimation: int = 1,
+    ) -> None:
+        """Creates an instance of this class that reads frames from `source`
+        at the resolutions of `ladder`
+
+        Only every `decimation`-th frame is decoded, the frames in between are
+        grabbed without being retrieved, which skips decoding them for most
+        codecs. Decoded frames are resized to the medium rung of `ladder` into
+        a buffer that is reused for every frame, so frames returned by `read`
+        are only valid until it is called again
+
+        :param source: frame source to read frames from
+        :param ladder: resolutions to ingest frames at, defaults to decoding
+                       and processing frames at the resolution of the video
+        :param decimation: process every `decimation`-th frame, defaults to 1
+        """
+        self.source = source
+        self.ladder = ladder or ResolutionLadder()
+        self.decimation = max(decimation, 1)
+        self.decoded = 0
+        self.skipped = 0
+        self.decode_time = 0.0
+        self.resize_time = 0.0
+        self._decoded_frame: Frame | None = None
+        self._resized_frame: Frame | None = None
+
+    def read(self) -> IngestedFrame | None:
+        """Read the next frame to process
+
+        :return: next frame or None if the end of the video was reached
+        """
+        started = time.perf_counter()
+        if self.decoded > 0:
+            for _ in range(self.decimation - 1):
+                if not self.source.grab():
+                    return None
+                self.skipped += 1
+        frame_index = self.source.position
+        decoded = self.source.read(self._decoded_frame)
+        self.decode_time += time.perf_counter() - started
+        if decoded is None:
+            return None
+        frame, timestamp = decoded
+        self._decoded_frame = frame
+        self.decoded += 1
+
+        return IngestedFrame(
+            frame_index,
+            timestamp,
+            self.resize(frame),
+            frame if self.ladder.full_colour else None,
+        )
+
+    def resize(self, frame: Frame) -> Frame:
+        """Resize `frame` to the medium rung of the ladder
+
+        :param frame: decoded frame
+        :return: resized frame, or `frame` if it already has the medium width
+        """
+        width = self.ladder.medium
+        if width is None or width == frame.shape[1]:
+            return frame
+        started = time.perf_counter()
+        height = int(frame.shape[0] * width / frame.shape[1])
+        # OpenCV only allocates a new buffer if the frame size has changed
+        resized: Frame = cv2.resize(
+            frame,
+            (width, height),
+            dst=self._resized_frame,
+            interpolation=cv2.INTER_AREA,
+        )
+        self._resized_frame = resized
+        self.resize_time += time.perf_counter() - started
+        return resized
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from queue import Queue
+from typing import TYPE_CHECKING, Any
+
+import cv2
+
+from ..enums import SchedulingPolicy
+from .pacing import FramePacer
+from .video_stream import VideoStream
+
+if TYPE_CHECKING:
+    from . import ColourDetectionSettings, VideoPlayer
+    from .types import Frame
+
+
+class LiveStream(VideoStream):
+    def __init__(
+        self,
+        source: str | int,
+        video_player: VideoPlayer,
+        colour_settings: ColourDetectionSettings,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 8.0,
+    ):
+        """Create instance of LiveStream that captures frames from a live source,
+        such as a capture device or a network stream, in a separate thread
+
+        Only the newest frame is kept: a captured frame replaces the frame
+        waiting to be processed if it hasn't been read yet, so frames are never
+        more than one frame old when they are processed. Each frame is given the
+        time it was captured at as its timestamp, in seconds since the stream
+        was started
+
+        The stream reconnects to the source whenever it drops, waiting
+        `reconnect_delay` before the first attempt and twice as long after
+        every failed attempt, up to `max_reconnect_delay`. Video files are read
+        at their frame rate and start over once they end, so they can stand in
+        for a live source
+
+        :param source: index of a capture device, or url or path of a stream
+        :param video_player: video player to obtain transformation settings from
+        :param colour_settings: colour settings to obtain colours from
+        :param reconnect_delay: seconds to wait before reconnecting,
+                                defaults to 0.5
+        :param max_reconnect_delay: max seconds to wait between failed attempts
+                                    to reconnect, defaults to 8.0
+        """
+        self._video_player = video_player
+        self._colour_settings = colour_settings
+
+        if isinstance(source, str) and source.isdigit():
+            source = int(source)
+        self.source = source
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.capture: cv2.VideoCapture | None = None
+        self.Q: Queue[Any] = Queue()
+        self.stopped = False
+        self.thread = threading.Thread(
+            target=self.update, name=self.__class__.__name__, daemon=True
+        )
+        self.queue_size = 1
+        # one slot for the queued frame, two for the frames held by the
+        # consumer and one for the frame being captured
+        self.buffer_slots = 4
+        self.scheduling_policy = SchedulingPolicy.DROP_TO_LATEST
+        self.fps = 25.0
+        self.dropped = 0
+        self.reconnects = 0
+        self.ring_buffer = None
+        self.timestamp: float | None = None
+        self.decoded_at: float | None = None
+        self._read_slots: deque[int] = deque()
+        self.__file = isinstance(source, str) and os.path.isfile(source)
+        self.__pacer = FramePacer(self.fps)
+        self.__captured_frame: Frame | None = None
+        self.__started = time.perf_counter()
+        self.__stop_event = threading.Event()
+
+    def start(self) -> None:
+        """Start capturing frames in a separate thread"""
+        self.__started = time.perf_counter()
+        self.thread.start()
+
+    def update(self) -> None:
+        """Capture frames into free ring buffer slots until the stream is
+        stopped, reconnecting to the source whenever it drops"""
+        delay = self.reconnect_delay
+        while not self.stopped:
+            if self.capture is None:
+                if self.__connect():
+                    delay = self.reconnect_delay
+                else:
+                    self.__stop_event.wait(delay)
+                    delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+
+            if not self.capture.grab():
+                # the source dropped, reconnect straight away
+                self.capture.release()
+                self.capture = None
+                self.reconnects += 1
+                continue
+            if self.__file:
+                self.__pacer.wait(self.capture.get(cv2.CAP_PROP_POS_MSEC) / 1000)
+            captured_at = time.perf_counter()
+            retrieved, frame = self.capture.retrieve(self.__captured_frame)
+            if not retrieved:
+                continue
+            self.__captured_frame = frame
+
+            slot = self._write_frame(frame)
+            if slot is not None:
+                # keep only the newest frame
+                self._drop_frames(self.Q.qsize())
+                self.Q.put((slot, captured_at - self.__started, captured_at))
+
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+    def __connect(self) -> bool:
+        """Open the source
+
+        :return: True if the source was opened
+        """
+        capture = cv2.VideoCapture(self.source)
+        if not capture.isOpened():
+            capture.release()
+            return False
+        # don't let the driver queue up frames, as only the newest is kept
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+        self.__pacer = FramePacer(self.fps)
+        self.capture = capture
+        return True
+
+    def running(self) -> bool:
+        """Determine if there are frames left to read
+
+        :return: True until the stream is stopped
+        """
+        return not self.stopped
+
+    def stop(self) -> None:
+        """Stop capturing frames, disconnect from the source and free the
+        ring buffer"""
+        self.stopped = True
+        self.__stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        if self.ring_buffer is not None:
+            self.ring_buffer.close()
+            # frames still queued can no longer be read
+            self.ring_buffer = None
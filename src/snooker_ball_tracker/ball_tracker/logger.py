@@ -1,18 +1,29 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import PyQt5.QtCore as QtCore
 
 from .balls import BallsPotted
-from .snapshot import SnapShot
+from .snapshot_model import SnapShotModel
+
+if TYPE_CHECKING:
+    from .ball_tracker import BallTracker
 
 
 class Logger(QtCore.QObject):
     def __init__(self) -> None:
         """Creates an instance of this class that contains properties for logging
-        output from the ball tracker"""
+        output from the ball tracker
+
+        The ball tracker no longer takes a logger to write to, instead the
+        logger mirrors the state of a ball tracker when `update` is called
+        """
         super().__init__()
         self._balls_potted = BallsPotted()
-        self._last_shot_snapshot = SnapShot()
-        self._cur_shot_snapshot = SnapShot()
-        self._temp_snapshot = SnapShot()
+        self._last_shot_snapshot = SnapShotModel()
+        self._cur_shot_snapshot = SnapShotModel()
+        self._white_status = False
 
     @property
     def balls_potted(self) -> BallsPotted:
@@ -22,31 +33,29 @@ class Logger(QtCore.QObject):
         """
         return self._balls_potted
 
+    white_statusChanged = QtCore.pyqtSignal(bool)
+
     @property
     def white_status(self) -> bool:
         """White status property
 
         :return: white status
         """
-        return (
-            self._cur_shot_snapshot.white.is_moving
-            if self._cur_shot_snapshot.white
-            else False
-        )
+        return self._white_status
 
-    white_statusChanged = QtCore.pyqtSignal(bool)
-
-    def set_white_status(self, value: bool) -> None:
-        """White status setter
+    @white_status.setter
+    def white_status(self, value: bool) -> None:
+        """White status setter, only emits `white_statusChanged` if the
+        status is different
 
         :param value: value to set
         """
-        if self._cur_shot_snapshot.white:
-            self._cur_shot_snapshot.white.is_moving = value
-            self.white_statusChanged.emit(value)
+        if value != self._white_status:
+            self._white_status = value
+            self.white_statusChanged.emit(self._white_status)
 
     @property
-    def last_shot_snapshot(self) -> SnapShot:
+    def last_shot_snapshot(self) -> SnapShotModel:
         """Last shot snapshot property
 
         :return: last shot snapshot model
@@ -54,17 +63,19 @@ class Logger(QtCore.QObject):
         return self._last_shot_snapshot
 
     @property
-    def cur_shot_snapshot(self) -> SnapShot:
+    def cur_shot_snapshot(self) -> SnapShotModel:
         """Current shot snapshot property
 
         :return: current shot snapshot model
         """
         return self._cur_shot_snapshot
 
-    @property
-    def temp_snapshot(self) -> SnapShot:
-        """Temporary snapshot property
+    def update(self, ball_tracker: BallTracker) -> None:
+        """Update the models from the current state of `ball_tracker`, this should
+        be called after each processed frame
 
-        :return: temp shot snapshot model
+        :param ball_tracker: ball tracker to take snapshots and white status from
         """
-        return self._temp_snapshot
+        self._last_shot_snapshot.update(ball_tracker.last_shot_snapshot)
+        self._cur_shot_snapshot.update(ball_tracker.cur_shot_snapshot)
+        self.white_status = ball_tracker.white_status
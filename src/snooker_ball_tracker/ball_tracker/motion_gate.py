@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import cv2
+
+if TYPE_CHECKING:
+    from .types import Frame
+
+
+class MotionGate:
+    def __init__(
+        self,
+        width: int = 320,
+        pixel_threshold: int = 25,
+        min_changed_pixels: int = 3,
+        settle_frames: int = 10,
+    ) -> None:
+        """Creates an instance of this class that cheaply determines if anything
+        has moved on the table since the last processed frame, so that frames
+        where the table is static can skip ball detection
+
+        Frames are converted to grayscale, downscaled to `width` and compared
+        against the last processed frame, only looking at pixels inside the
+        table boundary if one has been detected
+
+        :param width: width to downscale frames to before comparing them,
+                      defaults to 320
+        :param pixel_threshold: min change in intensity for a pixel to count as
+                                changed, defaults to 25
+        :param min_changed_pixels: min number of changed pixels for the table to
+                                   count as having moved, defaults to 3
+        :param settle_frames: number of frames to keep processing after motion
+                              has stopped, so that ball positions settle before
+                              frames are skipped, defaults to 10
+        """
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self.settle_frames = settle_frames
+        self.processed = 0
+        self.skipped = 0
+        self._reference: Frame | None = None
+        self._latest: Frame | None = None
+        self._mask: Frame | None = None
+        self._mask_source: Frame | None = None
+        self._frames_since_motion = 0
+
+    def reset(self) -> None:
+        """Forget the reference frame and reset the frame counters"""
+        self.processed = 0
+        self.skipped = 0
+        self._reference = None
+        self._latest = None
+        self._frames_since_motion = 0
+
+    def downscale(self, frame: Frame) -> Frame:
+        """Convert `frame` to a small grayscale frame used for comparisons
+
+        :param frame: BGR frame to downscale
+        :return: downscaled grayscale frame
+        """
+        height = max(int(frame.shape[0] * self.width / frame.shape[1]), 1)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        small: Frame = cv2.resize(
+            gray, (self.width, height), interpolation=cv2.INTER_AREA
+        )
+        return small
+
+    def has_motion(self, frame: Frame, table_mask: Frame | None = None) -> bool:
+        """Determine if `frame` differs from the last processed frame
+
+        :param frame: BGR frame to check
+        :param table_mask: mask where the table is white and everything else is
+                           black, defaults to None
+        :return: True if anything has moved or there is nothing to compare with
+        """
+        small = self._latest = self.downscale(frame)
+        if self._reference is None or self._reference.shape != small.shape:
+            return True
+
+        diff = cv2.absdiff(small, self._reference)
+        _, changed = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+        if table_mask is not None:
+            changed = cv2.bitwise_and(changed, self._get_mask(table_mask, small))
+
+        return bool(cv2.countNonZero(changed) >= self.min_changed_pixels)
+
+    def should_process(
+        self, frame: Frame, table_mask: Frame | None = None, force: bool = False
+    ) -> bool:
+        """Determine if `frame` needs to go through ball detection and update
+        the processed/skipped counters
+
+        :param frame: BGR frame to check
+        :param table_mask: mask where the table is white and everything else is
+                           black, defaults to None
+        :param force: process the frame regardless of motion, defaults to False
+        :return: True if the frame should be processed, False if it can be skipped
+        """
+        if self.has_motion(frame, table_mask) or force:
+            self._frames_since_motion = 0
+        else:
+            self._frames_since_motion += 1
+
+        if self._frames_since_motion <= self.settle_frames:
+            self._reference = self._latest
+            self.processed += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def _get_mask(self, table_mask: Frame, small: Frame) -> Frame:
+        """Get `table_mask` downscaled to the size of `small`, caching the result
+        until a new table mask is provided
+
+        :param table_mask: full size table mask
+        :param small: downscaled frame the mask is applied to
+        :return: downscaled single channel table mask
+        """
+        if (
+            table_mask is not self._mask_source
+            or self._mask is None
+            or self._mask.shape != small.shape
+        ):
+            mask: Frame = cv2.resize(
+                table_mask[:, :, 0] if table_mask.ndim == 3 else table_mask,
+                (small.shape[1], small.shape[0]),
+                interpolation=cv2.INTER_NEAREST,
+            )
+            self._mask, self._mask_source = mask, table_mask
+            return mask
+        return self._mask
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+if TYPE_CHECKING:
+    from .types import Frame, Keypoints
+
+Colour = Tuple[int, int, int]
+
+# Colour that balls and the contours of the colour being detected are drawn in
+OVERLAY_GREEN: Colour = (0, 255, 0)
+# Colour that the table boundary is drawn in
+OVERLAY_WHITE: Colour = (255, 255, 255)
+
+
+class Circle(NamedTuple):
+    centre: tuple[float, float]
+    radius: float
+    colour: Colour
+    thickness: int = 1
+
+
+class Label(NamedTuple):
+    text: str
+    origin: tuple[float, float]
+    colour: Colour
+    scale: float = 0.6
+    thickness: int = 2
+
+
+class Polyline(NamedTuple):
+    # (n, 1, 2) or (n, 2) array of points, as returned by cv2.findContours
+    points: Frame
+    colour: Colour
+    thickness: int = 1
+    closed: bool = True
+
+
+class Overlay:
+    def __init__(self) -> None:
+        """Creates an instance of this class that describes what to draw over a
+        processed frame, such as detected balls and the table boundary, without
+        drawing it
+
+        Shapes are in the coordinates of the processed frame and colours are BGR.
+        They are only rasterised by `render`, so nothing is drawn unless the
+        frame is displayed, and they can be rendered onto a frame of another
+        resolution than the one they were found in
+        """
+        self.circles: list[Circle] = []
+        self.labels: list[Label] = []
+        self.polylines: list[Polyline] = []
+
+    def __len__(self) -> int:
+        return len(self.circles) + len(self.labels) + len(self.polylines)
+
+    def add_balls(self, balls: Keypoints, colour: Colour = OVERLAY_GREEN) -> None:
+        """Add a circle around and a label next to every ball of `balls`
+
+        :param balls: balls to add, by colour
+        :param colour: colour to draw them in, defaults to OVERLAY_GREEN
+        """
+        for ball_colour, ball_list in balls.items():
+            for ball in ball_list:
+                x, y = ball.pt
+                self.labels.append(Label(ball_colour, (x + 10, y), colour))
+                self.circles.append(Circle((x, y), ball.size / 2, colour))
+
+    def add_contours(
+        self,
+        contours: Sequence[Frame],
+        colour: Colour,
+        thickness: int = 1,
+        offset: tuple[int, int] = (0, 0),
+    ) -> None:
+        """Add closed polylines along `contours`
+
+        :param contours: contours to add
+        :param colour: colour to draw them in
+        :param thickness: line thickness in pixels, defaults to 1
+        :param offset: (x, y) offset to add to every point, defaults to (0, 0)
+        """
+        for contour in contours:
+            points = (
+                contour + np.array(offset, dtype=contour.dtype)
+                if any(offset)
+                else contour
+            )
+            self.polylines.append(Polyline(points, colour, thickness))
+
+    def render(self, frame: Frame, scale: float = 1.0, rgb: bool = False) -> Frame:
+        """Draw every shape onto `frame`
+
+        :param frame: frame to draw onto
+        :param scale: factor from the coordinates of the shapes to the
+                      coordinates of `frame`, defaults to 1.0
+        :param rgb: if True `frame` is RGB rather than BGR, defaults to False
+        :return: `frame`
+        """
+        for polyline in self.polylines:
+            points = polyline.points if scale == 1.0 else polyline.points * scale
+            cv2.polylines(
+                frame,
+                [points.astype(np.int32)],
+                polyline.closed,
+                self.__colour(polyline.colour, rgb),
+                polyline.thickness,
+            )
+        for label in self.labels:
+            cv2.putText(
+                frame,
+                label.text,
+                (int(label.origin[0] * scale), int(label.origin[1] * scale)),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                label.scale,
+                self.__colour(label.colour, rgb),
+                thickness=label.thickness,
+            )
+        for circle in self.circles:
+            cv2.circle(
+                frame,
+                (int(circle.centre[0] * scale), int(circle.centre[1] * scale)),
+                int(circle.radius * scale),
+                self.__colour(circle.colour, rgb),
+                circle.thickness,
+            )
+        return frame
+
+    @staticmethod
+    def __colour(colour: Colour, rgb: bool) -> Colour:
+        """Convert a BGR colour to the channel order of the frame drawn onto
+
+        :param colour: BGR colour
+        :param rgb: if True convert `colour` to RGB
+        :return: colour
+        """
+        return (colour[2], colour[1], colour[0]) if rgb else colour
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import time
+
+
+class FramePacer:
+    def __init__(self, fps: float = 25.0, max_lag: float = 0.5) -> None:
+        """Creates an instance of this class that holds back frames until they
+        are due, so that frames are shown at the rate they were captured at
+        rather than as fast as they can be processed
+
+        Frames are due at the time between their presentation timestamp and
+        the timestamp of the first frame after the wall clock time the first
+        frame was paced at. The pacer starts over from the next frame when it
+        falls more than `max_lag` behind, or when timestamps jump, so it never
+        tries to catch up with a burst of frames or stalls after a seek
+
+        :param fps: frame rate used to derive timestamps for frames that
+                    don't have one, defaults to 25.0
+        :param max_lag: max number of seconds a frame can be early or late
+                        before the pacer starts over, defaults to 0.5
+        """
+        self.fps = fps if fps > 0 else 25.0
+        self.max_lag = max_lag
+        self._origin: tuple[float, float] | None = None
+        self._last_timestamp: float | None = None
+
+    def reset(self) -> None:
+        """Start over from the next frame, such as after playback was paused"""
+        self._origin = None
+        self._last_timestamp = None
+
+    def wait(self, timestamp: float | None) -> float:
+        """Sleep until the frame at `timestamp` is due
+
+        :param timestamp: presentation timestamp of the frame in seconds,
+                          or None to assume it directly follows the last frame
+        :return: number of seconds slept
+        """
+        if timestamp is None:
+            timestamp = (
+                self._last_timestamp + 1 / self.fps
+                if self._last_timestamp is not None
+                else 0.0
+            )
+        now = time.perf_counter()
+        delay = 0.0
+        if self._origin is not None:
+            clock, origin_timestamp = self._origin
+            delay = clock + timestamp - origin_timestamp - now
+        if self._origin is None or not -self.max_lag <= delay <= self.max_lag:
+            self._origin = (now, timestamp)
+            delay = 0.0
+        self._last_timestamp = timestamp
+        if delay > 0:
+            time.sleep(delay)
+        return delay
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, NamedTuple
+
+import cv2
+import numpy as np
+
+from snooker_ball_tracker.enums import ColourDetectionMode
+
+from .frame_ring_buffer import FrameRingBuffer
+from .util import offset_keypoints
+
+if TYPE_CHECKING:
+    from .ball_tracker import BallTracker
+    from .types import Frame, Keypoints
+
+
+class FrameDetection(NamedTuple):
+    balls: Frame
+    colours: list[str] | None
+
+
+class FrameResult(NamedTuple):
+    frame_index: int
+    timestamp: float
+    table_found: bool
+    ball_potted: str | None
+    pot_count: int
+
+
+# Ball tracker and frame ring buffer used by each worker process,
+# created by `_init_worker`
+_worker_ball_tracker: BallTracker | None = None
+_worker_ring_buffer: FrameRingBuffer | None = None
+
+
+def _init_worker(
+    colour_settings: dict[str, Any],
+    ball_settings: dict[str, Any],
+    colour_detection_mode: ColourDetectionMode,
+    table_bounds: Frame | None,
+    table_bounds_mask: Frame | None,
+    table_roi: tuple[int, int, int, int] | None,
+    ring_buffer: tuple[str, int, tuple[int, ...], str],
+) -> None:
+    """Create the ball tracker used by a worker process and attach to the
+    frame ring buffer of the reducer
+
+    :param colour_settings: colour detection settings of the reducer's tracker
+    :param ball_settings: ball detection settings of the reducer's tracker
+    :param colour_detection_mode: colour detection mode of the reducer's tracker
+    :param table_bounds: table boundary of the reducer's tracker
+    :param table_bounds_mask: table boundary mask of the reducer's tracker
+    :param table_roi: table bounding rectangle of the reducer's tracker
+    :param ring_buffer: name, slots, frame shape and frame dtype of the
+                        reducer's ring buffer
+    """
+    global _worker_ball_tracker, _worker_ring_buffer
+    from .ball_tracker import BallTracker, setup_blob_detector
+
+    # each worker already has a core to itself
+    cv2.setNumThreads(1)
+
+    ball_tracker = BallTracker(
+        colour_detection_mode=colour_detection_mode, reuse_buffers=True
+    )
+    # the settings are updated in place rather than through their setters,
+    # which pass values through Qt signals typed for the integer GUI sliders
+    ball_tracker.colour_settings.settings.update(colour_settings)
+    ball_tracker.colour_classifier.invalidate()
+    ball_tracker.ball_settings.settings.update(ball_settings)
+    setup_blob_detector(ball_tracker)
+    ball_tracker.table_bounds = table_bounds
+    ball_tracker.table_bounds_mask = table_bounds_mask
+    ball_tracker.table_roi = table_roi
+    _worker_ball_tracker = ball_tracker
+
+    name, slots, shape, dtype = ring_buffer
+    _worker_ring_buffer = FrameRingBuffer(slots, shape, dtype, name=name)
+
+
+def _detect(
+    slot: int,
+    crop_frames: bool,
+    perform_morph: bool,
+    colour_detection: bool,
+    crop_to_table: bool,
+) -> FrameDetection:
+    """Run the stateless part of frame processing in a worker process
+
+    :param slot: ring buffer slot of the frame to process
+    :param crop_frames: if True fill everything outside the table boundary
+    :param perform_morph: if True perform opening morphology on the binary frame
+    :param colour_detection: if True map a colour to each detected ball
+    :param crop_to_table: if True only process the table's bounding rectangle
+    :raises ValueError: if the table cloth could not be found in `frame`
+    :return: balls detected in `frame`
+    """
+    if _worker_ball_tracker is None or _worker_ring_buffer is None:
+        raise RuntimeError("worker has not been initialised")
+    frame = _worker_ring_buffer[slot]
+    origin = (0, 0)
+    if crop_to_table and _worker_ball_tracker.table_roi is not None:
+        frame = _worker_ball_tracker.crop(frame)
+        origin = _worker_ball_tracker.table_roi[:2]
+    _, threshold, hsv = _worker_ball_tracker.prepare_frame(
+        frame, crop_frames=crop_frames, perform_morph=perform_morph, fill_frame=False
+    )
+    if colour_detection:
+        balls = _worker_ball_tracker.perform_colour_detection(threshold, hsv)
+        keypoints = [ball for ball_list in balls.values() for ball in ball_list]
+        offset_keypoints(keypoints, origin)
+        return FrameDetection(
+            _encode_keypoints(keypoints),
+            [colour for colour, ball_list in balls.items() for _ in ball_list],
+        )
+    keypoints = _worker_ball_tracker.blob_detector.detect(threshold)
+    offset_keypoints(keypoints, origin)
+    return FrameDetection(_encode_keypoints(keypoints), None)
+
+
+def _encode_keypoints(keypoints: list[cv2.KeyPoint]) -> Frame:
+    """Pack keypoints into an array, as keypoints can't be pickled
+
+    :param keypoints: keypoints to pack
+    :return: array of (x, y, size) rows
+    """
+    balls: Frame = np.array(
+        [(*keypoint.pt, keypoint.size) for keypoint in keypoints], dtype=np.float64
+    ).reshape(-1, 3)
+    return balls
+
+
+def _decode_keypoints(balls: Frame) -> list[cv2.KeyPoint]:
+    """Unpack keypoints packed by `_encode_keypoints`
+
+    :param balls: array of (x, y, size) rows
+    :return: list of keypoints
+    """
+    return [cv2.KeyPoint(x, y, size) for x, y, size in balls.tolist()]
+
+
+class FramePipeline:
+    def __init__(
+        self,
+        ball_tracker: BallTracker,
+        workers: int | None = None,
+        crop_frames: bool = False,
+        perform_morph: bool = False,
+        max_pending: int | None = None,
+        crop_to_table: bool = False,
+        detection_interval: int | None = None,
+    ) -> None:
+        """Creates an instance of this class that processes frames of a video
+        across multiple worker processes
+
+        Workers run the stateless part of frame processing: HSV conversion,
+        table masks, blob detection and colour detection. Their results are
+        then applied to `ball_tracker` strictly in frame order, which updates
+        the tracks and snapshots the same way as `BallTracker.process_frame`
+
+        Detection itself differs from `BallTracker.process_frame`, so results
+        can differ from processing the same frames in a single process. Workers
+        always search whole frames, as search windows depend on the tracks of
+        the previous frame, and colour detection runs every
+        `detection_interval` frames rather than when the cadence policy of
+        `ball_tracker` asks for it, as the policy depends on earlier frames
+
+        Frames are passed to workers through a shared memory ring buffer with
+        a slot for every pending frame, rather than being pickled
+
+        :param ball_tracker: ball tracker to apply detections to, its settings
+                             are copied to every worker
+        :param workers: number of worker processes, defaults to the CPU count
+        :param crop_frames: if True detect the table in the first frame and fill
+                            everything outside it, defaults to False
+        :param perform_morph: if True perform opening morphology on binary frames,
+                              defaults to False
+        :param max_pending: max number of frames submitted to workers but not
+                            applied yet, defaults to 4 times `workers`
+        :param crop_to_table: if True detect the table in the first frame and
+                              only process its bounding rectangle in every
+                              later frame, defaults to False
+        :param detection_interval: number of frames between colour detections,
+                                   which is fixed as frames are submitted to
+                                   workers before earlier frames have been
+                                   applied, defaults to the current interval
+                                   of the cadence policy of `ball_tracker`
+        """
+        self.ball_tracker = ball_tracker
+        self.workers = workers or os.cpu_count() or 1
+        self.crop_frames = crop_frames
+        self.perform_morph = perform_morph
+        self.max_pending = max_pending or self.workers * 4
+        self.crop_to_table = crop_to_table
+        self.detection_interval = detection_interval or ball_tracker.cadence.interval
+        self.ring_buffer: FrameRingBuffer | None = None
+
+    def process(self, frames: Iterable[tuple[Frame, float]]) -> Iterator[FrameResult]:
+        """Process `frames` and yield a result for each of them in order
+
+        The first frame is processed directly by the ball tracker, so that the
+        table boundary can be detected before workers are started
+
+        :param frames: frames to process and their presentation timestamps
+                       in seconds, which shot start and finish are measured
+                       against
+        :return: iterator of frame results
+        """
+        frames = iter(frames)
+        first = next(frames, None)
+        if first is None:
+            return
+        first_frame, first_timestamp = first
+        yield self.__process_first_frame(first_frame, first_timestamp)
+
+        with FrameRingBuffer(
+            self.max_pending, first_frame.shape, first_frame.dtype
+        ) as self.ring_buffer, ProcessPoolExecutor(
+            max_workers=self.workers,
+            # workers must not inherit the Qt and OpenCV threads of this process
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                self.ball_tracker.colour_settings.settings,
+                self.ball_tracker.ball_settings.settings,
+                self.ball_tracker.colour_detection_mode,
+                self.ball_tracker.table_bounds,
+                self.ball_tracker.table_bounds_mask,
+                self.ball_tracker.table_roi,
+                (
+                    self.ring_buffer.name,
+                    self.ring_buffer.slots,
+                    self.ring_buffer.shape,
+                    self.ring_buffer.dtype.str,
+                ),
+            ),
+        ) as executor:
+            pending: deque[tuple[int, float, int, Future[FrameDetection]]] = deque()
+            for index, (frame, timestamp) in enumerate(frames, start=1):
+                if len(pending) >= self.max_pending:
+                    yield self.__apply(*pending.popleft())
+                slot = self.ring_buffer.write(frame)
+                if slot is None:
+                    raise RuntimeError("no free ring buffer slot")
+                future = executor.submit(
+                    _detect,
+                    slot,
+                    self.crop_frames,
+                    self.perform_morph,
+                    index % self.detection_interval == 0,
+                    self.crop_to_table,
+                )
+                pending.append((index, timestamp, slot, future))
+            while pending:
+                yield self.__apply(*pending.popleft())
+
+    def __process_first_frame(self, frame: Frame, timestamp: float) -> FrameResult:
+        """Process the first frame directly with the ball tracker
+
+        :param frame: first frame of the video
+        :param timestamp: timestamp of the first frame in seconds
+        :return: result of the first frame
+        """
+        try:
+            _, ball_potted, pot_count = self.ball_tracker.process_frame(
+                frame,
+                detect_table=self.crop_frames or self.crop_to_table,
+                crop_frames=self.crop_frames,
+                perform_morph=self.perform_morph,
+                timestamp=timestamp,
+            )
+        except ValueError:
+            return FrameResult(0, timestamp, False, None, 0)
+        return FrameResult(0, timestamp, True, ball_potted, pot_count)
+
+    def __apply(
+        self,
+        index: int,
+        timestamp: float,
+        slot: int,
+        future: Future[FrameDetection],
+    ) -> FrameResult:
+        """Wait for a worker to finish detecting balls in a frame, release its
+        ring buffer slot and apply the detection to the ball tracker
+
+        :param index: index of the frame
+        :param timestamp: timestamp of the frame in seconds
+        :param slot: ring buffer slot of the frame
+        :param future: future of the worker detection
+        :return: result of the frame
+        """
+        try:
+            detection = future.result()
+        except ValueError:
+            return FrameResult(index, timestamp, False, None, 0)
+        finally:
+            if self.ring_buffer is not None:
+                self.ring_buffer.release(slot)
+
+        keypoints = _decode_keypoints(detection.balls)
+        if detection.colours is None:
+            self.ball_tracker.apply_detection(keypoints)
+            return FrameResult(index, timestamp, True, None, 0)
+
+        balls: Keypoints = {
+            colour: []
+            for colour in self.ball_tracker.colour_settings.settings["BALL_COLOURS"]
+        }
+        for colour, keypoint in zip(detection.colours, keypoints):
+            balls[colour].append(keypoint)
+        ball_potted, pot_count = self.ball_tracker.apply_colour_detection(
+            balls, timestamp=timestamp
+        )
+        return FrameResult(index, timestamp, True, ball_potted, pot_count)
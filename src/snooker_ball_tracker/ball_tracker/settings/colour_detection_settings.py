@@ -41,6 +41,8 @@ class ColourDetectionSettings(QtCore.QObject):
             lambda value: self.update_colour_value("UPPER", 2, value)
         )
 
+    coloursChanged = QtCore.pyqtSignal()
+
     @property
     def colours(self) -> dict[str, Any]:
         """Copy of colour values loaded from settings
@@ -58,6 +60,7 @@ class ColourDetectionSettings(QtCore.QObject):
         self._settings["COLOURS"] = value
         if self._selected_colour != "NONE":
             self.colour_model.update(self.colours[self._selected_colour])
+        self.coloursChanged.emit()
 
     @property
     def settings(self) -> dict[str, Any]:
@@ -79,6 +82,7 @@ class ColourDetectionSettings(QtCore.QObject):
                 self._settings["BALL_COLOURS"][colour] = value["BALL_COLOURS"][colour]
         if self._selected_colour != "NONE":
             self.colour_model.update(self.colours[self._selected_colour])
+        self.coloursChanged.emit()
 
     @property
     def colour_model(self) -> HSVColour:
@@ -143,6 +147,7 @@ class ColourDetectionSettings(QtCore.QObject):
         """
         if self._selected_colour != "NONE":
             self.colours[self._selected_colour][_range][index] = value
+            self.coloursChanged.emit()
 
     def reset(self) -> None:
         """Reset selected colour in `colours` and `colour_model`
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import logging
+from collections import deque
+from typing import Any
+
+import numpy as np
+
+from .snapshot import SnapShot
+
+logger = logging.getLogger(__name__)
+
+# Diameter of a snooker ball in millimetres, which sets the scale of a frame
+BALL_DIAMETER = 52.5
+
+# Timestamps within this many seconds of each other count as equal, as video
+# containers store timestamps in whole milliseconds or in their own time base
+TIMESTAMP_TOLERANCE = 1e-3
+
+
+class ShotStateMachine:
+    def __init__(
+        self,
+        start_speed: float = 50.0,
+        stop_speed: float = 20.0,
+        min_stationary_time: float = 0.2,
+        motion_window: float = 0.2,
+        ball_diameter: float = BALL_DIAMETER,
+        fps: float = 25.0,
+    ) -> None:
+        """Creates an instance of this class that determines when shots start
+        and finish and which balls were potted from snapshots taken at
+        presentation timestamps of the video
+
+        Everything is measured in seconds and millimetres rather than in frames
+        and pixels, so the outcome doesn't depend on how many frames are
+        processed, skipped or dropped. The scale of a frame is estimated from
+        the median size of the balls in it, and the white's speed is measured
+        against the latest snapshot taken at least `motion_window` earlier
+
+        A shot starts as soon as the white moves faster than `start_speed` and
+        finishes once it has moved slower than `stop_speed` for at least
+        `min_stationary_time`
+
+        :param start_speed: min speed of the white in millimetres per second
+                            for a shot to start, defaults to 50.0
+        :param stop_speed: max speed of the white in millimetres per second
+                           for it to count as stationary, defaults to 20.0
+        :param min_stationary_time: min time in seconds the white has to be
+                                    stationary for a shot to finish,
+                                    defaults to 0.2
+        :param motion_window: min time in seconds between snapshots that are
+                              compared to measure speeds, defaults to 0.2
+        :param ball_diameter: diameter of a ball in millimetres,
+                              defaults to BALL_DIAMETER
+        :param fps: frame rate used to derive timestamps for frames that
+                    don't have one, defaults to 25.0
+        """
+        self.start_speed = start_speed
+        self.stop_speed = stop_speed
+        self.min_stationary_time = min_stationary_time
+        self.motion_window = motion_window
+        self.ball_diameter = ball_diameter
+        self.fps = fps
+        self.mm_per_pixel: float | None = None
+        self.white_speed: float | None = None
+        self.shot_in_progress = False
+        self.white_moving = False
+        self.last_shot_snapshot = SnapShot()
+        self.cur_shot_snapshot = SnapShot()
+        self._snapshots: deque[tuple[float, SnapShot]] = deque()
+        self._stationary_since: float | None = None
+
+    def reset(self, snapshot: SnapShot) -> None:
+        """Start comparing snapshots from `snapshot`, such as when balls have
+        to be found again after a camera cut
+
+        :param snapshot: snapshot of the balls on the table
+        """
+        self.cur_shot_snapshot = self.last_shot_snapshot = snapshot
+        self._snapshots.clear()
+        self._stationary_since = None
+
+    def update(self, snapshot: SnapShot, timestamp: float) -> tuple[str | None, int]:
+        """Compare `snapshot` with earlier snapshots to determine if a shot has
+        started/finished and if any balls were potted
+
+        Snapshots with the same timestamp as the last snapshot, such as when the
+        same frame is processed again, don't change the state of the shot, and
+        snapshots with an earlier timestamp start comparing snapshots again
+
+        :param snapshot: snapshot of the balls on the table
+        :param timestamp: presentation timestamp of the frame `snapshot` was
+                          taken from in seconds
+        :return: ball potted if any were and the number of balls potted
+        """
+        ball_potted: str | None = None
+        pot_count = 0
+        self.__update_scale(snapshot)
+        if self._snapshots:
+            last_timestamp = self._snapshots[-1][0]
+            # the video has been seeked backwards, so start comparing again
+            if timestamp < last_timestamp - TIMESTAMP_TOLERANCE:
+                self.reset(snapshot)
+            elif timestamp <= last_timestamp + TIMESTAMP_TOLERANCE:
+                self.cur_shot_snapshot = snapshot
+                return ball_potted, pot_count
+
+        reference_timestamp, reference = self.__get_reference_snapshot(
+            snapshot, timestamp
+        )
+        elapsed = timestamp - reference_timestamp
+        if self.mm_per_pixel is not None and elapsed > 0:
+            snapshot.update_moving(
+                reference, self.stop_speed * elapsed, self.mm_per_pixel
+            )
+        self.white_speed = self.__get_white_speed(snapshot, reference, elapsed)
+
+        if not self.shot_in_progress and self.has_shot_started():
+            self.shot_in_progress = True
+            self._stationary_since = None
+
+        if self.shot_in_progress and self.has_shot_finished(
+            reference_timestamp, timestamp
+        ):
+            diff = self.last_shot_snapshot.compare_ball_diff(snapshot)
+            diff[snapshot.colour_id("WHITE")] = 0
+            potted = np.flatnonzero(diff > 0)
+            if len(potted) > 0:
+                colour = snapshot.colours[potted[-1]]
+                ball_potted, pot_count = colour, int(diff[potted[-1]])
+                logger.info("potted %d %s/s", pot_count, colour.lower())
+            self.last_shot_snapshot = reference
+            self.shot_in_progress = False
+        self.cur_shot_snapshot = snapshot
+        return ball_potted, pot_count
+
+    def has_shot_started(self) -> bool:
+        """Determine if the shot has started from the last measured speed of
+        the white
+
+        :return: True if the shot has started, otherwise False
+        """
+        if self.white_speed is None or self.white_speed <= self.start_speed:
+            return False
+        logger.info("white status: moving")
+        self.white_moving = True
+        return True
+
+    def has_shot_finished(self, reference_timestamp: float, timestamp: float) -> bool:
+        """Determine if the shot has finished from the last measured speed of
+        the white and how long it has been stationary for
+
+        :param reference_timestamp: timestamp the speed was measured from
+        :param timestamp: timestamp the speed was measured at
+        :return: True if the shot has finished, otherwise False
+        """
+        if self.white_speed is None:
+            return False
+        if self.white_speed > self.stop_speed:
+            self._stationary_since = None
+            return False
+        # the white has been stationary since the start of the measurement
+        if self._stationary_since is None:
+            self._stationary_since = reference_timestamp
+        stationary_time = timestamp - self._stationary_since + TIMESTAMP_TOLERANCE
+        if stationary_time < self.min_stationary_time:
+            return False
+        logger.info("white status: stopped")
+        self.white_moving = False
+        return True
+
+    def __update_scale(self, snapshot: SnapShot) -> None:
+        """Estimate the scale of the frame `snapshot` was taken from, which is
+        kept from earlier snapshots if it has no balls
+
+        :param snapshot: snapshot of the balls on the table
+        """
+        sizes = snapshot.balls["size"]
+        sizes = sizes[sizes > 0]
+        if len(sizes) > 0:
+            self.mm_per_pixel = self.ball_diameter / float(np.median(sizes))
+
+    def __get_reference_snapshot(
+        self, snapshot: SnapShot, timestamp: float
+    ) -> tuple[float, SnapShot]:
+        """Get the snapshot to compare `snapshot` with, which is the latest
+        snapshot taken at least `motion_window` earlier or the earliest
+        snapshot if there isn't one, and remember `snapshot`
+
+        :param snapshot: snapshot that has just been taken
+        :param timestamp: timestamp of `snapshot`
+        :return: timestamp of the snapshot to compare with and the snapshot
+        """
+        oldest = timestamp - self.motion_window + TIMESTAMP_TOLERANCE
+        while len(self._snapshots) > 1 and self._snapshots[1][0] <= oldest:
+            self._snapshots.popleft()
+        reference = self._snapshots[0] if self._snapshots else (timestamp, snapshot)
+        self._snapshots.append((timestamp, snapshot))
+        return reference
+
+    def __get_white_speed(
+        self, snapshot: SnapShot, reference: SnapShot, elapsed: float
+    ) -> float | None:
+        """Measure the speed of the white between `reference` and `snapshot`
+
+        :param snapshot: snapshot that has just been taken
+        :param reference: earlier snapshot to compare with
+        :param elapsed: time in seconds between `reference` and `snapshot`
+        :return: speed in millimetres per second of the fastest white, or None
+                 if it can't be measured because no time has passed, the scale
+                 is unknown or the number of whites has changed
+        """
+        white_count = snapshot.count("WHITE")
+        if (
+            elapsed <= 0
+            or self.mm_per_pixel is None
+            or white_count == 0
+            or white_count != reference.count("WHITE")
+        ):
+            return None
+        whites = snapshot.balls["colour"] == snapshot.colour_id("WHITE")
+        displacements = snapshot.displacements(reference, self.mm_per_pixel)
+        return float(displacements[whites].max()) / elapsed
+
+
+def create_shot_state_machine(settings: dict[str, Any]) -> ShotStateMachine:
+    """Create a shot state machine from shot detection settings
+
+    :param settings: shot detection settings
+    :return: shot state machine
+    """
+    return ShotStateMachine(
+        start_speed=settings.get("START_SPEED", 50.0),
+        stop_speed=settings.get("STOP_SPEED", 20.0),
+        min_stationary_time=settings.get("MIN_STATIONARY_TIME", 0.2),
+        motion_window=settings.get("MOTION_WINDOW", 0.2),
+        ball_diameter=settings.get("BALL_DIAMETER", BALL_DIAMETER),
+        fps=settings.get("FPS", 25.0),
+    )
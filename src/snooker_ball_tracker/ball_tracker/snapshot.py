@@ -2,13 +2,28 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
+import numpy as np
+import numpy.typing as npt
+
 from snooker_ball_tracker.settings import settings as s
 
-from .balls import Ball, BallColour
+from .association import pairwise_distances
+from .util import MM_PER_PIXEL, keypoints_to_array
 
 if TYPE_CHECKING:
     from .types import Keypoints
 
+# Every ball in a snapshot is stored as a row of this structured dtype
+BALL_DTYPE = np.dtype(
+    [
+        ("colour", np.uint8),
+        ("x", np.float64),
+        ("y", np.float64),
+        ("size", np.float64),
+        ("moving", np.bool_),
+    ]
+)
+
 
 class SnapShot:
     def __init__(
@@ -16,62 +31,182 @@ class SnapShot:
         balls: Keypoints | None = None,
         ball_colours: dict[str, Any] = s.COLOUR_DETECTION_SETTINGS["BALL_COLOURS"],
     ) -> None:
-        """Creates an instance of this class that contains ball counts for all
-        possible ball colours
+        """Creates an instance of this class that contains the position and
+        colour of every ball on the table at a point in time
 
-        :param balls: dict of balls, where each key value pair
-                      is a ball colour and its count, defaults to None
+        Balls are stored as rows of a single structured array, so that counts,
+        differences and movement checks between snapshots are vectorised
+
+        :param balls: dict of colour and ball list pairs, defaults to None
+        :param ball_colours: ball colours the snapshot can contain,
+                             defaults to s.COLOUR_DETECTION_SETTINGS["BALL_COLOURS"]
         """
+        self._colours = [colour for colour in ball_colours if ball_colours[colour]]
+        self._colour_ids = {colour: i for i, colour in enumerate(self._colours)}
+        self._balls = np.zeros(0, dtype=BALL_DTYPE)
         if balls:
-            self._colours = {
-                colour: BallColour(keypoints) for colour, keypoints in balls.items()
-            }
-        else:
-            self._colours = {
-                colour: BallColour() for colour in ball_colours if ball_colours[colour]
-            }
+            self.assign_balls_from_dict(balls)
 
     @property
-    def colours(self) -> dict[str, BallColour]:
-        """Dict of colours where each key is a ball colour, and each
-        value is a BallColour instance
+    def colours(self) -> list[str]:
+        """Ball colours this snapshot can contain, where the index of each colour
+        is its colour id
 
-        :return: colours dict
+        :return: colours list
         """
         return self._colours
 
     @property
-    def white(self) -> Ball | None:
-        """White ball property
+    def balls(self) -> npt.NDArray[Any]:
+        """Structured array of balls with colour, x, y, size and moving fields
+
+        :return: balls array
+        """
+        return self._balls
+
+    @property
+    def counts(self) -> npt.NDArray[np.int64]:
+        """Ball counts of every colour, in the same order as `colours`
+
+        :return: counts array
+        """
+        counts: npt.NDArray[np.int64] = np.bincount(
+            self._balls["colour"], minlength=len(self._colours)
+        )
+        return counts
+
+    def colour_id(self, colour: str) -> int:
+        """Get the colour id of `colour`
+
+        :param colour: ball colour
+        :return: index of `colour` in `colours`
+        """
+        return self._colour_ids[colour]
+
+    def count(self, colour: str) -> int:
+        """Get the number of balls of `colour`
 
-        :return: white ball
+        :param colour: ball colour
+        :return: count
         """
-        return self._colours["WHITE"].balls[0] if self._colours["WHITE"].balls else None
+        return int(np.count_nonzero(self._balls["colour"] == self._colour_ids[colour]))
 
     def assign_balls_from_dict(self, balls: Keypoints) -> None:
-        """Assign balls to their appropriate ball colour instances from a dict
+        """Replace the balls of this snapshot with balls from a dict
 
         :param balls: dict of colour and ball list pairs
         """
-        for colour, keypoints in balls.items():
-            self._colours[colour].assign([Ball(pt) for pt in keypoints])
+        keypoints = [ball for ball_list in balls.values() for ball in ball_list]
+        rows = np.zeros(len(keypoints), dtype=BALL_DTYPE)
+        rows["colour"] = np.repeat(
+            [self._colour_ids[colour] for colour in balls],
+            [len(ball_list) for ball_list in balls.values()],
+        )
+        positions = keypoints_to_array(keypoints)
+        rows["x"], rows["y"] = positions[:, 0], positions[:, 1]
+        rows["size"] = [keypoint.size for keypoint in keypoints]
+        self._balls = rows
 
     def assign_balls_from_snapshot(self, snapshot: SnapShot) -> None:
-        """Assign balls to their appropriate ball colour instances from a SnapShot
+        """Replace the balls of this snapshot with a copy of the balls
+        of `snapshot`
 
         :param snapshot: snapshot to take balls from
         """
-        for colour, ball_colours in snapshot.colours.items():
-            self._colours[colour].assign(ball_colours.balls)
+        self._balls = snapshot.balls.copy()
 
-    def compare_ball_diff(self, ball_colour: str, snapshot: SnapShot) -> int:
-        """Compares the ball difference with `snapshot` for `ball_colour`
+    def compare_ball_diff(self, snapshot: SnapShot) -> npt.NDArray[np.int64]:
+        """Compares the ball difference with `snapshot` for every colour
 
-        :param ball_colour: colour of ball to compare with `snapshot`
         :param snapshot: other snapshot to compare ball difference with
-        :return: the ball difference of provided `ball_colour`
+        :return: ball count of this snapshot minus ball count of `snapshot`
+                 for every colour, in the same order as `colours`
         """
-        prev_total = self._colours[ball_colour].count
-        new_total = snapshot.colours[ball_colour].count
-        diff = prev_total - new_total
+        diff: npt.NDArray[np.int64] = self.counts - snapshot.counts
         return diff
+
+    def displacements(
+        self, snapshot: SnapShot, mm_per_pixel: float = MM_PER_PIXEL
+    ) -> npt.NDArray[np.float64]:
+        """Get how far every ball has moved since `snapshot`, which is the
+        distance to the closest ball of the same colour in `snapshot`
+
+        :param snapshot: earlier snapshot to compare with
+        :param mm_per_pixel: scale used to convert pixels into millimetres,
+                             defaults to MM_PER_PIXEL
+        :return: distance in millimetres for every ball in this snapshot,
+                 which is infinite if `snapshot` has no ball of its colour
+        """
+        distances = pairwise_distances(
+            self._positions() * mm_per_pixel, snapshot._positions() * mm_per_pixel
+        )
+        distances[
+            self._balls["colour"][:, np.newaxis]
+            != snapshot.balls["colour"][np.newaxis, :]
+        ] = np.inf
+        displacements: npt.NDArray[np.float64] = distances.min(axis=1, initial=np.inf)
+        return displacements
+
+    def moved(
+        self,
+        snapshot: SnapShot,
+        distance: float = 0.1,
+        mm_per_pixel: float = MM_PER_PIXEL,
+    ) -> npt.NDArray[np.bool_]:
+        """Determine which balls have moved since `snapshot`, where a ball has
+        moved if there is no ball of the same colour in `snapshot` within
+        `distance` of it
+
+        :param snapshot: earlier snapshot to compare with
+        :param distance: max distance in millimetres a ball can move
+                         and still count as stationary, defaults to 0.1
+        :param mm_per_pixel: scale used to convert pixels into millimetres,
+                             defaults to MM_PER_PIXEL
+        :return: boolean array with a flag for every ball in this snapshot
+        """
+        moved: npt.NDArray[np.bool_] = (
+            self.displacements(snapshot, mm_per_pixel) > distance
+        )
+        return moved
+
+    def has_ball_moved(
+        self, snapshot: SnapShot, colour: str | None = None, distance: float = 0.1
+    ) -> bool:
+        """Determine if any ball has moved by more than `distance` since `snapshot`
+
+        :param snapshot: earlier snapshot to compare with
+        :param colour: only check balls of this colour, defaults to None
+        :param distance: max distance in millimetres a ball can move
+                         and still count as stationary, defaults to 0.1
+        :return: True if any ball has moved, otherwise False
+        """
+        moved = self.moved(snapshot, distance)
+        if colour is not None:
+            moved &= self._balls["colour"] == self._colour_ids[colour]
+        return bool(moved.any())
+
+    def update_moving(
+        self,
+        snapshot: SnapShot,
+        distance: float = 0.1,
+        mm_per_pixel: float = MM_PER_PIXEL,
+    ) -> None:
+        """Set the moving flag of every ball by comparing with `snapshot`
+
+        :param snapshot: earlier snapshot to compare with
+        :param distance: max distance in millimetres a ball can move
+                         and still count as stationary, defaults to 0.1
+        :param mm_per_pixel: scale used to convert pixels into millimetres,
+                             defaults to MM_PER_PIXEL
+        """
+        self._balls["moving"] = self.moved(snapshot, distance, mm_per_pixel)
+
+    def _positions(self) -> npt.NDArray[np.float64]:
+        """Get the positions of all balls
+
+        :return: array of positions with shape (N, 2)
+        """
+        positions: npt.NDArray[np.float64] = np.column_stack(
+            [self._balls["x"], self._balls["y"]]
+        )
+        return positions
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from snooker_ball_tracker.settings import settings as s
+
+from .balls import BallColourModel
+
+if TYPE_CHECKING:
+    from .snapshot import SnapShot
+
+
+class SnapShotModel:
+    def __init__(
+        self,
+        ball_colours: dict[str, Any] = s.COLOUR_DETECTION_SETTINGS["BALL_COLOURS"],
+    ) -> None:
+        """Creates an instance of this class that exposes the ball counts of a
+        SnapShot to the GUI
+
+        :param ball_colours: ball colours to create models for,
+                             defaults to s.COLOUR_DETECTION_SETTINGS["BALL_COLOURS"]
+        """
+        self._colours = {
+            colour: BallColourModel() for colour in ball_colours if ball_colours[colour]
+        }
+
+    @property
+    def colours(self) -> dict[str, BallColourModel]:
+        """Dict of colours where each key is a ball colour, and each
+        value is a BallColourModel instance
+
+        :return: colours dict
+        """
+        return self._colours
+
+    def update(self, snapshot: SnapShot) -> None:
+        """Update the ball counts of every colour from `snapshot`
+
+        :param snapshot: snapshot to take ball counts from
+        """
+        for colour, count in zip(snapshot.colours, snapshot.counts.tolist()):
+            if colour in self._colours:
+                self._colours[colour].count = count
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import gc
+import threading
+import time
+from typing import Any, NamedTuple
+
+
+class ProcessingStats(NamedTuple):
+    frames: int
+    buffer_allocations: int
+    buffer_bytes: int
+    gc_collections: int
+    gc_time: float
+    colour_detections: int
+    detection_interval: int
+
+
+class GCMonitor:
+    def __init__(self) -> None:
+        """Creates an instance of this class that counts garbage collections and
+        the time spent in them while it is active, which is used as a context
+        manager around the code to monitor
+
+        Garbage collection callbacks are process-wide, so collections started
+        by other threads, such as the Qt and video decoding threads, are
+        ignored and only collections started by the thread that entered the
+        monitor are counted
+        """
+        self.collections = 0
+        self.time = 0.0
+        self._started: float | None = None
+        self._thread: int | None = None
+
+    def __enter__(self) -> GCMonitor:
+        self._thread = threading.get_ident()
+        gc.callbacks.append(self._callback)
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        gc.callbacks.remove(self._callback)
+        self._started = None
+        self._thread = None
+
+    def reset(self) -> None:
+        """Reset the collection count and time"""
+        self.collections = 0
+        self.time = 0.0
+
+    def _callback(self, phase: str, info: dict[str, Any]) -> None:
+        """Record the start and end of a garbage collection
+
+        :param phase: "start" or "stop"
+        :param info: info about the collection
+        """
+        if threading.get_ident() != self._thread:
+            return
+        if phase == "start":
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            self.collections += 1
+            self.time += time.perf_counter() - self._started
+            self._started = None
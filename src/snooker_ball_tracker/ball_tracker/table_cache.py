@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+import cv2
+import numpy as np
+
+if TYPE_CHECKING:
+    from .types import Frame
+
+
+class TableView(NamedTuple):
+    fingerprint: Frame
+    table_bounds: Frame
+    table_bounds_mask: Frame
+    table_roi: tuple[int, int, int, int]
+
+
+class TableCache:
+    def __init__(
+        self,
+        grid: tuple[int, int] = (16, 9),
+        max_distance: float = 0.08,
+        max_views: int = 16,
+    ) -> None:
+        """Creates an instance of this class that remembers the table boundary
+        of every camera view it has seen, so that the table only has to be
+        detected again when footage cuts to a view that hasn't been seen before
+
+        Views are identified by a fingerprint, which is the fraction of table
+        cloth pixels in each cell of a coarse grid over the frame. Fixed
+        broadcast cameras always see the cloth in the same cells, so the same
+        camera gives almost the same fingerprint every time it is cut back to,
+        while other cameras give very different ones
+
+        :param grid: number of columns and rows of the fingerprint grid,
+                     defaults to (16, 9)
+        :param max_distance: max mean difference between two fingerprints for
+                             them to count as the same view, defaults to 0.08
+        :param max_views: max number of views to remember, the least recently
+                          used view is forgotten first, defaults to 16
+        """
+        self.grid = grid
+        self.max_distance = max_distance
+        self.max_views = max_views
+        self.hits = 0
+        self.misses = 0
+        self._views: list[TableView] = []
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def clear(self) -> None:
+        """Forget every view and reset the hit and miss counters"""
+        self.hits = 0
+        self.misses = 0
+        self._views.clear()
+
+    def fingerprint(self, frame: Frame, lower: Frame, upper: Frame) -> Frame:
+        """Build the fingerprint of the camera view `frame` was taken from
+
+        :param frame: BGR frame
+        :param lower: lower HSV bound of the table cloth colour
+        :param upper: upper HSV bound of the table cloth colour
+        :return: fingerprint
+        """
+        # cloth pixels are found in a frame 4 times the size of the grid
+        small = cv2.resize(
+            frame,
+            (self.grid[0] * 4, self.grid[1] * 4),
+            interpolation=cv2.INTER_AREA,
+        )
+        mask = cv2.inRange(cv2.cvtColor(small, cv2.COLOR_BGR2HSV), lower, upper)
+        fingerprint: Frame = cv2.resize(
+            mask, self.grid, interpolation=cv2.INTER_AREA
+        ).astype(np.float32)
+        fingerprint /= 255
+        return fingerprint
+
+    def distance(self, first: Frame, second: Frame) -> float:
+        """Get the mean difference between two fingerprints
+
+        :param first: first fingerprint
+        :param second: second fingerprint
+        :return: distance between 0 and 1
+        """
+        return float(cv2.norm(first, second, cv2.NORM_L1)) / first.size
+
+    def lookup(self, fingerprint: Frame) -> TableView | None:
+        """Find the view closest to `fingerprint`
+
+        :param fingerprint: fingerprint of the current view
+        :return: closest view if it is within `max_distance`, otherwise None
+        """
+        best: int | None = None
+        best_distance = self.max_distance
+        for i, view in enumerate(self._views):
+            distance = self.distance(fingerprint, view.fingerprint)
+            if distance <= best_distance:
+                best, best_distance = i, distance
+        if best is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        view = self._views.pop(best)
+        self._views.append(view)
+        return view
+
+    def store(self, view: TableView) -> None:
+        """Remember `view`, replacing any view with a matching fingerprint
+
+        :param view: view to remember
+        """
+        self._views = [
+            cached
+            for cached in self._views
+            if self.distance(view.fingerprint, cached.fingerprint) > self.max_distance
+        ]
+        self._views.append(view)
+        del self._views[: -self.max_views]
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import json
+import os
+from bisect import bisect_left, bisect_right
+from typing import IO, TYPE_CHECKING, Any, Sequence, cast
+
+import numpy as np
+import numpy.typing as npt
+
+from .events import BallPositions, BallPotted, EventSink, ShotFinished, ShotStarted
+
+if TYPE_CHECKING:
+    from .events import Event
+    from .types import Frame
+
+# Fixed width record of a single ball in a single frame, records are stored
+# back to back in frame order
+TRACK_RECORD = np.dtype(
+    [
+        ("frame", np.int64),
+        ("time", np.float64),
+        ("colour", np.int16),
+        ("track", np.int32),
+        ("x", np.float32),
+        ("y", np.float32),
+        ("size", np.float32),
+    ]
+)
+
+# Record of a single shot, `start` and `end` are the range of track records
+# from its first frame up to and including its last frame, `colour` is -1 if
+# no ball was potted and `finished` is False if the video ended during the shot
+SHOT_RECORD = np.dtype(
+    [
+        ("start_frame", np.int64),
+        ("start_time", np.float64),
+        ("end_frame", np.int64),
+        ("end_time", np.float64),
+        ("start", np.int64),
+        ("end", np.int64),
+        ("colour", np.int16),
+        ("count", np.int32),
+        ("finished", np.bool_),
+    ]
+)
+
+RECORDS_FILE = "tracks.bin"
+SHOTS_FILE = "shots.npy"
+META_FILE = "meta.json"
+
+Records = npt.NDArray[np.void]
+
+
+class TrackStoreSink(EventSink):
+    def __init__(self, path: str, buffer_size: int = 1 << 16) -> None:
+        """Creates an instance of this class that writes ball positions as
+        `TRACK_RECORD` records to a file that can be memory mapped, along with
+        an index of every shot, to a track store directory
+
+        Records are buffered and appended to the file in blocks, so memory use
+        doesn't grow with the length of the video. Events must be written in
+        frame order. The shot index and colour names are written once the sink
+        is closed. Use `TrackStore` to query the store
+
+        :param path: path of the directory to write the store to
+        :param buffer_size: number of records to buffer before they are
+                            appended to the file, defaults to 65536
+        """
+        self.path = path
+        self.records = 0
+        self.colours: list[str] = []
+        self.shots: list[dict[str, Any]] = []
+        self.__colour_ids: dict[str, int] = {}
+        self.__buffer = np.empty(buffer_size, dtype=TRACK_RECORD)
+        self.__buffered = 0
+        self.__shot: dict[str, Any] | None = None
+        self.__last_frame = (0, 0.0)
+        os.makedirs(path, exist_ok=True)
+        self.output: IO[bytes] = open(os.path.join(path, RECORDS_FILE), "wb")
+
+    def write(self, events: Sequence[Event]) -> None:
+        for event in events:
+            if isinstance(event, ShotStarted):
+                self.__shot = {
+                    "start_frame": event.frame_index,
+                    "start_time": event.timestamp,
+                    "start": self.records,
+                }
+            elif isinstance(event, ShotFinished):
+                self.__finish_shot(event.frame_index, event.timestamp)
+            elif isinstance(event, BallPotted) and self.shots:
+                # balls are potted in the frame their shot finished in
+                self.shots[-1]["colour"] = self.__colour_id(event.colour)
+                self.shots[-1]["count"] = event.pot_count
+            elif isinstance(event, BallPositions):
+                for colour, balls in event.balls.items():
+                    self.__append(event, colour, balls)
+                self.__last_frame = (event.frame_index, event.timestamp)
+                # the last frame of a shot is part of the shot
+                if self.shots and self.shots[-1]["end_frame"] == event.frame_index:
+                    self.shots[-1]["end"] = self.records
+
+    def close(self) -> None:
+        if self.__shot is not None:
+            self.__finish_shot(*self.__last_frame, finished=False)
+            self.shots[-1]["end"] = self.records
+        self.__flush()
+        self.output.close()
+        shots = np.zeros(len(self.shots), dtype=SHOT_RECORD)
+        for i, shot in enumerate(self.shots):
+            for name, value in shot.items():
+                shots[name][i] = value
+        np.save(os.path.join(self.path, SHOTS_FILE), shots)
+        with open(os.path.join(self.path, META_FILE), "w") as meta:
+            json.dump({"colours": self.colours, "records": self.records}, meta)
+
+    def __append(self, event: BallPositions, colour: str, balls: Frame) -> None:
+        """Buffer a record for every ball of `colour` in the frame of `event`
+
+        :param event: ball positions event
+        :param colour: colour of the balls
+        :param balls: (n, 3) array of the x, y and size of each ball
+        """
+        colour_id = self.__colour_id(colour)
+        track_ids = event.track_ids[colour]
+        written = 0
+        while written < len(balls):
+            count = min(len(balls) - written, len(self.__buffer) - self.__buffered)
+            rows = self.__buffer[self.__buffered : self.__buffered + count]
+            rows["frame"] = event.frame_index
+            rows["time"] = event.timestamp
+            rows["colour"] = colour_id
+            rows["track"] = track_ids[written : written + count]
+            rows["x"] = balls[written : written + count, 0]
+            rows["y"] = balls[written : written + count, 1]
+            rows["size"] = balls[written : written + count, 2]
+            self.__buffered += count
+            self.records += count
+            written += count
+            if self.__buffered == len(self.__buffer):
+                self.__flush()
+
+    def __flush(self) -> None:
+        """Append the buffered records to the file"""
+        self.output.write(self.__buffer[: self.__buffered].tobytes())
+        self.__buffered = 0
+
+    def __finish_shot(
+        self, frame_index: int, timestamp: float, finished: bool = True
+    ) -> None:
+        """Add the shot in progress to the index
+
+        :param frame_index: index of the last frame of the shot
+        :param timestamp: timestamp of the last frame of the shot
+        :param finished: False if the video ended during the shot,
+                         defaults to True
+        """
+        if self.__shot is None:
+            return
+        self.shots.append(
+            {
+                **self.__shot,
+                "end_frame": frame_index,
+                "end_time": timestamp,
+                "end": self.records,
+                "colour": -1,
+                "count": 0,
+                "finished": finished,
+            }
+        )
+        self.__shot = None
+
+    def __colour_id(self, colour: str) -> int:
+        """Get the id of `colour`, which is assigned the next id if it hasn't
+        been seen before
+
+        :param colour: colour name
+        :return: colour id
+        """
+        if colour not in self.__colour_ids:
+            self.__colour_ids[colour] = len(self.colours)
+            self.colours.append(colour)
+        return self.__colour_ids[colour]
+
+
+class TrackStore:
+    def __init__(self, path: str) -> None:
+        """Creates an instance of this class that queries a track store
+        written by `TrackStoreSink`
+
+        Track records are memory mapped rather than loaded, and every query
+        returns a view of them found by binary searching the frame or time
+        column, so only the pages of the file that are used are read. The shot
+        index is small enough to be loaded
+
+        :param path: path of the track store directory
+        :raises OSError: if the directory isn't a complete track store
+        """
+        self.path = path
+        try:
+            with open(os.path.join(path, META_FILE)) as meta_file:
+                meta = json.load(meta_file)
+            self.shots: Records = np.load(os.path.join(path, SHOTS_FILE))
+        except (OSError, ValueError) as error:
+            raise OSError(f"Failed to load track store: {path}") from error
+        self.colours: list[str] = meta["colours"]
+        self.records: Records = (
+            np.memmap(
+                os.path.join(path, RECORDS_FILE),
+                dtype=TRACK_RECORD,
+                mode="r",
+                shape=(meta["records"],),
+            )
+            if meta["records"] > 0
+            else np.zeros(0, dtype=TRACK_RECORD)
+        )
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def colour_id(self, colour: str) -> int:
+        """Get the id `colour` is stored with
+
+        :param colour: colour name
+        :raises ValueError: if no ball of `colour` has been stored
+        :return: colour id
+        """
+        return self.colours.index(colour)
+
+    def at_frame(self, frame_index: int) -> Records:
+        """Get the position of every ball in a frame
+
+        :param frame_index: index of the frame
+        :return: view of the records of the frame, which is empty if the frame
+                 wasn't processed
+        """
+        frames = self.__column("frame")
+        return self.records[
+            bisect_left(frames, frame_index) : bisect_right(frames, frame_index)
+        ]
+
+    def at_time(self, timestamp: float) -> Records:
+        """Get the position of every ball at `timestamp`, which is where they
+        were in the last processed frame at or before `timestamp`
+
+        :param timestamp: time in seconds
+        :return: view of the records of the frame, which is empty if no frame
+                 was processed before `timestamp`
+        """
+        end = bisect_right(self.__column("time"), timestamp)
+        if end == 0:
+            return self.records[:0]
+        return self.at_frame(int(self.records[end - 1]["frame"]))
+
+    def between(self, start_time: float, end_time: float) -> Records:
+        """Get the position of every ball in every frame between two timestamps
+
+        :param start_time: time in seconds of the first frame
+        :param end_time: time in seconds of the last frame
+        :return: view of the records of every frame with a timestamp from
+                 `start_time` up to and including `end_time`
+        """
+        times = self.__column("time")
+        return self.records[
+            bisect_left(times, start_time) : bisect_right(times, end_time)
+        ]
+
+    def shot(self, shot: int) -> Records:
+        """Get the position of every ball in every frame of a shot
+
+        :param shot: index of the shot in `shots`
+        :return: view of the records of the shot
+        """
+        return self.records[self.shots[shot]["start"] : self.shots[shot]["end"]]
+
+    def find_shots(self, potted: str | None = None) -> npt.NDArray[np.int64]:
+        """Find shots in the shot index
+
+        :param potted: only find shots where a ball of this colour was potted,
+                       defaults to None to find every shot
+        :return: indices of the shots in `shots`
+        """
+        if potted is None:
+            return np.arange(len(self.shots))
+        if potted not in self.colours:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(self.shots["colour"] == self.colour_id(potted))
+
+    def __column(self, name: str) -> Sequence[float]:
+        """Get a column of the records to binary search, which is a strided
+        view of the memory map rather than a copy of the column as
+        `np.searchsorted` would make
+
+        :param name: name of the column
+        :return: column
+        """
+        return cast("Sequence[float]", self.records[name])
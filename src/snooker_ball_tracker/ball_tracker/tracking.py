@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+
+from .association import associate
+from .util import MM_PER_PIXEL, keypoints_to_array
+
+if TYPE_CHECKING:
+    from .types import BallAssociation, Frame, Keypoints
+
+# State transition and measurement matrices of a constant velocity model,
+# where the state of each ball is [x, y, x velocity, y velocity]
+TRANSITION = np.array(
+    [[1, 0, 1, 0], [0, 1, 0, 1], [0, 0, 1, 0], [0, 0, 0, 1]], dtype=np.float64
+)
+PROCESS_NOISE = np.array(
+    [
+        [0.25, 0, 0.5, 0],
+        [0, 0.25, 0, 0.5],
+        [0.5, 0, 1, 0],
+        [0, 0.5, 0, 1],
+    ],
+    dtype=np.float64,
+)
+
+
+class BallTracks:
+    def __init__(
+        self,
+        acceleration_noise: float = 4.0,
+        measurement_noise: float = 1.0,
+        max_distance: float = 1.0,
+        max_missed: int = 1,
+        reacquire_interval: int = 30,
+        window_scale: float = 2.0,
+    ) -> None:
+        """Creates an instance of this class that gives each detected ball a
+        persistent track ID and a constant velocity Kalman filter, which is used
+        to predict where each ball will be in the next frame
+
+        Tracks are stored as rows of arrays in the same order as the balls in
+        the `Keypoints` dict they were created from, so all tracks are
+        predicted and corrected in single vectorised steps
+
+        :param acceleration_noise: variance of the unmodelled acceleration of a
+                                   ball in pixels per frame squared,
+                                   defaults to 4.0
+        :param measurement_noise: variance of detected ball positions in pixels,
+                                  defaults to 1.0
+        :param max_distance: max distance in millimetres between a predicted ball
+                             and a detected ball for them to be the same ball,
+                             defaults to 1.0
+        :param max_missed: number of frames a ball can go undetected before its
+                           track is lost, defaults to 1
+        :param reacquire_interval: number of frames between full frame
+                                   detections when no track is lost,
+                                   defaults to 30
+        :param window_scale: size of search windows relative to ball size,
+                             defaults to 2.0
+        """
+        self.acceleration_noise = acceleration_noise
+        self.measurement_noise = measurement_noise
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.reacquire_interval = reacquire_interval
+        self.window_scale = window_scale
+        self._ids: npt.NDArray[np.int64] = np.zeros(0, dtype=np.int64)
+        self._colours: list[str] = []
+        self._sizes: Frame = np.zeros(0)
+        self._states: Frame = np.zeros((0, 4))
+        self._covariances: Frame = np.zeros((0, 4, 4))
+        self._missed: npt.NDArray[np.int64] = np.zeros(0, dtype=np.int64)
+        self._next_id = 0
+        self._frames_since_full_detection = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def ids(self) -> npt.NDArray[np.int64]:
+        """Track IDs, in the same order as the balls the tracks were created from
+
+        :return: track IDs
+        """
+        return self._ids
+
+    @property
+    def positions(self) -> Frame:
+        """Current estimated positions of all tracked balls
+
+        :return: array of positions with shape (N, 2)
+        """
+        positions: Frame = self._states[:, :2]
+        return positions
+
+    @property
+    def velocities(self) -> Frame:
+        """Current estimated velocities of all tracked balls in pixels per frame
+
+        :return: array of velocities with shape (N, 2)
+        """
+        velocities: Frame = self._states[:, 2:]
+        return velocities
+
+    @property
+    def lost(self) -> bool:
+        """True if any track has gone undetected for more than `max_missed` frames
+
+        :return: lost
+        """
+        return bool(np.any(self._missed > self.max_missed))
+
+    def needs_full_detection(self) -> bool:
+        """Determine if the next frame should be searched in full rather than only
+        inside the predicted search windows
+
+        :return: True if there are no tracks, a track has been lost or the
+                 re-acquisition interval has elapsed
+        """
+        return (
+            len(self) == 0
+            or self.lost
+            or self._frames_since_full_detection >= self.reacquire_interval
+        )
+
+    def reset(self, balls: Keypoints) -> None:
+        """Replace the tracks with balls from a full colour detection
+
+        Balls that can be matched to an existing track of the same colour keep
+        that track's ID and motion state, all others start new tracks. The
+        track ID of each ball is stored in its keypoint's `class_id`
+
+        :param balls: dict of colour and ball list pairs
+        """
+        colours = [colour for colour, ball_list in balls.items() for _ in ball_list]
+        keypoints = [ball for ball_list in balls.values() for ball in ball_list]
+        positions = keypoints_to_array(keypoints)
+        count = len(keypoints)
+
+        ids = np.zeros(count, dtype=np.int64)
+        states = np.zeros((count, 4))
+        states[:, :2] = positions
+        covariances = np.tile(
+            np.diag([self.measurement_noise] * 2 + [100.0] * 2), (count, 1, 1)
+        )
+        matched = np.zeros(count, dtype=bool)
+
+        for colour in balls:
+            old = [i for i, c in enumerate(self._colours) if c == colour]
+            new = [i for i, c in enumerate(colours) if c == colour]
+            association = associate(
+                self._states[old, :2] * MM_PER_PIXEL,
+                positions[new] * MM_PER_PIXEL,
+                max_distance=self.max_distance,
+            )
+            for track, detection in association.matches:
+                ids[new[detection]] = self._ids[old[track]]
+                states[new[detection]] = self._states[old[track]]
+                covariances[new[detection]] = self._covariances[old[track]]
+                matched[new[detection]] = True
+
+        for i in np.flatnonzero(~matched):
+            ids[i] = self._next_id
+            self._next_id += 1
+
+        self._ids = ids
+        self._colours = colours
+        self._sizes = np.array([keypoint.size for keypoint in keypoints])
+        self._states = states
+        self._covariances = covariances
+        self._missed = np.zeros(count, dtype=np.int64)
+
+        matched_rows = np.flatnonzero(matched)
+        self._correct(matched_rows, positions[matched_rows])
+        self._frames_since_full_detection = 0
+
+        for keypoint, track_id in zip(keypoints, ids):
+            keypoint.class_id = int(track_id)
+
+    def predict(self) -> Frame:
+        """Advance every track by one frame using the constant velocity model
+
+        :return: predicted positions with shape (N, 2)
+        """
+        self._states = self._states @ TRANSITION.T
+        self._covariances = (
+            TRANSITION @ self._covariances @ TRANSITION.T
+            + PROCESS_NOISE * self.acceleration_noise
+        )
+        return self.positions
+
+    def update(self, association: BallAssociation, full_detection: bool) -> None:
+        """Correct tracks with the balls matched in the latest frame
+
+        :param association: association between tracked and newly detected balls
+        :param full_detection: True if the whole frame was searched for balls
+        """
+        rows = {pair: i for i, pair in enumerate(_enumerate_colours(self._colours))}
+        matched = [rows[(colour, index)] for colour, index, _ in association.matched]
+        measurements = keypoints_to_array(
+            keypoint for _, _, keypoint in association.matched
+        )
+        self._correct(np.array(matched, dtype=np.int64), measurements)
+
+        missed = np.ones(len(self), dtype=bool)
+        missed[matched] = False
+        self._missed[missed] += 1
+        self._missed[~missed] = 0
+
+        for (_, _, keypoint), row in zip(association.matched, matched):
+            keypoint.class_id = int(self._ids[row])
+
+        if full_detection:
+            self._frames_since_full_detection = 0
+        else:
+            self._frames_since_full_detection += 1
+
+    def search_windows(
+        self, shape: tuple[int, ...], origin: tuple[int, int] = (0, 0)
+    ) -> list[tuple[int, int, int, int]]:
+        """Get the regions of a frame where balls are predicted to be, merging
+        regions that overlap
+
+        :param shape: shape of the frame to search
+        :param origin: (x, y) position of the frame to search if it is a region
+                       of the frame balls are tracked in, defaults to (0, 0)
+        :return: list of (left, top, right, bottom) windows in the coordinates
+                 of the frame to search
+        """
+        height, width = shape[:2]
+        speeds = np.abs(self.velocities).max(axis=1, initial=0)
+        half_sizes = self._sizes * self.window_scale / 2 + speeds
+        positions = self.positions - np.array(origin, dtype=np.float64)
+        windows = np.column_stack(
+            [
+                positions - half_sizes[:, np.newaxis],
+                positions + half_sizes[:, np.newaxis],
+            ]
+        )
+        windows = np.clip(np.rint(windows), 0, [width, height, width, height]).astype(
+            int
+        )
+        return _merge_windows(
+            [
+                (left, top, right, bottom)
+                for left, top, right, bottom in windows.tolist()
+                # balls predicted outside of the frame to search are skipped
+                if left < right and top < bottom
+            ]
+        )
+
+    def _correct(self, rows: npt.NDArray[np.int64], measurements: Frame) -> None:
+        """Apply the Kalman measurement update to the tracks in `rows`
+
+        :param rows: indices of tracks to correct
+        :param measurements: measured positions of those tracks
+        """
+        if len(rows) == 0:
+            return
+        states = self._states[rows]
+        covariances = self._covariances[rows]
+        residuals = measurements - states[:, :2]
+        innovation = covariances[:, :2, :2] + np.eye(2) * self.measurement_noise
+        gains = covariances[:, :, :2] @ np.linalg.inv(innovation)
+        self._states[rows] = states + (gains @ residuals[:, :, np.newaxis])[:, :, 0]
+        self._covariances[rows] = covariances - gains @ covariances[:, :2, :]
+
+
+def _enumerate_colours(colours: list[str]) -> list[tuple[str, int]]:
+    """Pair each colour with its index among balls of the same colour
+
+    :param colours: colour of each track
+    :return: list of (colour, index) pairs
+    """
+    counts: dict[str, int] = {}
+    pairs = []
+    for colour in colours:
+        pairs.append((colour, counts.get(colour, 0)))
+        counts[colour] = counts.get(colour, 0) + 1
+    return pairs
+
+
+def _merge_windows(
+    windows: list[tuple[int, int, int, int]]
+) -> list[tuple[int, int, int, int]]:
+    """Merge overlapping windows into their bounding windows
+
+    :param windows: list of (left, top, right, bottom) windows
+    :return: list of windows where no two windows overlap
+    """
+    merged: list[tuple[int, int, int, int]] = []
+    for window in windows:
+        left, top, right, bottom = window
+        if right <= left or bottom <= top:
+            continue
+        overlapping = True
+        while overlapping:
+            overlapping = False
+            for other in merged:
+                if (
+                    left < other[2]
+                    and other[0] < right
+                    and top < other[3]
+                    and other[1] < bottom
+                ):
+                    merged.remove(other)
+                    left, top = min(left, other[0]), min(top, other[1])
+                    right, bottom = max(right, other[2]), max(bottom, other[3])
+                    overlapping = True
+                    break
+        merged.append((left, top, right, bottom))
+    return merged
@@ -1,4 +1,4 @@
-from typing import Dict, List, NamedTuple, TypeVar
+from typing import Dict, List, NamedTuple, Tuple, TypeVar
 
 import cv2
 import numpy as np
@@ -14,3 +14,9 @@ class Image(NamedTuple):
     frame: Frame
     binary_frame: Frame
     hsv_frame: Frame
+
+
+class BallAssociation(NamedTuple):
+    matched: List[Tuple[str, int, cv2.KeyPoint]]
+    unmatched: List[Tuple[str, int]]
+    new: List[cv2.KeyPoint]
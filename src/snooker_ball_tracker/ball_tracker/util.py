@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, cast
+import math
+from typing import TYPE_CHECKING, Any, Iterable
 
 import cv2
 import imutils
 import numpy as np
-import numpy.typing as npt
 
 from snooker_ball_tracker.settings import settings as s
 
@@ -13,22 +13,39 @@ if TYPE_CHECKING:
     from .types import Frame
 
 
+# Scale used to convert distances in pixels into millimetres where the scale of
+# the frame isn't known, `ShotStateMachine` estimates it from ball sizes instead
+MM_PER_PIXEL = 40 / 1280
+
+
 def dist_between_two_balls(
-    first_ball: cv2.KeyPoint, second_ball: cv2.KeyPoint
+    first_ball: cv2.KeyPoint,
+    second_ball: cv2.KeyPoint,
+    mm_per_pixel: float = MM_PER_PIXEL,
 ) -> float:
     """Obtains the distance between two balls in millimetres
 
     :param first_ball: first ball
     :param second_ball: second ball
+    :param mm_per_pixel: scale used to convert pixels into millimetres, such as
+                         one estimated from ball sizes by `ShotStateMachine`,
+                         defaults to MM_PER_PIXEL
     :return: distance between `first_ball` and `second_ball` in millimetres
     """
-    # create numpy array with keypoint positions
-    arr: npt.NDArray[np.float64] = np.array([first_ball.pt, second_ball.pt])
-    # scale array to mm
-    arr = cast(npt.NDArray[np.float64], arr * 40 / 1280)
-    # return distance, calculated by pythagoras
-    dist: float = np.sqrt(np.sum((arr[0] - arr[1]) ** 2))
-    return dist
+    (first_x, first_y), (second_x, second_y) = first_ball.pt, second_ball.pt
+    return math.hypot(first_x - second_x, first_y - second_y) * mm_per_pixel
+
+
+def keypoints_to_array(keypoints: Iterable[cv2.KeyPoint]) -> Frame:
+    """Collects the positions of `keypoints` into a single array
+
+    :param keypoints: keypoints to collect positions from
+    :return: array of positions with shape (N, 2)
+    """
+    positions: Frame = np.array(
+        [keypoint.pt for keypoint in keypoints], dtype=np.float64
+    ).reshape(-1, 2)
+    return positions
 
 
 def get_mask_contours_for_colour(
@@ -56,6 +73,21 @@ def get_mask_contours_for_colour(
     return colour_mask, contours
 
 
+def offset_keypoints(
+    keypoints: Iterable[cv2.KeyPoint], offset: tuple[int, int]
+) -> None:
+    """Moves `keypoints` by `offset`, such as from the coordinates of a region
+    of a frame into the coordinates of the whole frame
+
+    :param keypoints: keypoints to move
+    :param offset: (x, y) offset to add to the position of every keypoint
+    """
+    offset_x, offset_y = offset
+    if offset_x or offset_y:
+        for keypoint in keypoints:
+            keypoint.pt = (keypoint.pt[0] + offset_x, keypoint.pt[1] + offset_y)
+
+
 def transform_frame(frame: Frame | None, width: int) -> Frame | None:
     """Performs initial operations on `frame` before it is properly processed
 
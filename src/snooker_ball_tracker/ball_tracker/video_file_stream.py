@@ -1,45 +1,136 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
-
-import cv2
-from imutils.video import FileVideoStream
+import threading
+import time
+from collections import deque
+from queue import Queue
+from typing import TYPE_CHECKING, Any
 
+from ..enums import SchedulingPolicy
+from .pacing import FramePacer
 from .video_stream import VideoStream
 
 if TYPE_CHECKING:
     from . import ColourDetectionSettings, VideoPlayer
+    from .frame_source import FrameSource
+    from .types import Frame
 
 
-class VideoFileStream(FileVideoStream, VideoStream):  # type: ignore[misc]
+class VideoFileStream(VideoStream):
     def __init__(
         self,
-        path: str,
+        source: FrameSource,
         video_player: VideoPlayer,
         colour_settings: ColourDetectionSettings,
         queue_size: int = 128,
+        buffer_slots: int | None = None,
+        decimation: int = 1,
+        scheduling_policy: SchedulingPolicy = SchedulingPolicy.PROCESS_EVERY_FRAME,
     ):
-        """Create instance of VideoFileStream that loads frames from a video file in a
-        separate thread and performs some basic transformations
+        """Create instance of VideoFileStream that loads frames from a frame source
+        in a separate thread and performs some basic transformations
+
+        Frames are decoded and resized straight into the slots of a shared memory
+        ring buffer, the queue only holds the slot index and presentation
+        timestamp of each frame
+
+        `scheduling_policy` decides what happens once the queue is full. With
+        PROCESS_EVERY_FRAME decoding waits for the consumer, so no frame is
+        missed. The drop policies never wait for the consumer, they decode
+        frames at the frame rate of the source as a live feed would and either
+        drop every queued frame for the latest one (DROP_TO_LATEST) or drop the
+        oldest queued frame (DROP_OLDEST)
+
+        The stream starts at the current position of `source` and doesn't close
+        it when stopped, so a new stream can continue from any position of the
+        same source without opening it again
 
-        :param path: file path to video file to process
+        :param source: frame source to read frames from
         :param video_player: video player to obtain transformation settings from
         :param colour_settings: colour settings to obtain colours from
         :param queue_size: max number of frames to process and store at a time,
                            defaults to 128
+        :param buffer_slots: number of ring buffer slots, which must leave room
+                             for the frames held by the consumer and the frame
+                             being decoded, defaults to `queue_size` + 3
+        :param decimation: only decode every `decimation`-th frame, the frames
+                           in between are grabbed without being decoded,
+                           defaults to 1
+        :param scheduling_policy: what to do with decoded frames once the queue
+                                  is full, defaults to PROCESS_EVERY_FRAME
         """
-        try:
-            video_file_stream = cv2.VideoCapture(path)
-            if not video_file_stream.isOpened():
-                raise TypeError
-        except Exception as error:
-            raise error
-        finally:
-            video_file_stream.release()
-
         self._video_player = video_player
         self._colour_settings = colour_settings
 
-        super().__init__(path, queue_size=queue_size)
-        self.transform = self.transform_frame
-        self.thread.name = self.__class__.__name__
+        self.source = source
+        self.Q: Queue[Any] = Queue()
+        self.stopped = False
+        self.thread = threading.Thread(
+            target=self.update, name=self.__class__.__name__, daemon=True
+        )
+        self.queue_size = queue_size
+        self.buffer_slots = buffer_slots or queue_size + 3
+        self.decimation = max(decimation, 1)
+        self.scheduling_policy = scheduling_policy
+        self.fps = source.fps
+        self.dropped = 0
+        self.__pacer = FramePacer(self.fps)
+        self.ring_buffer = None
+        self.__decoded_frame: Frame | None = None
+        self._read_slots: deque[int] = deque()
+        self.timestamp: float | None = None
+        self.decoded_at: float | None = None
+
+    def start(self) -> None:
+        """Start decoding frames in a separate thread"""
+        self.thread.start()
+
+    def update(self) -> None:
+        """Decode frames into free ring buffer slots until the end of the video
+        or until the stream is stopped"""
+        drop_frames = self.scheduling_policy != SchedulingPolicy.PROCESS_EVERY_FRAME
+        while not self.stopped:
+            if not drop_frames and self.Q.qsize() >= self.queue_size:
+                time.sleep(0.01)
+                continue
+
+            # frames between decoded frames are skipped without decoding them
+            skip = self.decimation - 1 if self.__decoded_frame is not None else 0
+            decoded = None
+            if all(self.source.grab() for _ in range(skip)):
+                decoded = self.source.read(self.__decoded_frame)
+            if decoded is None:
+                self.stopped = True
+                self.Q.put(None)
+                break
+            frame, timestamp = decoded
+            self.__decoded_frame = frame
+            decoded_at = time.perf_counter()
+
+            if drop_frames:
+                self.__pacer.wait(timestamp)
+                if self.scheduling_policy == SchedulingPolicy.DROP_TO_LATEST:
+                    self._drop_frames(self.Q.qsize())
+                else:
+                    self._drop_frames(self.Q.qsize() - self.queue_size + 1)
+
+            slot = self._write_frame(frame)
+            if slot is not None:
+                self.Q.put((slot, timestamp, decoded_at))
+
+    def running(self) -> bool:
+        """Determine if there are frames left to read
+
+        :return: True if frames are queued or still being decoded
+        """
+        return self.more() or not self.stopped
+
+    def stop(self) -> None:
+        """Stop decoding frames and free the ring buffer"""
+        self.stopped = True
+        if self.thread.is_alive():
+            self.thread.join()
+        if self.ring_buffer is not None:
+            self.ring_buffer.close()
+            # frames still queued can no longer be read
+            self.ring_buffer = None
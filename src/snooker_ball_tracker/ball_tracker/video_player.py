@@ -3,30 +3,56 @@ from __future__ import annotations
 import threading
 from typing import TYPE_CHECKING
 
-import magic
+import cv2
 import numpy as np
 import PyQt5.QtCore as QtCore
 from imutils.video import FPS
 
+from ..enums import SchedulingPolicy
 from . import BallTracker
+from .display_buffer import LatestFrameBuffer
+from .frame_source import FrameSource, open_frame_source
+from .live_stream import LiveStream
+from .logger import Logger
 from .video_file_stream import VideoFileStream
 from .video_processor import VideoProcessor
 
 if TYPE_CHECKING:
     from .types import Frame
+    from .video_stream import VideoStream
 
 
 class VideoPlayer(QtCore.QObject):
-    def __init__(self, ball_tracker: BallTracker) -> None:
+    def __init__(
+        self,
+        ball_tracker: BallTracker,
+        scheduling_policy: SchedulingPolicy = SchedulingPolicy.PROCESS_EVERY_FRAME,
+        max_queue_size: int = 16,
+    ) -> None:
         """Creates an instance of this class that contains properties used by the
-        video player to display frames processed by the ball tracker"""
+        video player to display frames processed by the ball tracker
+
+        :param ball_tracker: ball tracker to process frames with
+        :param scheduling_policy: what to do with decoded frames once the frame
+                                  queue is full, PROCESS_EVERY_FRAME for offline
+                                  work or DROP_TO_LATEST/DROP_OLDEST for live
+                                  feeds, defaults to PROCESS_EVERY_FRAME
+        :param max_queue_size: max number of decoded frames waiting to be
+                               processed, defaults to 16
+        """
         super().__init__()
         self.ball_tracker = ball_tracker or BallTracker()
+        self.logger = Logger()
         self.video_processor_lock = threading.Lock()
         self.video_processor_stop_event = threading.Event()
         self.video_processor: VideoProcessor | None = None
-        self.video_file_stream: VideoFileStream | None = None
+        self.video_stream: VideoStream | None = None
         self.video_file: str | None = None
+        self.live_source: str | int | None = None
+        self.frame_source: FrameSource | None = None
+        self.scheduling_policy = scheduling_policy
+        self.max_queue_size = max_queue_size
+        self.display_buffer = LatestFrameBuffer()
 
         self._width = 1100
         self._height = 600
@@ -36,9 +62,9 @@ class VideoPlayer(QtCore.QObject):
         self._perform_morph = False
         self._detect_table = False
         self._queue_size = 0
+        self._dropped_frames = 0
+        self._latency = 0.0
         self._fps = FPS()
-        self._output_frame: Frame = np.array([])
-        self._hsv_frame: Frame = np.array([])
 
     widthChanged = QtCore.pyqtSignal(int)
 
@@ -192,6 +218,44 @@ class VideoPlayer(QtCore.QObject):
         self._queue_size = value
         self.queue_sizeChanged.emit(self._queue_size)
 
+    dropped_framesChanged = QtCore.pyqtSignal(int)
+
+    @property
+    def dropped_frames(self) -> int:
+        """Dropped frames property
+
+        :return: number of frames dropped by the scheduling policy
+        """
+        return self._dropped_frames
+
+    @dropped_frames.setter
+    def dropped_frames(self, value: int) -> None:
+        """Dropped frames setter
+
+        :param value: value to set
+        """
+        self._dropped_frames = value
+        self.dropped_framesChanged.emit(self._dropped_frames)
+
+    latencyChanged = QtCore.pyqtSignal(float)
+
+    @property
+    def latency(self) -> float:
+        """Latency property
+
+        :return: seconds between decoding the last frame and displaying it
+        """
+        return self._latency
+
+    @latency.setter
+    def latency(self, value: float) -> None:
+        """Latency setter
+
+        :param value: value to set
+        """
+        self._latency = value
+        self.latencyChanged.emit(self._latency)
+
     fpsChanged = QtCore.pyqtSignal(int)
 
     def start_fps(self) -> None:
@@ -208,45 +272,21 @@ class VideoPlayer(QtCore.QObject):
         self._fps.stop()
         self.fpsChanged.emit(self._fps.fps())
 
-    output_frameChanged = QtCore.pyqtSignal(np.ndarray)
-
-    @property
-    def output_frame(self) -> Frame:
-        """Frame property
-
-        :return: output frame
-        """
-        return self._output_frame
-
-    @output_frame.setter
-    def output_frame(self, value: Frame) -> None:
-        """Output frame setter
-
-        :param value: value to set
-        """
-        self._output_frame = value
-        self.output_frameChanged.emit(self._output_frame)
-
-    hsv_frameChanged = QtCore.pyqtSignal(np.ndarray)
-
     @property
     def hsv_frame(self) -> Frame:
-        """HSV frame property
-
-        :return: hsv frame
-        """
-        return self._hsv_frame
-
-    @hsv_frame.setter
-    def hsv_frame(self, value: Frame) -> None:
-        """HSV frame setter
+        """HSV frame property, which is only converted from the frame being
+        processed when it is requested, such as when a colour is picked
 
-        :param value: value to set
+        :return: hsv frame, which is empty if no frame has been processed
         """
-        self._hsv_frame = value
-        self.hsv_frameChanged.emit(self._hsv_frame)
-
-    def start(self, video_file: str | None = None) -> None:
+        with self.video_processor_lock:
+            frame = self.video_processor.frame if self.video_processor else None
+            if frame is None:
+                return np.array([])
+            hsv_frame: Frame = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+            return hsv_frame
+
+    def start(self, video_file: str | None = None, frame_index: int = 0) -> None:
         """Creates VideoProcessor and VideoFileStream instances to handle
         the selected video file.
 
@@ -258,32 +298,75 @@ class VideoPlayer(QtCore.QObject):
         The VideoProcessor then passes processed frames to the VideoPlayer
         to display to the user.
 
-        :param video_file: video file to read from, defaults to None
+        The video file is only opened when a new one is selected, restarting
+        and seeking reuse the frame source that is already open.
+
+        :param video_file: video file, image directory or .npy frame dump to
+                           read from, defaults to the one already open
+        :param frame_index: index of the frame to start from, defaults to 0
         :raises TypeError: if `video_file` isn't an actual video file
         """
-        if video_file and "video" not in magic.from_file(
-            video_file, mime=True
-        ):  # type: ignore[no-untyped-call]
-            raise TypeError(f"{video_file} is not a video file")
+        source = open_frame_source(video_file) if video_file else self.frame_source
 
         self.play = False
-        self.video_file = video_file or self.video_file
 
-        if self.video_file is None:
+        if source is None:
             raise ValueError("video_file is not set")
 
         self.destroy_video_threads()
-        self.video_processor_stop_event.clear()
+        if source is not self.frame_source:
+            if self.frame_source is not None:
+                self.frame_source.close()
+            self.frame_source, self.video_file = source, video_file
+        self.live_source = None
+
+        source.seek(frame_index)
+        self.__start_video_threads(
+            VideoFileStream(
+                source,
+                video_player=self,
+                colour_settings=self.ball_tracker.colour_settings,
+                queue_size=self.max_queue_size,
+                scheduling_policy=self.scheduling_policy,
+            )
+        )
 
-        self.video_file_stream = VideoFileStream(
-            self.video_file,
-            video_player=self,
-            colour_settings=self.ball_tracker.colour_settings,
-            queue_size=1,
+    def start_live(self, live_source: str | int) -> None:
+        """Creates VideoProcessor and LiveStream instances to handle
+        the selected live source.
+
+        The LiveStream keeps only the newest frame it has captured, so frames
+        are at most one frame old when the VideoProcessor processes them.
+
+        :param live_source: index of a capture device, or url or path of a stream
+        """
+        self.play = False
+
+        self.destroy_video_threads()
+        if self.frame_source is not None:
+            self.frame_source.close()
+        self.frame_source, self.video_file = None, None
+        self.live_source = live_source
+
+        self.__start_video_threads(
+            LiveStream(
+                live_source,
+                video_player=self,
+                colour_settings=self.ball_tracker.colour_settings,
+            )
         )
 
+    def __start_video_threads(self, video_stream: VideoStream) -> None:
+        """Start a VideoProcessor that processes frames from `video_stream`
+
+        :param video_stream: video stream to process frames from
+        """
+        self.video_processor_stop_event.clear()
+        self.ball_tracker.motion_gate.reset()
+
+        self.video_stream = video_stream
         self.video_processor = VideoProcessor(
-            video_stream=self.video_file_stream,
+            video_stream=self.video_stream,
             video_player=self,
             ball_tracker=self.ball_tracker,
             lock=self.video_processor_lock,
@@ -294,15 +377,18 @@ class VideoPlayer(QtCore.QObject):
 
     def restart(self) -> None:
         """Restart the video player by destroying the VideoProcessor
-        and VideoFileStream instances and creating new ones before
+        and VideoStream instances and creating new ones before
         starting the video player again."""
-        self.start()
+        if self.live_source is not None:
+            self.start_live(self.live_source)
+        else:
+            self.start()
 
     def destroy_video_threads(self) -> None:
-        """Destroy the VideoProcessor and VideoFileStream thread instances"""
+        """Destroy the VideoProcessor and VideoStream thread instances"""
         if self.video_processor is not None:
-            if self.video_file_stream is not None:
+            if self.video_stream is not None:
                 with self.video_processor_lock:
-                    self.video_file_stream.stop()
+                    self.video_stream.stop()
             self.video_processor_stop_event.set()
             self.video_processor.join()
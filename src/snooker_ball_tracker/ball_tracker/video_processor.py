@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import threading
-from copy import deepcopy
-from queue import Queue
-from time import sleep
+import time
 from typing import TYPE_CHECKING
 
+from ..enums import SchedulingPolicy
+from .pacing import FramePacer
+
 if TYPE_CHECKING:
     from . import BallTracker, VideoPlayer
     from .types import Frame
@@ -25,6 +26,12 @@ class VideoProcessor(threading.Thread):
         VideoStream and passes them to the ball tracker for processing before
         passing them to the video player to display
 
+        When the VideoStream processes every frame, frames are paced to its
+        frame rate, so that videos play back at the speed they were recorded
+        at rather than as fast as frames can be processed. Streams that drop
+        frames already produce them at their frame rate, so their frames are
+        processed as soon as they arrive
+
         :param video_stream: video stream that produces images to process
         :param video_player: video player instance that we pass processed frames to
         :param ball_tracker: ball tracker that we pass frames obtained from
@@ -33,7 +40,7 @@ class VideoProcessor(threading.Thread):
         :param stop_event: stop event used to shut down the VideoProcessor
         """
         super().__init__(name=self.__class__.__name__, daemon=True)
-        self.__logger = ball_tracker.logger
+        self.__logger = video_player.logger
         self.__video_player = video_player
         self.__colour_settings = ball_tracker.colour_settings
         self.__ball_tracker = ball_tracker
@@ -41,21 +48,47 @@ class VideoProcessor(threading.Thread):
         self.__stop_event = stop_event
         self.__frame_producer = video_stream
         self.__frame: Frame | None = None
+        self.__timestamp: float | None = None
+        self.__pacer = (
+            FramePacer(video_stream.fps)
+            if video_stream.scheduling_policy == SchedulingPolicy.PROCESS_EVERY_FRAME
+            else None
+        )
+
+    @property
+    def frame(self) -> Frame | None:
+        """Frame being processed, which stays valid while the lock used to
+        manage access to the VideoStream is held
+
+        :return: frame or None if no frame has been read yet
+        """
+        return self.__frame
 
     def run(self) -> None:
         """Run the main video processor process"""
         self.__video_player.play = True
         self.__frame_producer.start()
         self.__video_player.start_fps()
-        self._process_next_image()
+        # live sources can take a while to produce their first frame
+        while (
+            self.__frame is None
+            and not self.__stop_event.is_set()
+            and self.__frame_producer.running()
+        ):
+            self._process_next_image()
         self.__video_player.play = False
-        self.__frame_producer.Q = Queue(maxsize=16)
 
         while not self.__stop_event.is_set():
             if self.__video_player.play and self.__frame_producer.running():
                 self._process_next_image()
             else:
-                self._process_image()
+                # start pacing over once playback continues
+                if self.__pacer is not None:
+                    self.__pacer.reset()
+                if self.__frame is not None:
+                    self._process_image()
+                else:
+                    time.sleep(0.01)
         with self.__producer_lock:
             self.__frame_producer.stop()
 
@@ -63,17 +96,36 @@ class VideoProcessor(threading.Thread):
         """Process the next image obtained from the VideoStream"""
         with self.__producer_lock:
             frame = self.__frame_producer.read()
+            timestamp = self.__frame_producer.timestamp
+            decoded_at = self.__frame_producer.decoded_at
             self.__video_player.update_fps()
 
         if frame is not None:
-            self.__frame = frame
-            self._process_image()
+            previous_frame, self.__frame = self.__frame, frame
+            self.__timestamp = timestamp
+            self._process_image(gate_motion=True, track_table=True)
+            if decoded_at is not None:
+                self.__video_player.latency = time.perf_counter() - decoded_at
+            # the previous frame is no longer needed to reprocess while paused
+            if previous_frame is not None:
+                with self.__producer_lock:
+                    self.__frame_producer.release()
             self.__video_player.stop_fps()
-            # Limit frame processing speed
-            sleep(0.01)
+            if self.__pacer is not None:
+                self.__pacer.wait(timestamp)
 
-    def _process_image(self) -> None:
-        """Process the currently loaded image"""
+    def _process_image(
+        self, gate_motion: bool = False, track_table: bool = False
+    ) -> None:
+        """Process the currently loaded image
+
+        :param gate_motion: skip ball detection if nothing has moved since
+                            the last processed image, defaults to False
+        :param track_table: switch to the table boundary of the camera view
+                            of the image if the video has cut to another
+                            camera since the last processed image,
+                            defaults to False
+        """
         if self.__frame is None:
             raise ValueError("frame is not set")
 
@@ -85,22 +137,33 @@ class VideoProcessor(threading.Thread):
         mask_colour = self.__colour_settings.colour_mask
 
         image, ball_potted, count = self.__ball_tracker.process_frame(
-            deepcopy(self.__frame),
+            # the tracker never draws onto the frame, so it can be processed
+            # again while paused
+            self.__frame,
             show_threshold=show_threshold,
             detect_table=detect_table,
             crop_frames=crop_frames,
             perform_morph=perform_morph,
             detect_colour=selected_colour if selected_colour != "NONE" else None,
             mask_colour=mask_colour,
+            gate_motion=gate_motion,
+            track_table=track_table,
+            # frames processed again while paused keep their timestamp, so
+            # they don't move shots on
+            timestamp=self.__timestamp,
         )
 
+        self.__logger.update(self.__ball_tracker)
+
         self.__video_player.detect_table = False
 
         self.__video_player.queue_size = self.__frame_producer.Q.qsize()
+        self.__video_player.dropped_frames = self.__frame_producer.dropped
 
-        with self.__producer_lock:
-            self.__video_player.output_frame = image.frame
-            self.__video_player.hsv_frame = image.hsv_frame
+        # the display picks up the latest frame at its own rate
+        self.__video_player.display_buffer.write(
+            image.frame, self.__ball_tracker.overlay
+        )
 
         if ball_potted:
             self.__logger.balls_potted.addPottedBall(
@@ -1,35 +1,108 @@
 from __future__ import annotations
 
+import time
 from abc import ABC, abstractmethod
-from queue import Queue
-from typing import TYPE_CHECKING
+from collections import deque
+from queue import Empty, Queue
+from typing import TYPE_CHECKING, Any
 
-import imutils
+import cv2
+
+from .frame_ring_buffer import FrameRingBuffer
 
 if TYPE_CHECKING:
+    from ..enums import SchedulingPolicy
     from . import ColourDetectionSettings, VideoPlayer
     from .types import Frame
 
 
 class VideoStream(ABC):
 
-    Q: Queue[Frame]
+    Q: Queue[Any]
+    queue_size: int
+    stopped: bool
+    timestamp: float | None
+    decoded_at: float | None
+    fps: float
+    dropped: int
+    scheduling_policy: SchedulingPolicy
+    buffer_slots: int
+    ring_buffer: FrameRingBuffer | None
+    _read_slots: deque[int]
     _video_player: VideoPlayer
     _colour_settings: ColourDetectionSettings
 
-    def transform_frame(self, frame: Frame | None) -> Frame | None:
-        """Performs initial operations on `frame` before it is properly processed
+    def _drop_frames(self, count: int) -> None:
+        """Drop the `count` oldest queued frames and give back their slots
+
+        :param count: number of frames to drop
+        """
+        for _ in range(count):
+            try:
+                slot, _, _ = self.Q.get_nowait()
+            except Empty:
+                break
+            if self.ring_buffer is not None:
+                self.ring_buffer.release(slot)
+            self.dropped += 1
+
+    def _write_frame(self, frame: Frame) -> int | None:
+        """Resize `frame` to the video player width straight into a free
+        ring buffer slot, creating the ring buffer from the first frame
+
+        :param frame: decoded frame
+        :return: slot index or None if the stream was stopped while waiting
+                 for a free slot
+        """
+        if self.ring_buffer is None:
+            width = self._video_player.width
+            height = int(frame.shape[0] * width / frame.shape[1])
+            self.ring_buffer = FrameRingBuffer(
+                self.buffer_slots, (height, width, *frame.shape[2:]), frame.dtype
+            )
+            # set video player height to height of resized frames
+            self._video_player.height = height
+
+        slot = None
+        while slot is None and not self.stopped:
+            slot = self.ring_buffer.acquire(timeout=0.1)
+        if slot is None:
+            return None
+
+        height, width = self.ring_buffer.shape[:2]
+        cv2.resize(
+            frame,
+            (width, height),
+            dst=self.ring_buffer[slot],
+            interpolation=cv2.INTER_AREA,
+        )
+        return slot
+
+    def read(self) -> Frame | None:
+        """Get the next frame, which is a view onto a ring buffer slot that stays
+        valid until it is given back with `release`, and set `timestamp` to its
+        presentation timestamp in seconds and `decoded_at` to the time it was
+        decoded at
 
-        :param frame: frame to process
-        :return: processed frame
+        :return: next frame or None if the end of the video was reached or
+                 no frame arrived within half a second
         """
-        if frame is not None:
-            # resize the frame if width is provided
-            resized_frame: Frame = imutils.resize(frame, width=self._video_player.width)
-            # set video player height to height of resized frame
-            self._video_player.height = resized_frame.shape[0]
-            return resized_frame
-        return None
+        try:
+            # don't wait forever, as live sources can take a while to connect
+            item = self.Q.get(timeout=0.5)
+        except Empty:
+            return None
+        if item is None or self.ring_buffer is None:
+            return None
+        slot, self.timestamp, self.decoded_at = item
+        self._read_slots.append(slot)
+        return self.ring_buffer[slot]
+
+    def release(self) -> None:
+        """Give back the oldest frame obtained from `read` that hasn't been
+        released yet, so that its slot can be decoded into again"""
+        if self._read_slots and self.ring_buffer is not None:
+            self.ring_buffer.release(self._read_slots.popleft())
 
     @abstractmethod
     def start(self) -> None:
@@ -39,17 +112,22 @@ class VideoStream(ABC):
     def update(self) -> None:
         raise NotImplementedError
 
-    @abstractmethod
-    def read(self) -> Frame:
-        raise NotImplementedError
-
     @abstractmethod
     def running(self) -> bool:
         raise NotImplementedError
 
-    @abstractmethod
     def more(self) -> bool:
-        raise NotImplementedError
+        """Determine if there are frames queued, waiting briefly for the next
+        frame to be decoded or captured
+
+        :return: True if frames are queued
+        """
+        # poll often, as frames of live feeds arrive just in time
+        tries = 0
+        while self.Q.qsize() == 0 and not self.stopped and tries < 50:
+            time.sleep(0.01)
+            tries += 1
+        return self.Q.qsize() > 0
 
     @abstractmethod
     def stop(self) -> None:
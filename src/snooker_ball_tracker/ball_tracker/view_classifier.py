@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import TYPE_CHECKING
+
+import cv2
+import numpy as np
+
+from snooker_ball_tracker.enums import CameraView
+
+if TYPE_CHECKING:
+    from .types import Frame
+
+
+class ViewClassifier:
+    def __init__(
+        self,
+        width: int = 96,
+        min_table_fraction: float = 0.3,
+        max_ball_fraction: float = 0.01,
+        min_ball_circularity: float = 0.7,
+    ) -> None:
+        """Creates an instance of this class that cheaply determines what a
+        camera is showing, so that only frames of the main table view go through
+        ball detection
+
+        Frames are downscaled to `width` and the pixels in the table cloth colour
+        range are found. Frames with too little cloth are labelled as other
+        views, such as crowd shots and graphics. Otherwise the non cloth regions
+        enclosed by the cloth are measured, which are balls in the main view.
+        At this size balls in the main view are a pixel or two across, so a
+        large round region means the camera is showing a close-up of a ball
+
+        :param width: width to downscale frames to before classifying them,
+                      defaults to 96
+        :param min_table_fraction: min fraction of the frame that has to be
+                                   table cloth for it to show a table,
+                                   defaults to 0.3
+        :param max_ball_fraction: max fraction of the frame a ball can cover in
+                                  the main view, defaults to 0.01
+        :param min_ball_circularity: min circularity of a region larger than
+                                     `max_ball_fraction` for it to count as a
+                                     ball rather than a player or the rest
+                                     in front of the table, defaults to 0.7
+        """
+        self.width = width
+        self.min_table_fraction = min_table_fraction
+        self.max_ball_fraction = max_ball_fraction
+        self.min_ball_circularity = min_ball_circularity
+        self.counts = {view: 0 for view in CameraView}
+        self.time = 0.0
+        self._kernel = np.ones((3, 3), dtype=np.uint8)
+
+    @property
+    def classified(self) -> int:
+        """Number of frames that have been classified
+
+        :return: classified frames
+        """
+        return sum(self.counts.values())
+
+    def reset(self) -> None:
+        """Reset the view counters and classification time"""
+        self.counts = {view: 0 for view in CameraView}
+        self.time = 0.0
+
+    def classify(self, frame: Frame, lower: Frame, upper: Frame) -> CameraView:
+        """Determine what the camera is showing in `frame` and update the counters
+
+        :param frame: BGR frame to classify
+        :param lower: lower HSV bound of the table cloth colour
+        :param upper: upper HSV bound of the table cloth colour
+        :return: camera view of `frame`
+        """
+        started = time.perf_counter()
+        view = self.__classify(frame, lower, upper)
+        self.time += time.perf_counter() - started
+        self.counts[view] += 1
+        return view
+
+    def __classify(self, frame: Frame, lower: Frame, upper: Frame) -> CameraView:
+        """Implementation of `classify`, see `classify` for details"""
+        height = max(int(frame.shape[0] * self.width / frame.shape[1]), 1)
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        cloth = cv2.inRange(cv2.cvtColor(small, cv2.COLOR_BGR2HSV), lower, upper)
+        if cv2.countNonZero(cloth) < cloth.size * self.min_table_fraction:
+            return CameraView.OTHER
+
+        # remove table markings and other thin lines from the cloth
+        cloth = cv2.morphologyEx(cloth, cv2.MORPH_CLOSE, self._kernel)
+
+        # find the regions that aren't cloth inside the outline of the cloth
+        contours, _ = cv2.findContours(
+            cloth, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+        )
+        outline = np.zeros_like(cloth)
+        cv2.drawContours(
+            outline, [cv2.convexHull(max(contours, key=cv2.contourArea))], -1, 255, -1
+        )
+        regions, _ = cv2.findContours(
+            cv2.bitwise_and(outline, cv2.bitwise_not(cloth)),
+            cv2.RETR_EXTERNAL,
+            cv2.CHAIN_APPROX_NONE,
+        )
+
+        for region in regions:
+            area = cv2.contourArea(region)
+            if area <= cloth.size * self.max_ball_fraction:
+                continue
+            perimeter = cv2.arcLength(region, True)
+            if 4 * math.pi * area / perimeter**2 >= self.min_ball_circularity:
+                return CameraView.CLOSE_UP
+        return CameraView.MAIN_TABLE
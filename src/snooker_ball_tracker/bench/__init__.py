@@ -0,0 +1,7 @@
+from .benchmark import Benchmark as Benchmark
+from .runner import StageResult as StageResult
+from .runner import compare_results as compare_results
+from .runner import load_results as load_results
+from .runner import save_results as save_results
+from .runner import time_stage as time_stage
+from .synthetic import generate_table as generate_table
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import math
+import os
+import platform
+import sys
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable
+
+import cv2
+import numpy as np
+
+from snooker_ball_tracker.ball_tracker import BallTracker
+from snooker_ball_tracker.ball_tracker.util import transform_frame
+from snooker_ball_tracker.enums import SnookerColour
+from snooker_ball_tracker.settings import settings as s
+
+from .runner import StageResult, compare_results, load_results, save_results, time_stage
+from .synthetic import generate_table
+
+if TYPE_CHECKING:
+    from snooker_ball_tracker.ball_tracker.types import Frame
+
+# Stages of BallTracker that are benchmarked, in the order they are run
+STAGES = (
+    "process_frame",
+    "perform_colour_detection",
+    "update_balls",
+    "create_table_boundary",
+    "fill",
+)
+
+
+class Benchmark:
+    def create_parser(self) -> argparse.ArgumentParser:
+        """Create benchmark argument parser
+
+        :return: benchmark argument parser
+        """
+        parser = argparse.ArgumentParser(
+            description="Ball Tracker Benchmark (Times the ball tracker hot path)"
+        )
+        parser.add_argument(
+            "-s",
+            "--settings",
+            dest="settings",
+            default=os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                "resources",
+                "default_settings.json",
+            ),
+            help='Settings file to use, defaults to "%(default)s"',
+        )
+        parser.add_argument(
+            "-i",
+            "--images",
+            dest="images",
+            nargs="*",
+            default=[
+                os.path.join(
+                    os.path.dirname(
+                        os.path.dirname(
+                            os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                        )
+                    ),
+                    "resources",
+                    "images",
+                    image,
+                )
+                for image in ("image-1.jpg", "image-2.jpg")
+            ],
+            help="Images to benchmark, defaults to the images shipped in "
+            "resources/images, images that don't exist are skipped",
+        )
+        parser.add_argument(
+            "--image-width",
+            dest="image_width",
+            default=800,
+            type=int,
+            help="Width to resize images to, defaults to %(default)s pixels",
+        )
+        parser.add_argument(
+            "--widths",
+            dest="widths",
+            nargs="*",
+            default=[640, 1280, 1920],
+            type=int,
+            help="Widths of the synthetic tables to benchmark, "
+            "defaults to %(default)s",
+        )
+        parser.add_argument(
+            "--balls",
+            dest="balls",
+            nargs="*",
+            default=[8, 15, 22],
+            type=int,
+            help="Numbers of balls on the synthetic tables to benchmark, "
+            "defaults to %(default)s",
+        )
+        parser.add_argument(
+            "--stages",
+            dest="stages",
+            nargs="*",
+            default=list(STAGES),
+            choices=STAGES,
+            help="Stages to benchmark, defaults to all of them",
+        )
+        parser.add_argument(
+            "-n",
+            "--repeat",
+            dest="repeat",
+            default=50,
+            type=int,
+            help="Number of timed calls of each stage, defaults to %(default)s",
+        )
+        parser.add_argument(
+            "--warmup",
+            dest="warmup",
+            default=5,
+            type=int,
+            help="Number of calls of each stage before timing it, "
+            "defaults to %(default)s",
+        )
+        parser.add_argument(
+            "-o",
+            "--output",
+            dest="output",
+            default=None,
+            help="JSON file to save results to",
+        )
+        parser.add_argument(
+            "-b",
+            "--baseline",
+            dest="baseline",
+            default=None,
+            help="JSON file of earlier results to compare results with",
+        )
+        parser.add_argument(
+            "-t",
+            "--threshold",
+            dest="threshold",
+            default=0.1,
+            type=float,
+            help="Max relative increase in median latency over the baseline "
+            "before a stage counts as a regression, defaults to %(default)s",
+        )
+        return parser
+
+    def create_cases(self, args: argparse.Namespace) -> dict[str, Frame]:
+        """Load the images and generate the synthetic tables to benchmark
+
+        :param args: args parsed from benchmark parser
+        :return: BGR frames by case name
+        """
+        cases: dict[str, Frame] = {}
+        for image in args.images:
+            frame = transform_frame(cv2.imread(image), width=args.image_width)
+            if frame is None:
+                print(f"skipping {image}: image could not be read")
+                continue
+            name = os.path.splitext(os.path.basename(image))[0]
+            cases[f"{name}@{args.image_width}"] = frame
+
+        # balls are as large as the blob detector allows, as its area filter
+        # is set in pixels rather than relative to the frame size
+        ball_settings = s.BALL_DETECTION_SETTINGS
+        area = (ball_settings["MIN_AREA"] + ball_settings["MAX_AREA"]) / 2
+        radius = max(int(math.sqrt(area / math.pi)), 1)
+        for width in args.widths:
+            for ball_count in args.balls:
+                try:
+                    cases[f"synthetic@{width}x{ball_count}"] = generate_table(
+                        width,
+                        ball_count,
+                        s.COLOUR_DETECTION_SETTINGS["COLOURS"],
+                        radius,
+                    )
+                except ValueError as error:
+                    print(f"skipping synthetic table: {error}")
+        return cases
+
+    def create_stages(self, frame: Frame) -> dict[str, Callable[[], Any]]:
+        """Create a function that runs each stage on `frame`, with the inputs
+        of each stage prepared from `frame` beforehand
+
+        :param frame: BGR frame to run the stages on
+        :raises ValueError: if the table could not be found in `frame`
+        :return: functions by stage name
+        """
+        ball_tracker = BallTracker()
+        frames = itertools.count()
+        frame, threshold, hsv = ball_tracker.prepare_frame(frame, detect_table=True)
+        balls = ball_tracker.perform_colour_detection(threshold, hsv)
+        cur_balls = [ball for ball_list in balls.values() for ball in ball_list]
+
+        colours = ball_tracker.colour_settings.colours
+        mask = cv2.inRange(
+            hsv,
+            colours[SnookerColour.TABLE]["LOWER"],
+            colours[SnookerColour.TABLE]["UPPER"],
+        )
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+        contours = list(contours)
+        filled = np.empty_like(frame)
+
+        return {
+            "process_frame": lambda: ball_tracker.process_frame(
+                frame, timestamp=next(frames) / 25
+            ),
+            "perform_colour_detection": lambda: ball_tracker.perform_colour_detection(
+                threshold, hsv
+            ),
+            "update_balls": lambda: ball_tracker.update_balls(balls, cur_balls),
+            "create_table_boundary": lambda: ball_tracker.create_table_boundary(
+                frame, contours
+            ),
+            "fill": lambda: ball_tracker.fill(frame, dst=filled),
+        }
+
+    def run(self, args: argparse.Namespace) -> bool:
+        """Run every stage over every case and print the results
+
+        :param args: args parsed from benchmark parser
+        :raises OSError: if `settings` arg failed to load
+        :raises OSError: if `baseline` arg failed to load
+        :return: False if any stage regressed from the baseline
+        """
+        success, _ = s.load(args.settings)
+        if not success:
+            raise OSError(f"Failed to load settings file: {args.settings}")
+        baseline = load_results(args.baseline) if args.baseline else None
+
+        results: dict[str, dict[str, StageResult]] = {}
+        print(
+            f"{'case':<24} {'stage':<26} {'p50 ms':>9} {'p90 ms':>9} "
+            f"{'p99 ms':>9} {'frames/s':>10} {'peak KiB':>10} {'gc':>4}"
+        )
+        for case, frame in self.create_cases(args).items():
+            try:
+                stages = self.create_stages(frame)
+            except ValueError as error:
+                # no table could be found in this frame
+                print(f"skipping {case}: {error}")
+                continue
+            results[case] = {}
+            for stage in args.stages:
+                result = time_stage(stages[stage], args.repeat, args.warmup)
+                results[case][stage] = result
+                print(
+                    f"{case:<24} {stage:<26} {result.p50_ms:>9.3f} "
+                    f"{result.p90_ms:>9.3f} {result.p99_ms:>9.3f} "
+                    f"{result.fps:>10.1f} {result.peak_bytes / 1024:>10.1f} "
+                    f"{result.gc_collections:>4}"
+                )
+
+        if args.output:
+            save_results(
+                args.output,
+                results,
+                created=datetime.now().isoformat(timespec="seconds"),
+                python=platform.python_version(),
+                numpy=np.__version__,
+                opencv=cv2.__version__,
+                platform=platform.platform(),
+                settings=args.settings,
+                repeat=args.repeat,
+            )
+            print(f"results written to: {args.output}")
+
+        if baseline is None:
+            return True
+        regressions = compare_results(results, baseline, args.threshold)
+        print("=================================")
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression.case} {regression.stage}: "
+                f"{regression.metric} {regression.baseline:.3f} -> "
+                f"{regression.current:.3f} (+{regression.change:.0%})"
+            )
+        print(
+            f"{len(regressions)} regressions over {args.threshold:.0%} "
+            f"compared to {args.baseline}"
+        )
+        print("=================================")
+        return not regressions
+
+
+def main() -> None:
+    benchmark = Benchmark()
+    parser = benchmark.create_parser()
+    args = parser.parse_args()
+    args.settings = os.path.abspath(args.settings)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    try:
+        passed = benchmark.run(args)
+    except OSError as ex:
+        parser.exit(1, message=str(ex))
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
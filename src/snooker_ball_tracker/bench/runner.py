@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, NamedTuple
+
+import numpy as np
+
+# Latency percentiles that are reported for every stage
+PERCENTILES = (50, 90, 99)
+
+
+class StageResult(NamedTuple):
+    calls: int
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    fps: float
+    peak_bytes: float
+    retained_bytes: float
+    gc_collections: int
+
+
+class Regression(NamedTuple):
+    case: str
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+    change: float
+
+
+def time_stage(
+    stage: Callable[[], Any],
+    repeat: int = 50,
+    warmup: int = 5,
+    alloc_repeat: int = 5,
+) -> StageResult:
+    """Measure how long a stage takes and how much memory it allocates
+
+    Latencies are measured over `repeat` calls after `warmup` calls. Memory is
+    measured separately over `alloc_repeat` calls while tracing allocations,
+    which would otherwise slow the timed calls down
+
+    :param stage: function that runs the stage once
+    :param repeat: number of timed calls, defaults to 50
+    :param warmup: number of calls before timing, defaults to 5
+    :param alloc_repeat: number of calls to measure memory over, defaults to 5
+    :return: latency percentiles, mean latency, calls per second, mean peak
+             bytes allocated and bytes still allocated after a call, and
+             garbage collections while timing
+    """
+    for _ in range(warmup):
+        stage()
+
+    latencies = np.empty(repeat, dtype=np.float64)
+    collections = sum(stats["collections"] for stats in gc.get_stats())
+    for i in range(repeat):
+        started = time.perf_counter_ns()
+        stage()
+        latencies[i] = time.perf_counter_ns() - started
+    collections = sum(stats["collections"] for stats in gc.get_stats()) - collections
+    latencies /= 1e6
+
+    peak = np.zeros(alloc_repeat, dtype=np.float64)
+    retained = np.zeros(alloc_repeat, dtype=np.float64)
+    tracemalloc.start()
+    try:
+        for i in range(alloc_repeat):
+            # also resets the peak
+            tracemalloc.clear_traces()
+            stage()
+            retained[i], peak[i] = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50, p90, p99 = np.percentile(latencies, PERCENTILES)
+    mean = float(latencies.mean())
+    return StageResult(
+        calls=repeat,
+        mean_ms=mean,
+        p50_ms=float(p50),
+        p90_ms=float(p90),
+        p99_ms=float(p99),
+        fps=1000 / mean if mean > 0 else float("inf"),
+        peak_bytes=float(peak.mean()) if alloc_repeat else 0.0,
+        retained_bytes=float(retained.mean()) if alloc_repeat else 0.0,
+        gc_collections=collections,
+    )
+
+
+def save_results(
+    path: str, results: dict[str, dict[str, StageResult]], **info: Any
+) -> None:
+    """Save benchmark results as JSON
+
+    :param path: path of the file to write
+    :param results: stage results by stage name by case name
+    :param **info: info about the run, such as library versions
+    """
+    with open(path, "w") as output:
+        json.dump(
+            {
+                **info,
+                "cases": {
+                    case: {stage: result._asdict() for stage, result in stages.items()}
+                    for case, stages in results.items()
+                },
+            },
+            output,
+            indent=4,
+        )
+
+
+def load_results(path: str) -> dict[str, dict[str, StageResult]]:
+    """Load benchmark results saved by `save_results`
+
+    :param path: path of the file to read
+    :raises OSError: if the file could not be read or isn't a results file
+    :return: stage results by stage name by case name
+    """
+    try:
+        with open(path) as results_file:
+            cases = json.load(results_file)["cases"]
+        return {
+            case: {stage: StageResult(**result) for stage, result in stages.items()}
+            for case, stages in cases.items()
+        }
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        raise OSError(f"Failed to load benchmark results: {path}") from error
+
+
+def compare_results(
+    results: dict[str, dict[str, StageResult]],
+    baseline: dict[str, dict[str, StageResult]],
+    threshold: float = 0.1,
+    metric: str = "p50_ms",
+) -> list[Regression]:
+    """Compare results with a baseline, stages that are only in one of them
+    are ignored
+
+    :param results: stage results by stage name by case name
+    :param baseline: baseline stage results by stage name by case name
+    :param threshold: max relative increase of `metric` over the baseline,
+                      defaults to 0.1
+    :param metric: stage result field to compare, which is worse when it is
+                   higher, defaults to "p50_ms"
+    :return: stages where `metric` increased by more than `threshold`
+    """
+    regressions: list[Regression] = []
+    for case, stages in results.items():
+        for stage, result in stages.items():
+            if stage not in baseline.get(case, {}):
+                continue
+            before = getattr(baseline[case][stage], metric)
+            after = getattr(result, metric)
+            if before <= 0:
+                continue
+            change = after / before - 1
+            if change > threshold:
+                regressions.append(
+                    Regression(case, stage, metric, before, after, change)
+                )
+    return regressions
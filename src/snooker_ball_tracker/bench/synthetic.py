@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import cv2
+import numpy as np
+
+from snooker_ball_tracker.enums import SnookerColour
+
+if TYPE_CHECKING:
+    from snooker_ball_tracker.ball_tracker.types import Frame
+
+# Colours balls are added in, after the reds that make up the rest of the balls
+BALL_ORDER = [
+    SnookerColour.WHITE,
+    SnookerColour.BLACK,
+    SnookerColour.PINK,
+    SnookerColour.BLUE,
+    SnookerColour.BROWN,
+    SnookerColour.GREEN,
+    SnookerColour.YELLOW,
+]
+
+# BGR colour of the cushions and everything around the table
+SURROUND = (20, 30, 45)
+
+
+def hsv_range_to_bgr(colour: dict[str, Any]) -> tuple[int, int, int]:
+    """Convert the middle of an HSV colour range to BGR
+
+    :param colour: colour with "LOWER" and "UPPER" HSV bounds
+    :return: BGR colour
+    """
+    hsv = (np.array(colour["LOWER"]) + np.array(colour["UPPER"])) // 2
+    bgr = cv2.cvtColor(hsv.astype(np.uint8).reshape(1, 1, 3), cv2.COLOR_HSV2BGR)
+    return (int(bgr[0, 0, 0]), int(bgr[0, 0, 1]), int(bgr[0, 0, 2]))
+
+
+def generate_table(
+    width: int,
+    ball_count: int,
+    colours: dict[str, dict[str, Any]],
+    ball_radius: int,
+    seed: int = 0,
+) -> Frame:
+    """Generate a 16:9 BGR frame of a table seen from above, with balls
+    scattered over the cloth without overlapping
+
+    The cloth and balls are painted in the middle of the HSV ranges of their
+    colours, so they are detected with the colour settings they were painted
+    from. One ball of each colour other than red is added first, in the order
+    of `BALL_ORDER`, and every other ball is red
+
+    :param width: width of the frame in pixels
+    :param ball_count: number of balls
+    :param colours: HSV ranges of the table and ball colours, as in the
+                    "COLOURS" colour detection settings
+    :param ball_radius: radius of a ball in pixels
+    :param seed: seed of the random ball positions, defaults to 0
+    :raises ValueError: if the balls don't fit on the table
+    :return: BGR frame
+    """
+    height = width * 9 // 16
+    frame: Frame = np.full((height, width, 3), SURROUND, dtype=np.uint8)
+
+    # the cloth is twice as wide as it is high, like a full size table
+    cloth_height = height * 4 // 5
+    cloth_width = min(cloth_height * 2, width * 9 // 10)
+    left = (width - cloth_width) // 2
+    top = (height - cloth_height) // 2
+    cv2.rectangle(
+        frame,
+        (left, top),
+        (left + cloth_width - 1, top + cloth_height - 1),
+        hsv_range_to_bgr(colours[SnookerColour.TABLE]),
+        -1,
+    )
+
+    ball_colours = (BALL_ORDER + [SnookerColour.RED] * ball_count)[:ball_count]
+    rng = np.random.default_rng(seed)
+    margin = ball_radius * 2
+    positions: list[tuple[int, int]] = []
+    for colour in ball_colours:
+        for _ in range(1000):
+            x = int(rng.integers(left + margin, left + cloth_width - margin))
+            y = int(rng.integers(top + margin, top + cloth_height - margin))
+            # leave a gap of at least a radius between balls
+            if all(
+                (x - other_x) ** 2 + (y - other_y) ** 2 >= (ball_radius * 3) ** 2
+                for other_x, other_y in positions
+            ):
+                break
+        else:
+            raise ValueError(f"{ball_count} balls don't fit on a {width}px table")
+        positions.append((x, y))
+        cv2.circle(
+            frame,
+            (x, y),
+            ball_radius,
+            hsv_range_to_bgr(colours[colour]),
+            -1,
+            lineType=cv2.LINE_AA,
+        )
+    return frame
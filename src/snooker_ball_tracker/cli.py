@@ -10,7 +10,7 @@ import numpy as np
 
 from snooker_ball_tracker.ball_tracker import BallTracker
 from snooker_ball_tracker.ball_tracker.util import transform_frame
-from snooker_ball_tracker.enums import SnookerColour
+from snooker_ball_tracker.enums import ColourDetectionMode, SnookerColour
 from snooker_ball_tracker.settings import settings as s
 
 if TYPE_CHECKING:
@@ -88,6 +88,14 @@ class CLI:
             default=False,
             help="Perform morph closing morphology on processed frames",
         )
+        parser.add_argument(
+            "--colour-detection-mode",
+            dest="colour_detection_mode",
+            default=ColourDetectionMode.CONTOUR.value,
+            type=str.upper,
+            choices=[mode.value for mode in ColourDetectionMode],
+            help='Method used to map balls to colours, defaults to "%(default)s"',
+        )
         return parser
 
     def __pick_color(self, event: int, x_pos: int, y_pos: int, *ignore: Any) -> None:
@@ -155,7 +163,9 @@ class CLI:
             print("waiting for user input...\n")
 
             # create ball tracker with loaded settings
-            self.ball_tracker = BallTracker()
+            self.ball_tracker = BallTracker(
+                colour_detection_mode=ColourDetectionMode(args.colour_detection_mode)
+            )
 
             # create main ball tracker window
             cv2.namedWindow(self.window_title)
@@ -207,6 +217,7 @@ class CLI:
                     mask_colour=args.mask_colour,
                     perform_morph=args.morph,
                 )
+                self.ball_tracker.overlay.render(self.image.frame)
                 cv2.imshow(self.window_title, self.image.frame)
 
                 # obtain key value if a key was pressed
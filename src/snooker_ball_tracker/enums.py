@@ -15,3 +15,20 @@ class SnookerColour(Colour):
     BLACK = "BLACK"
     WHITE = "WHITE"
     TABLE = "TABLE"
+
+
+class ColourDetectionMode(str, Enum):
+    CONTOUR = "CONTOUR"
+    SAMPLE = "SAMPLE"
+
+
+class CameraView(str, Enum):
+    MAIN_TABLE = "MAIN_TABLE"
+    CLOSE_UP = "CLOSE_UP"
+    OTHER = "OTHER"
+
+
+class SchedulingPolicy(str, Enum):
+    PROCESS_EVERY_FRAME = "PROCESS_EVERY_FRAME"
+    DROP_TO_LATEST = "DROP_TO_LATEST"
+    DROP_OLDEST = "DROP_OLDEST"
@@ -7,6 +7,7 @@ import sys
 from PyQt5 import QtGui
 from PyQt5.QtWidgets import QApplication
 
+from snooker_ball_tracker.enums import SchedulingPolicy
 from snooker_ball_tracker.utils import IS_FROZEN
 from snooker_ball_tracker.views import MainView
 
@@ -54,6 +55,21 @@ class GUI:
         parser.add_argument(
             "-v", "--video", dest="video", default=None, help="Video file to process"
         )
+        parser.add_argument(
+            "-l",
+            "--live",
+            dest="live",
+            default=None,
+            help="Capture device index, or url or path of a live stream to process",
+        )
+        parser.add_argument(
+            "--scheduling-policy",
+            dest="scheduling_policy",
+            default=SchedulingPolicy.PROCESS_EVERY_FRAME.value,
+            choices=[policy.value for policy in SchedulingPolicy],
+            help="What to do with decoded frames once the frame queue is full, "
+            "defaults to %(default)s",
+        )
         return parser
 
     def run(self, args: argparse.Namespace) -> None:
@@ -90,6 +90,27 @@ class Settings:
                 },
             },
         },
+        ################################
+        #  DETECTION CADENCE SETTINGS  #
+        ################################
+        "DETECTION_CADENCE_SETTINGS": {
+            "POLICY": "FIXED",
+            "INTERVAL": 5,
+            "MIN_INTERVAL": 1,
+            "MAX_INTERVAL": 30,
+            "MOTION_SPEED": 1.0,
+        },
+        #############################
+        #  SHOT DETECTION SETTINGS  #
+        #############################
+        "SHOT_DETECTION_SETTINGS": {
+            "START_SPEED": 50.0,
+            "STOP_SPEED": 20.0,
+            "MIN_STATIONARY_TIME": 0.2,
+            "MOTION_WINDOW": 0.2,
+            "BALL_DIAMETER": 52.5,
+            "FPS": 25.0,
+        },
     }
 
     #####################
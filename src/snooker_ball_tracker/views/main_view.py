@@ -5,6 +5,7 @@ import PyQt5.QtGui as QtGui
 import PyQt5.QtWidgets as QtWidgets
 
 from snooker_ball_tracker.ball_tracker import BallTracker, VideoPlayer
+from snooker_ball_tracker.enums import SchedulingPolicy
 from snooker_ball_tracker.settings import settings as s
 
 from .actions import (
@@ -44,14 +45,16 @@ class MainView(QtWidgets.QMainWindow):
         self.central_widget_layout.setContentsMargins(15, 15, 15, 15)
 
         self.ball_tracker = BallTracker()
-        self.video_player = VideoPlayer(self.ball_tracker)
+        self.video_player = VideoPlayer(
+            self.ball_tracker, SchedulingPolicy(args.scheduling_policy)
+        )
 
         self.settings_view = SettingsView(
             colour_settings=self.ball_tracker.colour_settings,
             ball_settings=self.ball_tracker.ball_settings,
         )
         self.logging_view = LoggingView(
-            self.ball_tracker.logger, self.ball_tracker.colour_settings
+            self.video_player.logger, self.ball_tracker.colour_settings
         )
         self.video_player_view = VideoPlayerView(
             self.video_player, self.ball_tracker.colour_settings
@@ -85,7 +88,9 @@ class MainView(QtWidgets.QMainWindow):
 
         self.menuBar().setNativeMenuBar(False)
 
-        if args.video is not None:
+        if args.live is not None:
+            self.video_player.start_live(args.live)
+        elif args.video is not None:
             try:
                 self.video_player.start(args.video)
             except TypeError:
@@ -28,6 +28,16 @@ class Options(QtWidgets.QWidget):
         )
         self.video_fps_value = Ui_Label("0", alignment=QtCore.Qt.AlignCenter)
 
+        self.video_dropped_label = Ui_Label(
+            "Dropped:", alignment=QtCore.Qt.AlignTrailing | QtCore.Qt.AlignVCenter
+        )
+        self.video_dropped_value = Ui_Label("0", alignment=QtCore.Qt.AlignCenter)
+
+        self.video_latency_label = Ui_Label(
+            "Latency:", alignment=QtCore.Qt.AlignTrailing | QtCore.Qt.AlignVCenter
+        )
+        self.video_latency_value = Ui_Label("0 ms", alignment=QtCore.Qt.AlignCenter)
+
         self.play_btn = Ui_PushButton("Play", self, objectName="play_btn")
         self.restart_btn = Ui_PushButton("Restart", self, objectName="restart_btn")
         self.detectTable_btn = Ui_PushButton(
@@ -114,11 +124,15 @@ class Options(QtWidgets.QWidget):
         self.layout.addWidget(self.video_stream_queue_value, 0, 6)
         self.layout.addWidget(self.video_fps_label, 1, 7)
         self.layout.addWidget(self.video_fps_value, 1, 6)
-        self.layout.addWidget(Ui_Line(shape=QtWidgets.QFrame.VLine), 0, 5, 3, 1)
+        self.layout.addWidget(self.video_dropped_label, 2, 7)
+        self.layout.addWidget(self.video_dropped_value, 2, 6)
+        self.layout.addWidget(self.video_latency_label, 3, 7)
+        self.layout.addWidget(self.video_latency_value, 3, 6)
+        self.layout.addWidget(Ui_Line(shape=QtWidgets.QFrame.VLine), 0, 5, 4, 1)
         self.layout.addWidget(self.play_btn, 0, 4)
         self.layout.addWidget(self.restart_btn, 1, 4)
         self.layout.addWidget(self.detectTable_btn, 2, 4)
-        self.layout.addWidget(Ui_Line(shape=QtWidgets.QFrame.VLine), 0, 3, 3, 1)
+        self.layout.addWidget(Ui_Line(shape=QtWidgets.QFrame.VLine), 0, 3, 4, 1)
         self.layout.addWidget(self.showThreshold_label, 0, 2)
         self.layout.addWidget(self.showThreshold_yradio, 0, 1)
         self.layout.addWidget(self.showThreshold_nradio, 0, 0)
@@ -140,6 +154,8 @@ class Options(QtWidgets.QWidget):
 
         self.video_player.playChanged.connect(self.update_on_play_changed)
         self.video_player.fpsChanged.connect(self.video_fps_value.setNum)
+        self.video_player.dropped_framesChanged.connect(self.video_dropped_value.setNum)
+        self.video_player.latencyChanged.connect(self.update_on_latency_changed)
         QtCore.QMetaObject.connectSlotsByName(self)
 
     @QtCore.pyqtSlot(bool)
@@ -150,6 +166,10 @@ class Options(QtWidgets.QWidget):
         else:
             self.play_btn.setText("Play")
 
+    @QtCore.pyqtSlot(float)
+    def update_on_latency_changed(self, latency: float):
+        self.video_latency_value.setText(f"{latency * 1000:.0f} ms")
+
     @QtCore.pyqtSlot()
     def on_play_btn_pressed(self):
         if self.play_btn.text() == "Play":
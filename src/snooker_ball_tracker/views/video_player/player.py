@@ -40,9 +40,19 @@ class Player(QtWidgets.QFrame):
         self.selectVideoFile_btn.pressed.connect(self.select_video_file_btn_pressed)
 
         self.layout.addWidget(self.selectVideoFile_btn)
-        self.video_player.output_frameChanged.connect(self.display_output_frame)
         self.video_player.heightChanged.connect(self.setMaximumHeight)
 
+        # repaint at most once per refresh of the screen, frames processed
+        # in between are never shown
+        screen = QtGui.QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None else 0
+        self.display_sequence = 0
+        self.display_timer = QtCore.QTimer(self)
+        self.display_timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.display_timer.setInterval(round(1000 / (refresh_rate or 60)))
+        self.display_timer.timeout.connect(self.display_output_frame)
+        self.display_timer.start()
+
     def select_video_file_btn_pressed(self):
         try:
             video_file = select_video_file_action()
@@ -78,14 +88,25 @@ class Player(QtWidgets.QFrame):
 
             self.colours.colour_model.update(colour)
 
-    def display_output_frame(self, output_frame):
-        self.layout.removeWidget(self.selectVideoFile_btn)
-        self.layout.addWidget(self.output_frame, alignment=QtCore.Qt.AlignCenter)
-        self.setStyleSheet("background-color: black")
-        output_frame = QtGui.QImage(
-            output_frame.data,
-            output_frame.shape[1],
-            output_frame.shape[0],
-            QtGui.QImage.Format_RGB888,
-        ).rgbSwapped()
-        self.output_frame.setPixmap(QtGui.QPixmap.fromImage(output_frame))
+    def display_output_frame(self):
+        with self.video_player.display_buffer.latest() as (output_frame, sequence):
+            if output_frame is None or sequence == self.display_sequence:
+                return
+            if self.display_sequence == 0:
+                self.layout.removeWidget(self.selectVideoFile_btn)
+                self.selectVideoFile_btn.hide()
+                self.layout.addWidget(
+                    self.output_frame, alignment=QtCore.Qt.AlignCenter
+                )
+                self.setStyleSheet("background-color: black")
+            self.display_sequence = sequence
+            # the image wraps the RGB frame without copying it, it is only
+            # copied once into the pixmap while the frame is locked
+            image = QtGui.QImage(
+                output_frame.data,
+                output_frame.shape[1],
+                output_frame.shape[0],
+                output_frame.strides[0],
+                QtGui.QImage.Format_RGB888,
+            )
+            self.output_frame.setPixmap(QtGui.QPixmap.fromImage(image))
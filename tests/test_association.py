@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import math
+
+import cv2
+import numpy as np
+
+from snooker_ball_tracker.ball_tracker.association import associate, pairwise_distances
+from snooker_ball_tracker.ball_tracker.util import (
+    MM_PER_PIXEL,
+    dist_between_two_balls,
+    keypoints_to_array,
+)
+
+# Max distance in millimetres between a ball and its new position,
+# the same as used by `BallTracker.associate_balls`
+MAX_DISTANCE = 0.3
+
+
+def nested_loop_matches(
+    tracks: np.ndarray, detections: np.ndarray, max_distance: float
+) -> list[tuple[int, int]]:
+    """Match detections the way `update_balls` did before it was vectorised,
+    where every detection is matched to the first track within `max_distance`
+
+    :param tracks: positions of tracked balls with shape (N, 2)
+    :param detections: positions of new detections with shape (M, 2)
+    :param max_distance: max distance between a track and a detection
+    :return: matched (track, detection) index pairs
+    """
+    matches = []
+    for detection, (detection_x, detection_y) in enumerate(detections):
+        for track, (track_x, track_y) in enumerate(tracks):
+            if math.hypot(track_x - detection_x, track_y - detection_y) <= max_distance:
+                matches.append((track, detection))
+                break
+    return matches
+
+
+def create_balls(seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """Create tracked balls at least 1mm apart and shuffled detections of them,
+    where some balls have moved less than `MAX_DISTANCE`, some have gone and
+    some detections are new balls far from every tracked ball
+
+    :param seed: random seed
+    :return: positions of tracked balls and detections in millimetres
+    """
+    rng = np.random.default_rng(seed)
+    grid = np.stack(np.meshgrid(np.arange(6), np.arange(4)), axis=-1).reshape(-1, 2)
+    tracks = grid + rng.uniform(-0.2, 0.2, grid.shape)
+
+    kept = tracks[rng.random(len(tracks)) < 0.8]
+    angles = rng.uniform(0, 2 * math.pi, len(kept))
+    steps = rng.uniform(0, MAX_DISTANCE * 0.9, len(kept))
+    moved = kept + np.column_stack([np.cos(angles), np.sin(angles)]) * steps[:, None]
+    new = rng.uniform(100, 110, (3, 2))
+    detections = np.concatenate([moved, new])
+    return tracks, detections[rng.permutation(len(detections))]
+
+
+def test_pairwise_distances_match_distance_between_two_balls() -> None:
+    rng = np.random.default_rng(0)
+    first = [cv2.KeyPoint(x, y, 10) for x, y in rng.uniform(0, 1280, (7, 2))]
+    second = [cv2.KeyPoint(x, y, 10) for x, y in rng.uniform(0, 1280, (5, 2))]
+    distances = pairwise_distances(
+        keypoints_to_array(first) * MM_PER_PIXEL,
+        keypoints_to_array(second) * MM_PER_PIXEL,
+    )
+    expected = [[dist_between_two_balls(a, b) for b in second] for a in first]
+    assert np.allclose(distances, expected)
+
+
+def test_matches_nested_loop_when_unambiguous() -> None:
+    for seed in range(20):
+        tracks, detections = create_balls(seed)
+        association = associate(tracks, detections, MAX_DISTANCE)
+        expected = nested_loop_matches(tracks, detections, MAX_DISTANCE)
+        assert sorted(association.matches) == sorted(expected)
+
+        matched_tracks = {track for track, _ in expected}
+        matched_detections = {detection for _, detection in expected}
+        assert association.unmatched_tracks == [
+            track for track in range(len(tracks)) if track not in matched_tracks
+        ]
+        assert association.unmatched_detections == [
+            detection
+            for detection in range(len(detections))
+            if detection not in matched_detections
+        ]
+
+
+def test_matches_each_track_once() -> None:
+    # the nested loop matched both detections to the first track,
+    # only the closest detection is matched to it now
+    tracks = np.array([[0.0, 0.0], [5.0, 0.0]])
+    detections = np.array([[0.2, 0.0], [0.1, 0.0]])
+    assert nested_loop_matches(tracks, detections, MAX_DISTANCE) == [(0, 0), (0, 1)]
+
+    association = associate(tracks, detections, MAX_DISTANCE)
+    assert association.matches == [(0, 1)]
+    assert association.unmatched_tracks == [1]
+    assert association.unmatched_detections == [0]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import Any
+
+import cv2
+import numpy as np
+
+from snooker_ball_tracker.ball_tracker.colour_classifier import ColourClassifier
+from snooker_ball_tracker.ball_tracker.settings import ColourDetectionSettings
+from snooker_ball_tracker.ball_tracker.util import get_mask_contours_for_colour
+
+
+def create_hsv_frame(colours: dict[str, Any], seed: int = 0) -> np.ndarray:
+    """Create a HSV frame of random pixels, where half of the channel values
+    are on or next to the bounds of the colour ranges
+
+    :param colours: colour ranges to take bounds from
+    :param seed: random seed, defaults to 0
+    :return: HSV frame
+    """
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 256, (90, 120, 3), dtype=np.uint8)
+    frame[:, :, 0] %= 180
+    bounds = np.array(
+        [colour[bound] for colour in colours.values() for bound in ("LOWER", "UPPER")]
+    )
+    for channel in range(3):
+        edges = np.concatenate([bounds[:, channel] + step for step in (-1, 0, 1)])
+        edges = np.clip(edges, 0, 179 if channel == 0 else 255)
+        on_edge = rng.random(frame.shape[:2]) < 0.5
+        frame[:, :, channel][on_edge] = rng.choice(edges, on_edge.sum())
+    return frame
+
+
+def test_masks_match_in_range() -> None:
+    colour_settings = ColourDetectionSettings()
+    colours = colour_settings.colours
+    classifier = ColourClassifier(colour_settings, colours.keys())
+    for seed in range(5):
+        hsv = create_hsv_frame(colours, seed)
+        labels = classifier.classify(hsv)
+        for colour in colours:
+            expected = cv2.inRange(
+                hsv, colours[colour]["LOWER"], colours[colour]["UPPER"]
+            )
+            assert np.array_equal(classifier.get_mask(labels, colour), expected), colour
+
+
+def test_contours_match_per_colour_contours() -> None:
+    colour_settings = ColourDetectionSettings()
+    colours = colour_settings.colours
+    classifier = ColourClassifier(colour_settings, colours.keys())
+    hsv = create_hsv_frame(colours)
+    labels = classifier.classify(hsv)
+    for colour in colours:
+        mask, contours = classifier.get_mask_contours(labels, colour)
+        expected_mask, expected_contours = get_mask_contours_for_colour(
+            hsv, colour, colours
+        )
+        assert expected_contours is not None
+        assert np.array_equal(mask, expected_mask)
+        assert len(contours) == len(expected_contours)
+        for contour, expected_contour in zip(contours, expected_contours):
+            assert np.array_equal(contour, expected_contour)
+
+
+def test_masks_follow_changed_ranges() -> None:
+    colour_settings = ColourDetectionSettings()
+    colours = colour_settings.colours
+    classifier = ColourClassifier(colour_settings, colours.keys())
+    hsv = create_hsv_frame(colours)
+    classifier.classify(hsv)
+
+    colours["WHITE"]["LOWER"] = np.array([5, 10, 200])
+    colours["WHITE"]["UPPER"] = np.array([40, 90, 250])
+    classifier.invalidate()
+    labels = classifier.classify(hsv)
+    expected = cv2.inRange(hsv, colours["WHITE"]["LOWER"], colours["WHITE"]["UPPER"])
+    assert np.array_equal(classifier.get_mask(labels, "WHITE"), expected)
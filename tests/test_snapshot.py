@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import cv2
+import numpy as np
+
+from snooker_ball_tracker.ball_tracker.snapshot import SnapShot
+from snooker_ball_tracker.ball_tracker.util import dist_between_two_balls
+
+BALL_COLOURS = {
+    "RED": True,
+    "YELLOW": True,
+    "GREEN": True,
+    "BROWN": True,
+    "BLUE": True,
+    "PINK": True,
+    "BLACK": True,
+    "WHITE": True,
+}
+
+
+def create_balls(seed: int) -> dict[str, list[cv2.KeyPoint]]:
+    """Create a random number of balls of every colour at random positions
+
+    :param seed: random seed
+    :return: dict of colour and ball list pairs
+    """
+    rng = np.random.default_rng(seed)
+    return {
+        colour: [
+            cv2.KeyPoint(x, y, 12)
+            for x, y in rng.uniform(0, 1280, (int(rng.integers(0, 4)), 2))
+        ]
+        for colour in BALL_COLOURS
+    }
+
+
+def move_balls(
+    balls: dict[str, list[cv2.KeyPoint]], seed: int
+) -> dict[str, list[cv2.KeyPoint]]:
+    """Move every ball by up to 6 pixels, which is on either side of
+    the 0.1mm balls can move and still count as stationary
+
+    :param balls: dict of colour and ball list pairs
+    :param seed: random seed
+    :return: dict of colour and moved ball list pairs
+    """
+    rng = np.random.default_rng(seed)
+    return {
+        colour: [
+            cv2.KeyPoint(
+                ball.pt[0] + rng.uniform(-6, 6), ball.pt[1] + rng.uniform(-6, 6), 12
+            )
+            for ball in ball_list
+        ]
+        for colour, ball_list in balls.items()
+    }
+
+
+def test_counts_match_ball_lists() -> None:
+    for seed in range(10):
+        balls = create_balls(seed)
+        snapshot = SnapShot(balls, BALL_COLOURS)
+        assert snapshot.counts.tolist() == [
+            len(balls[colour]) for colour in snapshot.colours
+        ]
+        for colour, ball_list in balls.items():
+            assert snapshot.count(colour) == len(ball_list)
+
+
+def test_ball_diff_matches_per_colour_counts() -> None:
+    for seed in range(10):
+        first, second = create_balls(seed), create_balls(seed + 100)
+        diff = SnapShot(first, BALL_COLOURS).compare_ball_diff(
+            SnapShot(second, BALL_COLOURS)
+        )
+        assert diff.tolist() == [
+            len(first[colour]) - len(second[colour]) for colour in BALL_COLOURS
+        ]
+
+
+def test_moved_matches_per_ball_checks() -> None:
+    for seed in range(10):
+        before = create_balls(seed)
+        after = move_balls(before, seed)
+        # a ball has moved if no ball of its colour is close enough to it,
+        # checking each pair of balls on its own
+        expected = [
+            all(dist_between_two_balls(ball, other) > 0.1 for other in before[colour])
+            for colour, ball_list in after.items()
+            for ball in ball_list
+        ]
+        moved = SnapShot(after, BALL_COLOURS).moved(SnapShot(before, BALL_COLOURS))
+        assert moved.tolist() == expected
+
+
+def test_white_moved_matches_per_ball_check() -> None:
+    for seed in range(20):
+        before = create_balls(seed)
+        before["WHITE"] = before["WHITE"][:1] or [cv2.KeyPoint(640, 360, 12)]
+        after = move_balls(before, seed)
+        assert SnapShot(after, BALL_COLOURS).has_ball_moved(
+            SnapShot(before, BALL_COLOURS), "WHITE"
+        ) == (dist_between_two_balls(after["WHITE"][0], before["WHITE"][0]) > 0.1)